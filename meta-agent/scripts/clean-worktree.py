@@ -43,6 +43,7 @@ def generated_dirs(root: pathlib.Path, include_coverage: bool) -> list[pathlib.P
 
     candidates.add(meta_agent_root / "docs" / "architecture" / "structurizr" / "build")
     candidates.add(meta_agent_root / "templates")
+    candidates.add(meta_agent_root / "DOC_DELTA.md.index.json")
     candidates.add(root / "build")
 
     if include_coverage:
@@ -70,6 +71,8 @@ def tracked_generated_files(root: pathlib.Path, include_coverage: bool) -> list[
         "meta-agent/**/bin/**",
         "meta-agent/**/obj/**",
         "meta-agent/templates/**",
+        "meta-agent/DOC_DELTA.md.index.json",
+        "meta-agent/DOC_DELTA.md.journal/**",
         "meta-agent/docs/architecture/site/build/**",
         "build/**",
     ]
@@ -4,14 +4,46 @@
 from __future__ import annotations
 
 import argparse
+import errno
+import gzip
 import hashlib
+import io
 import json
 import os
 import pathlib
 import shutil
 import sys
-import tempfile
+import tarfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from typing import Any
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
+# Linux FICLONE ioctl: share extents copy-on-write (btrfs, XFS with reflink, bcachefs, ...).
+FICLONE = 0x40049409
+LINK_MODE_METHODS = {
+    "copy": ("copy",),
+    "hardlink": ("hardlink", "copy"),
+    "reflink": ("reflink", "copy"),
+    "auto": ("reflink", "hardlink", "copy"),
+}
+# Errors meaning "this filesystem pair cannot do it", as opposed to a per-file problem.
+UNSUPPORTED_LINK_ERRNOS = {errno.EXDEV, errno.EOPNOTSUPP, errno.ENOTSUP, errno.ENOTTY, errno.EINVAL, errno.ENOSYS}
+# Written next to each composed template (not inside it: the CLI renders every
+# file under templates/<name>/ into scaffolded projects).
+COMPOSE_MANIFEST_SUFFIX = ".compose-manifest.json"
+COMPOSE_MANIFEST_VERSION = 2
+# Longest suffix first so ".tar.gz" is not taken for a plain ".gz".
+ARCHIVE_FORMATS = {".tar.gz": "gztar", ".tgz": "gztar", ".tar": "tar", ".zip": "zip"}
+# 1980-01-01T00:00:00Z: the earliest timestamp a zip entry can carry.
+ZIP_MIN_EPOCH = 315532800
 
 
 @dataclass
@@ -33,6 +65,13 @@ class CompareResult:
         return not self.missing and not self.extra and not self.changed
 
 
+@dataclass
+class SyncResult:
+    written: int
+    unchanged: int
+    removed: int
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Compose scaffold templates from template-src")
     parser.add_argument(
@@ -70,6 +109,53 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Check composed output against existing templates without writing.",
     )
+    parser.add_argument(
+        "--link-mode",
+        choices=sorted(LINK_MODE_METHODS),
+        default="copy",
+        help="How written files are materialized from template-src: copy bytes, hardlink, reflink (copy-on-write "
+        "clone), or auto (reflink, then hardlink, then copy). Unsupported methods fall back to copy (default: copy).",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=min(8, os.cpu_count() or 1),
+        help="Worker threads for composing templates and hashing files (default: min(8, CPU count)).",
+    )
+    parser.add_argument(
+        "--digest-cache",
+        type=pathlib.Path,
+        default=None,
+        help="Persistent file digest cache (default: <repo-root>/.meta-agent-temp/compose-templates/digest-cache.json).",
+    )
+    parser.add_argument(
+        "--no-digest-cache",
+        action="store_true",
+        help="Hash every file without reading or updating the digest cache.",
+    )
+    parser.add_argument(
+        "--archive",
+        type=pathlib.Path,
+        default=None,
+        help="Stream the composed templates into a .zip, .tar, .tar.gz or .tgz archive instead of writing "
+        "--output-root. Entries are sorted and carry a fixed timestamp (SOURCE_DATE_EPOCH, else 1980-01-01).",
+    )
+    parser.add_argument(
+        "--archive-prefix",
+        default="",
+        help="Directory prefix for archive entries, e.g. 'templates' (default: none; entries are <template>/<path>).",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="After composing, keep polling template-src and recompose only the paths each change affects.",
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=0.25,
+        help="Polling interval in seconds for --watch (default: 0.25).",
+    )
     return parser.parse_args()
 
 
@@ -137,12 +223,6 @@ def ensure_directory(path: pathlib.Path, label: str) -> None:
         raise FileNotFoundError(f"{label} not found: {path}")
 
 
-def copy_tree(src: pathlib.Path, dst: pathlib.Path) -> None:
-    if not src.exists():
-        raise FileNotFoundError(f"source path not found: {src}")
-    shutil.copytree(src, dst, dirs_exist_ok=True)
-
-
 def remove_path(path: pathlib.Path) -> None:
     if not path.exists():
         return
@@ -160,7 +240,136 @@ def hash_file(path: pathlib.Path) -> str:
     return digest.hexdigest()
 
 
-def collect_entries(root: pathlib.Path) -> dict[str, tuple[str, str | None]]:
+class DigestCache:
+    """SHA-256 digests keyed by (path, size, mtime_ns, inode), persisted across runs.
+
+    Base files are shared by every template and rarely change, so with the
+    cache a file is only re-read when its stat metadata changed. Entries for
+    files modified within `RACY_WINDOW_NS` of being hashed are not trusted
+    across runs, since a same-size rewrite inside the mtime granularity would
+    be invisible; digests computed by this process are always reused.
+    Safe to share between worker threads.
+    """
+
+    VERSION = 1
+    RACY_WINDOW_NS = 2_000_000_000
+
+    def __init__(self, path: pathlib.Path | None) -> None:
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.entries: dict[str, list[Any]] = {}
+        self._fresh: set[str] = set()
+        self._lock = threading.Lock()
+        if path is not None and path.exists():
+            try:
+                payload = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                payload = {}
+            if payload.get("version") == self.VERSION and isinstance(payload.get("entries"), dict):
+                self.entries = payload["entries"]
+
+    def digest(self, path: pathlib.Path) -> str:
+        stat = path.stat()
+        key = str(path.resolve())
+        with self._lock:
+            cached = self.entries.get(key)
+            if cached is not None and cached[:3] == [stat.st_size, stat.st_mtime_ns, stat.st_ino]:
+                if key in self._fresh or stat.st_mtime_ns + self.RACY_WINDOW_NS < cached[4]:
+                    self.hits += 1
+                    return str(cached[3])
+            self.misses += 1
+        # hashlib releases the GIL for large updates, so misses hash in parallel.
+        digest = hash_file(path)
+        self.record(path, digest, stat)
+        return digest
+
+    def record(self, path: pathlib.Path, digest: str, stat: os.stat_result | None = None) -> None:
+        """Remember a digest already known for `path` (e.g. right after copying a hashed source)."""
+        stat = stat or path.stat()
+        key = str(path.resolve())
+        with self._lock:
+            self.entries[key] = [stat.st_size, stat.st_mtime_ns, stat.st_ino, digest, time.time_ns()]
+            self._fresh.add(key)
+
+    def prime(self, pool: ThreadPoolExecutor, paths: list[pathlib.Path]) -> None:
+        """Hash `paths` concurrently so later lookups are in-memory hits."""
+        unique = sorted({str(path.resolve()) for path in paths})
+        for _ in pool.map(lambda raw: self.digest(pathlib.Path(raw)), unique):
+            pass
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            live = {key: value for key, value in self.entries.items() if os.path.exists(key)}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        temp_path.write_text(json.dumps({"version": self.VERSION, "entries": live}) + "\n", encoding="utf-8")
+        os.replace(temp_path, self.path)
+
+    def describe(self) -> str:
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100.0) if total else 0.0
+        location = self.path if self.path is not None else "disabled"
+        return f"[CACHE] digest cache: {self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate) -> {location}"
+
+
+class FileMaterializer:
+    """Place a source file at a destination using the configured link mode.
+
+    Methods are tried in `LINK_MODE_METHODS` order. A method that fails with a
+    filesystem-level error (cross-device, unsupported) is disabled for the rest
+    of the run so later files go straight to the next method.
+    """
+
+    def __init__(self, mode: str) -> None:
+        self.mode = mode
+        self.counts = {method: 0 for method in ("reflink", "hardlink", "copy")}
+        self._disabled: set[str] = set()
+        self._lock = threading.Lock()
+
+    def materialize(self, source: pathlib.Path, destination: pathlib.Path) -> str:
+        for method in LINK_MODE_METHODS[self.mode]:
+            if method in self._disabled:
+                continue
+            try:
+                if method == "reflink":
+                    reflink_file(source, destination)
+                elif method == "hardlink":
+                    os.link(source, destination)
+                else:
+                    shutil.copy2(source, destination)
+            except OSError as exc:
+                if method == "copy":
+                    raise
+                if destination.exists():
+                    destination.unlink()
+                if exc.errno in UNSUPPORTED_LINK_ERRNOS:
+                    with self._lock:
+                        self._disabled.add(method)
+                continue
+            with self._lock:
+                self.counts[method] += 1
+            return method
+        raise RuntimeError(f"no link method available for {destination}")
+
+    def describe(self) -> str:
+        return (
+            f"[LINK] mode {self.mode}: reflinked {self.counts['reflink']}, "
+            f"hardlinked {self.counts['hardlink']}, copied {self.counts['copy']}"
+        )
+
+
+def reflink_file(source: pathlib.Path, destination: pathlib.Path) -> None:
+    if fcntl is None or not hasattr(fcntl, "ioctl"):
+        raise OSError(errno.EOPNOTSUPP, "reflink requires the Linux FICLONE ioctl")
+    with source.open("rb") as src_handle, destination.open("xb") as dst_handle:
+        fcntl.ioctl(dst_handle.fileno(), FICLONE, src_handle.fileno())
+    shutil.copystat(source, destination)
+
+
+def collect_entries(root: pathlib.Path, cache: DigestCache | None = None) -> dict[str, tuple[str, str | None]]:
     entries: dict[str, tuple[str, str | None]] = {}
     if not root.exists():
         return entries
@@ -175,14 +384,20 @@ def collect_entries(root: pathlib.Path) -> dict[str, tuple[str, str | None]]:
         for filename in filenames:
             path = current / filename
             rel = path.relative_to(root).as_posix()
-            entries[rel] = ("file", hash_file(path))
+            entries[rel] = ("file", cache.digest(path) if cache is not None else hash_file(path))
     return entries
 
 
-def compare_directories(expected: pathlib.Path, actual: pathlib.Path) -> CompareResult:
-    expected_entries = collect_entries(expected)
-    actual_entries = collect_entries(actual)
+def list_files(root: pathlib.Path) -> list[pathlib.Path]:
+    if not root.exists():
+        return []
+    return [pathlib.Path(dirpath) / filename for dirpath, _, filenames in os.walk(root) for filename in filenames]
+
 
+def compare_entries(
+    expected_entries: dict[str, tuple[str, str | None]],
+    actual_entries: dict[str, tuple[str, str | None]],
+) -> CompareResult:
     expected_keys = set(expected_entries.keys())
     actual_keys = set(actual_entries.keys())
 
@@ -194,31 +409,530 @@ def compare_directories(expected: pathlib.Path, actual: pathlib.Path) -> Compare
     return CompareResult(missing=missing, extra=extra, changed=changed)
 
 
-def compose_template(
+def sync_directories(
+    file_map: dict[str, pathlib.Path | None],
+    target: pathlib.Path,
+    cache: DigestCache | None = None,
+    materializer: FileMaterializer | None = None,
+) -> SyncResult:
+    """Make `target` match a composed file map, touching only paths that differ.
+
+    Files are materialized straight from their winning source file (copied by
+    default, or linked per `materializer`). Unchanged files keep their inode
+    and mtime, so downstream mtime-based caches stay valid across
+    recompositions.
+    """
+    materializer = materializer or FileMaterializer("copy")
+    expected_entries = file_map_entries(file_map, cache)
+    target_entries = collect_entries(target, cache)
+    target.mkdir(parents=True, exist_ok=True)
+
+    # A path whose type flipped (file <-> dir) is removed first and recreated below.
+    stale = sorted(
+        (
+            rel
+            for rel, entry in target_entries.items()
+            if rel not in expected_entries or expected_entries[rel][0] != entry[0]
+        ),
+        key=lambda rel: rel.count("/"),
+    )
+    removed = 0
+    removed_dirs: list[str] = []
+    for rel in stale:
+        if any(rel.startswith(prefix + "/") for prefix in removed_dirs):
+            continue
+        if target_entries[rel][0] == "dir":
+            removed += sum(
+                1
+                for other, entry in target_entries.items()
+                if entry[0] == "file" and other.startswith(rel + "/")
+            )
+            removed_dirs.append(rel)
+        else:
+            removed += 1
+        remove_path(target / rel)
+
+    written = 0
+    unchanged = 0
+    for rel, (kind, digest) in expected_entries.items():
+        destination = target / rel
+        if kind == "dir":
+            destination.mkdir(parents=True, exist_ok=True)
+            continue
+        previous = target_entries.get(rel)
+        if previous == (kind, digest) and rel not in stale:
+            unchanged += 1
+            continue
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        if destination.exists():
+            destination.unlink()
+        materializer.materialize(file_map[rel], destination)
+        if cache is not None and digest is not None:
+            cache.record(destination, digest)
+        written += 1
+
+    return SyncResult(written=written, unchanged=unchanged, removed=removed)
+
+
+def build_file_map(
     template: TemplateConfig,
     base_dir: pathlib.Path,
     overlay_root: pathlib.Path,
-    composed_dir: pathlib.Path,
-) -> None:
-    copy_tree(base_dir, composed_dir)
+) -> dict[str, pathlib.Path | None]:
+    """Compute a template's composed layout without copying anything.
 
+    Maps each relative path to the source file that wins after layering base,
+    overlays (in manifest order) and `remove` rules, or to None for
+    directories. Matches copying base then each overlay over it and deleting
+    `remove` paths, and enforces the template's required paths.
+    """
+    layers = [base_dir]
     for overlay_name in template.overlays:
         overlay_path = overlay_root / overlay_name
         ensure_directory(overlay_path, f"overlay directory for template '{template.name}'")
-        copy_tree(overlay_path, composed_dir)
+        layers.append(overlay_path)
+
+    file_map: dict[str, pathlib.Path | None] = {}
+    for layer in layers:
+        for dirpath, dirnames, filenames in os.walk(layer, followlinks=True):
+            current = pathlib.Path(dirpath)
+            rel_dir = current.relative_to(layer).as_posix()
+            if rel_dir != ".":
+                if file_map.get(rel_dir) is not None:
+                    raise RuntimeError(f"template '{template.name}': {layer} replaces file '{rel_dir}' with a directory")
+                file_map[rel_dir] = None
+            for filename in filenames:
+                rel = (current / filename).relative_to(layer).as_posix()
+                if rel in file_map and file_map[rel] is None:
+                    raise RuntimeError(f"template '{template.name}': {layer} replaces directory '{rel}' with a file")
+                file_map[rel] = current / filename
 
     for rel in template.remove:
-        target = composed_dir / rel
-        remove_path(target)
-
-    missing_required: list[str] = []
-    for rel in template.required:
-        target = composed_dir / rel
-        if not target.exists():
-            missing_required.append(rel)
+        for key in [key for key in file_map if key == rel or key.startswith(rel + "/")]:
+            del file_map[key]
+
+    missing_required = [rel for rel in template.required if rel not in file_map]
     if missing_required:
         joined = ", ".join(missing_required)
         raise RuntimeError(f"template '{template.name}' missing required paths after compose: {joined}")
+    return dict(sorted(file_map.items()))
+
+
+def file_map_entries(
+    file_map: dict[str, pathlib.Path | None],
+    cache: DigestCache | None = None,
+) -> dict[str, tuple[str, str | None]]:
+    entries: dict[str, tuple[str, str | None]] = {}
+    for rel, source in file_map.items():
+        if source is None:
+            entries[rel] = ("dir", None)
+        else:
+            entries[rel] = ("file", cache.digest(source) if cache is not None else hash_file(source))
+    return entries
+
+
+def compute_source_digest(
+    template: TemplateConfig,
+    file_map: dict[str, pathlib.Path | None],
+    entries: dict[str, tuple[str, str | None]],
+    source_root: pathlib.Path,
+) -> str:
+    """Digest of a template's composition inputs: its rules plus each path's winning source and content."""
+    payload = {
+        "overlays": template.overlays,
+        "remove": template.remove,
+        "required": template.required,
+        "files": [
+            [rel, None if source is None else source.relative_to(source_root).as_posix(), entries[rel][1]]
+            for rel, source in file_map.items()
+        ],
+    }
+    return hashlib.sha256(json.dumps(payload, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def compose_manifest_path(output_root: pathlib.Path, name: str) -> pathlib.Path:
+    return output_root / f"{name}{COMPOSE_MANIFEST_SUFFIX}"
+
+
+def load_compose_manifest(output_root: pathlib.Path, name: str) -> dict[str, Any] | None:
+    path = compose_manifest_path(output_root, name)
+    if not path.exists():
+        return None
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if payload.get("version") != COMPOSE_MANIFEST_VERSION:
+        return None
+    return payload
+
+
+def write_compose_manifest(
+    output_root: pathlib.Path,
+    name: str,
+    source_digest: str,
+    file_map: dict[str, pathlib.Path | None],
+    entries: dict[str, tuple[str, str | None]],
+    source_root: pathlib.Path,
+) -> None:
+    target_dir = output_root / name
+    files: dict[str, dict[str, Any]] = {}
+    for rel, source in file_map.items():
+        if source is None:
+            continue
+        stat = (target_dir / rel).stat()
+        files[rel] = {
+            "sha256": entries[rel][1],
+            "source": source.relative_to(source_root).as_posix(),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "ctime_ns": stat.st_ctime_ns,
+        }
+    payload = {
+        "version": COMPOSE_MANIFEST_VERSION,
+        "template": name,
+        "source_digest": source_digest,
+        "written_at_ns": time.time_ns(),
+        "directories": [rel for rel, source in file_map.items() if source is None],
+        "files": files,
+    }
+    path = compose_manifest_path(output_root, name)
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    temp_path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+    os.replace(temp_path, path)
+
+
+def compose_manifest_matches(manifest: dict[str, Any] | None, source_digest: str, target_dir: pathlib.Path) -> bool:
+    """True when the recorded composition is current and the output was not touched since.
+
+    Stats the output: the file set must match and every file must keep the
+    size, mtime and ctime recorded at write time. mtime alone is not enough,
+    since copies carry their source's mtime; ctime is always set by the kernel.
+    Files changed within the racy window of the manifest being written could
+    be rewritten without a visible ctime change, so only those are re-hashed
+    against the recorded digest.
+    """
+    if manifest is None or manifest.get("source_digest") != source_digest or not target_dir.is_dir():
+        return False
+    recorded_files: dict[str, dict[str, Any]] = manifest.get("files", {})
+    recorded_dirs = set(manifest.get("directories", []))
+    racy_before = int(manifest.get("written_at_ns", 0)) - DigestCache.RACY_WINDOW_NS
+    seen_files = 0
+    for dirpath, dirnames, filenames in os.walk(target_dir):
+        current = pathlib.Path(dirpath)
+        for dirname in dirnames:
+            if (current / dirname).relative_to(target_dir).as_posix() not in recorded_dirs:
+                return False
+        for filename in filenames:
+            rel = (current / filename).relative_to(target_dir).as_posix()
+            recorded = recorded_files.get(rel)
+            if recorded is None:
+                return False
+            path = current / filename
+            stat = path.stat()
+            if (stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns) != (
+                recorded["size"],
+                recorded["mtime_ns"],
+                recorded.get("ctime_ns"),
+            ):
+                return False
+            if stat.st_ctime_ns >= racy_before and hash_file(path) != recorded["sha256"]:
+                return False
+            seen_files += 1
+    return seen_files == len(recorded_files)
+
+
+class TemplateWatcher:
+    """Keep composed templates in sync with template-src while it is edited.
+
+    Holds every template's layered file map in memory and polls the source
+    tree by stat. A changed file is resolved against only the layers of the
+    templates that include it, so an edit rewrites just that path in just
+    those templates. Added/removed directories or a changed manifest rebuild
+    the affected file maps and fall back to the incremental directory sync.
+    A template whose update fails (e.g. a source removed mid-update) is marked
+    stale and rebuilt in full on the next poll that sees a change.
+    """
+
+    def __init__(
+        self,
+        manifest_path: pathlib.Path,
+        source_root: pathlib.Path,
+        output_root: pathlib.Path,
+        selected_names: list[str],
+        file_maps: dict[str, dict[str, pathlib.Path | None]],
+        cache: DigestCache,
+        materializer: FileMaterializer,
+    ) -> None:
+        self.manifest_path = manifest_path
+        self.source_root = source_root
+        self.output_root = output_root
+        self.selected_names = selected_names
+        self.file_maps = file_maps
+        self.cache = cache
+        self.materializer = materializer
+        self.stale: set[str] = set()
+        self._load_manifest()
+        self.snapshot = self.scan()
+
+    def _load_manifest(self) -> None:
+        base_rel, overlay_root_rel, templates = load_manifest(self.manifest_path)
+        unknown = [name for name in self.selected_names if name not in templates]
+        if unknown:
+            raise ValueError(f"unknown template(s): {', '.join(sorted(unknown))}")
+        self.base_dir = self.source_root / base_rel
+        self.overlay_root = self.source_root / overlay_root_rel
+        self.templates = templates
+
+    def layers(self, name: str) -> list[pathlib.Path]:
+        return [self.base_dir] + [self.overlay_root / overlay for overlay in self.templates[name].overlays]
+
+    def scan(self) -> dict[str, tuple[int, int, int] | None]:
+        """Stat signature of every source path (None for directories) plus the manifest."""
+        snapshot: dict[str, tuple[int, int, int] | None] = {}
+        for root in (self.base_dir, self.overlay_root):
+            for dirpath, dirnames, filenames in os.walk(root, followlinks=True):
+                current = pathlib.Path(dirpath)
+                for dirname in dirnames:
+                    snapshot[str(current / dirname)] = None
+                for filename in filenames:
+                    try:
+                        stat = (current / filename).stat()
+                    except FileNotFoundError:
+                        continue
+                    snapshot[str(current / filename)] = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+        stat = self.manifest_path.stat()
+        snapshot[str(self.manifest_path)] = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+        return snapshot
+
+    def poll(self) -> list[str]:
+        """Apply source changes since the last poll; returns report lines (empty when idle)."""
+        started = time.perf_counter()
+        current = self.scan()
+        changed = sorted(
+            path for path in current.keys() | self.snapshot.keys() if current.get(path) != self.snapshot.get(path)
+        )
+        if not changed:
+            return []
+        previous, self.snapshot = self.snapshot, current
+
+        if str(self.manifest_path) in changed:
+            try:
+                self._load_manifest()
+            except (OSError, ValueError, RuntimeError) as exc:
+                return [f"[ERROR] manifest reload failed: {exc}"]
+            return [self._rebuild(name, started) for name in self.selected_names]
+
+        structural = {path for path in changed if current.get(path, previous.get(path, ())) is None}
+        lines: list[str] = []
+        for name in self.selected_names:
+            layers = self.layers(name)
+            touched: dict[str, bool] = {}
+            for path in changed:
+                for layer in layers:
+                    try:
+                        rel = pathlib.Path(path).relative_to(layer).as_posix()
+                    except ValueError:
+                        continue
+                    touched[rel] = touched.get(rel, False) or path in structural
+            if not touched and name not in self.stale:
+                continue
+            if name in self.stale or any(touched.values()):
+                lines.append(self._rebuild(name, started))
+            else:
+                lines.append(self._update_files(name, sorted(touched), started))
+        return lines
+
+    def _rebuild(self, name: str, started: float) -> str:
+        try:
+            file_map = build_file_map(self.templates[name], self.base_dir, self.overlay_root)
+            result = sync_directories(file_map, self.output_root / name, self.cache, self.materializer)
+            self.file_maps[name] = file_map
+            self._write_manifest(name)
+        except (OSError, RuntimeError) as exc:
+            self.stale.add(name)
+            return f"[ERROR] template '{name}': {exc}"
+        self.stale.discard(name)
+        return self._report(name, result.written, result.removed, started)
+
+    def _update_files(self, name: str, rels: list[str], started: float) -> str:
+        template = self.templates[name]
+        layers = self.layers(name)
+        file_map = self.file_maps[name]
+        winners: dict[str, pathlib.Path | None] = {}
+        for rel in rels:
+            winner = None
+            if not any(rel == removed or rel.startswith(removed + "/") for removed in template.remove):
+                winner = next((layer / rel for layer in reversed(layers) if (layer / rel).is_file()), None)
+            if winner is None and rel in template.required:
+                return f"[ERROR] template '{name}' missing required path after compose: {rel}"
+            winners[rel] = winner
+
+        target_dir = self.output_root / name
+        written = 0
+        removed = 0
+        try:
+            for rel, winner in winners.items():
+                destination = target_dir / rel
+                if winner is None:
+                    if file_map.pop(rel, None) is not None and destination.is_file():
+                        destination.unlink()
+                        removed += 1
+                    continue
+                file_map[rel] = winner
+                digest = self.cache.digest(winner)
+                if destination.is_file() and self.cache.digest(destination) == digest:
+                    continue
+                destination.parent.mkdir(parents=True, exist_ok=True)
+                if destination.exists():
+                    destination.unlink()
+                self.materializer.materialize(winner, destination)
+                self.cache.record(destination, digest)
+                written += 1
+            self.file_maps[name] = dict(sorted(file_map.items()))
+            self._write_manifest(name)
+        except OSError as exc:
+            # The source moved between scan and update; the next scan sees that move.
+            self.stale.add(name)
+            return f"[ERROR] template '{name}': {exc}"
+        return self._report(name, written, removed, started)
+
+    def _write_manifest(self, name: str) -> None:
+        file_map = self.file_maps[name]
+        entries = file_map_entries(file_map, self.cache)
+        source_digest = compute_source_digest(self.templates[name], file_map, entries, self.source_root)
+        write_compose_manifest(self.output_root, name, source_digest, file_map, entries, self.source_root)
+
+    @staticmethod
+    def _report(name: str, written: int, removed: int, started: float) -> str:
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        return f"[WATCH] recomposed template '{name}' (written {written}, removed {removed}) in {elapsed_ms:.1f} ms"
+
+
+def archive_format(path: pathlib.Path) -> str:
+    name = path.name.lower()
+    for suffix, archive_type in ARCHIVE_FORMATS.items():
+        if name.endswith(suffix):
+            return archive_type
+    raise ValueError(f"unsupported archive type (expected .zip, .tar, .tar.gz or .tgz): {path}")
+
+
+def archive_epoch() -> int:
+    raw = os.environ.get("SOURCE_DATE_EPOCH", "").strip()
+    return max(ZIP_MIN_EPOCH, int(raw)) if raw else ZIP_MIN_EPOCH
+
+
+class ArchiveWriter:
+    """Write entries into a zip or tar archive so identical inputs give identical bytes.
+
+    Entries appear in insertion order with a fixed timestamp, normalized
+    permissions (0644, or 0755 for executables and directories) and no owner
+    names. File contents are streamed from disk, never staged. The archive is
+    written to a temp file and moved into place on close.
+    """
+
+    def __init__(self, path: pathlib.Path) -> None:
+        self.path = path
+        self.format = archive_format(path)
+        self.epoch = archive_epoch()
+        self.files = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        self._raw: io.BufferedWriter | None = None
+        self._gzip: gzip.GzipFile | None = None
+        self._zip: zipfile.ZipFile | None = None
+        self._tar: tarfile.TarFile | None = None
+        if self.format == "zip":
+            self._zip = zipfile.ZipFile(self._temp_path, "w", compression=zipfile.ZIP_DEFLATED)
+        else:
+            self._raw = self._temp_path.open("wb")
+            fileobj: Any = self._raw
+            if self.format == "gztar":
+                # GzipFile would otherwise embed the current time and temp file name in its header.
+                self._gzip = gzip.GzipFile(filename="", mode="wb", fileobj=self._raw, mtime=self.epoch)
+                fileobj = self._gzip
+            self._tar = tarfile.open(fileobj=fileobj, mode="w", format=tarfile.PAX_FORMAT)
+
+    def __enter__(self) -> ArchiveWriter:
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        self.close(commit=exc_type is None)
+
+    def _zip_info(self, arcname: str, mode: int) -> zipfile.ZipInfo:
+        info = zipfile.ZipInfo(arcname, date_time=time.gmtime(self.epoch)[:6])
+        info.external_attr = mode << 16
+        info.create_system = 3  # unix, so extractors honor the mode bits
+        return info
+
+    def _tar_info(self, arcname: str, mode: int, kind: bytes, size: int = 0) -> tarfile.TarInfo:
+        info = tarfile.TarInfo(arcname)
+        info.type = kind
+        info.mode = mode
+        info.size = size
+        info.mtime = self.epoch
+        info.uid = info.gid = 0
+        info.uname = info.gname = ""
+        return info
+
+    def add_directory(self, arcname: str) -> None:
+        arcname = arcname.rstrip("/")
+        if self._zip is not None:
+            info = self._zip_info(arcname + "/", 0o40755)
+            info.external_attr |= 0x10  # MS-DOS directory flag
+            self._zip.writestr(info, b"")
+        elif self._tar is not None:
+            self._tar.addfile(self._tar_info(arcname, 0o755, tarfile.DIRTYPE))
+
+    def add_file(self, arcname: str, source: pathlib.Path) -> None:
+        stat = source.stat()
+        mode = 0o755 if stat.st_mode & 0o111 else 0o644
+        with source.open("rb") as handle:
+            if self._zip is not None:
+                info = self._zip_info(arcname, 0o100000 | mode)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                with self._zip.open(info, "w", force_zip64=stat.st_size >= zipfile.ZIP64_LIMIT) as entry:
+                    shutil.copyfileobj(handle, entry, 1024 * 1024)
+            elif self._tar is not None:
+                self._tar.addfile(self._tar_info(arcname, mode, tarfile.REGTYPE, stat.st_size), handle)
+        self.files += 1
+
+    def add_bytes(self, arcname: str, data: bytes, executable: bool = False) -> None:
+        mode = 0o755 if executable else 0o644
+        if self._zip is not None:
+            info = self._zip_info(arcname, 0o100000 | mode)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            self._zip.writestr(info, data)
+        elif self._tar is not None:
+            self._tar.addfile(self._tar_info(arcname, mode, tarfile.REGTYPE, len(data)), io.BytesIO(data))
+        self.files += 1
+
+    def close(self, commit: bool = True) -> None:
+        for handle in (self._zip, self._tar, self._gzip, self._raw):
+            if handle is not None:
+                handle.close()
+        self._zip = self._tar = self._gzip = self._raw = None
+        if commit:
+            os.replace(self._temp_path, self.path)
+        elif self._temp_path.exists():
+            self._temp_path.unlink()
+
+
+def write_file_map_archive(
+    writer: ArchiveWriter,
+    prefix: str,
+    file_map: dict[str, pathlib.Path | None],
+) -> None:
+    """Add one composed template to `writer` under `prefix`, in sorted path order."""
+    prefix = prefix.strip("/")
+    if prefix:
+        writer.add_directory(prefix)
+    for rel, source in file_map.items():
+        arcname = f"{prefix}/{rel}" if prefix else rel
+        if source is None:
+            writer.add_directory(arcname)
+        else:
+            writer.add_file(arcname, source)
 
 
 def main() -> int:
@@ -245,43 +959,141 @@ def main() -> int:
     if unknown:
         raise ValueError(f"unknown template(s): {', '.join(sorted(unknown))}")
 
-    had_mismatch = False
-    with tempfile.TemporaryDirectory(prefix="meta-agent-template-compose-", dir="/tmp") as temp_dir:
-        temp_root = pathlib.Path(temp_dir)
-        for name in selected_names:
-            template = templates[name]
-            staged_dir = temp_root / name
-            staged_dir.mkdir(parents=True, exist_ok=True)
-            compose_template(template, base_dir, overlay_root, staged_dir)
-
-            target_dir = output_root / name
+    digest_cache = DigestCache(
+        None
+        if args.no_digest_cache
+        else (args.digest_cache or repo_root / ".meta-agent-temp" / "compose-templates" / "digest-cache.json").resolve()
+    )
+
+    if args.jobs < 1:
+        raise ValueError("--jobs must be >= 1")
+    if args.watch and args.check:
+        raise ValueError("--watch cannot be combined with --check")
+    if args.archive is not None and (args.check or args.watch):
+        raise ValueError("--archive cannot be combined with --check or --watch")
+    if args.watch_interval <= 0:
+        raise ValueError("--watch-interval must be > 0")
+    materializer = FileMaterializer(args.link_mode)
+
+    def inspect_template(
+        name: str, file_map: dict[str, pathlib.Path | None]
+    ) -> tuple[dict[str, tuple[str, str | None]], str, bool]:
+        """Hash one template's sources; returns entries, source digest and manifest currency."""
+        expected_entries = file_map_entries(file_map, digest_cache)
+        source_digest = compute_source_digest(templates[name], file_map, expected_entries, source_root)
+        current = compose_manifest_matches(load_compose_manifest(output_root, name), source_digest, output_root / name)
+        return expected_entries, source_digest, current
+
+    def process(
+        name: str,
+        file_map: dict[str, pathlib.Path | None],
+        inspection: tuple[dict[str, tuple[str, str | None]], str, bool],
+    ) -> tuple[list[str], bool]:
+        """Check or write one template; returns its report lines and whether it drifted."""
+        target_dir = output_root / name
+        expected_entries, source_digest, current = inspection
+        if current:
             if args.check:
-                diff = compare_directories(staged_dir, target_dir)
-                if diff.is_match:
-                    print(f"[OK] template '{name}' matches composed output")
-                    continue
+                return [f"[OK] template '{name}' matches composed output (compose manifest current)"], False
+            files = sum(1 for source in file_map.values() if source is not None)
+            return [
+                f"[WRITE] composed template '{name}' -> {target_dir} "
+                f"(written 0, unchanged {files}, removed 0; compose manifest current)"
+            ], False
 
-                had_mismatch = True
-                print(f"[DRIFT] template '{name}' differs from composed output")
-                for label, values in (
-                    ("missing", diff.missing),
-                    ("extra", diff.extra),
-                    ("changed", diff.changed),
-                ):
-                    if values:
-                        preview = values[:20]
-                        print(f"  {label} ({len(values)}):")
-                        for item in preview:
-                            print(f"    - {item}")
-                        if len(values) > len(preview):
-                            print(f"    - ... ({len(values) - len(preview)} more)")
-                continue
+        if args.check:
+            diff = compare_entries(expected_entries, collect_entries(target_dir, digest_cache))
+            if diff.is_match:
+                return [f"[OK] template '{name}' matches composed output"], False
+
+            lines = [f"[DRIFT] template '{name}' differs from composed output"]
+            for label, values in (
+                ("missing", diff.missing),
+                ("extra", diff.extra),
+                ("changed", diff.changed),
+            ):
+                if values:
+                    preview = values[:20]
+                    lines.append(f"  {label} ({len(values)}):")
+                    lines.extend(f"    - {item}" for item in preview)
+                    if len(values) > len(preview):
+                        lines.append(f"    - ... ({len(values) - len(preview)} more)")
+            return lines, True
 
-            target_dir.parent.mkdir(parents=True, exist_ok=True)
-            if target_dir.exists():
-                shutil.rmtree(target_dir)
-            shutil.copytree(staged_dir, target_dir)
-            print(f"[WRITE] composed template '{name}' -> {target_dir}")
+        result = sync_directories(file_map, target_dir, digest_cache, materializer)
+        write_compose_manifest(output_root, name, source_digest, file_map, expected_entries, source_root)
+        return [
+            f"[WRITE] composed template '{name}' -> {target_dir} "
+            f"(written {result.written}, unchanged {result.unchanged}, removed {result.removed})"
+        ], False
+
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        # Templates are never materialized in a staging dir: the composed
+        # layout is computed in memory and source files are hashed in place.
+        file_maps = list(pool.map(lambda name: build_file_map(templates[name], base_dir, overlay_root), selected_names))
+        if args.archive is not None:
+            archive_path = args.archive.resolve()
+            with ArchiveWriter(archive_path) as writer:
+                prefix = args.archive_prefix.strip("/")
+                if prefix:
+                    writer.add_directory(prefix)
+                for name, file_map in zip(selected_names, file_maps):
+                    write_file_map_archive(writer, f"{prefix}/{name}" if prefix else name, file_map)
+            print(f"[ARCHIVE] composed {len(selected_names)} template(s), {writer.files} files -> {archive_path}")
+            return 0
+        # Hash every distinct source file once up front: base files are shared
+        # by all templates, so per-template workers then only see in-memory hits.
+        digest_cache.prime(
+            pool,
+            [source for file_map in file_maps for source in file_map.values() if source is not None],
+        )
+        inspections = list(pool.map(inspect_template, selected_names, file_maps))
+        # Composed output is only read for templates whose compose manifest is
+        # stale; current templates are settled by stat alone.
+        digest_cache.prime(
+            pool,
+            [
+                path
+                for name, (_, _, current) in zip(selected_names, inspections)
+                if not current
+                for path in list_files(output_root / name)
+            ],
+        )
+        # map() yields in submission order, so output stays deterministic.
+        outcomes = list(pool.map(process, selected_names, file_maps, inspections))
+
+    had_mismatch = False
+    for lines, drifted in outcomes:
+        for line in lines:
+            print(line)
+        had_mismatch = had_mismatch or drifted
+
+    # --check only reads the digest cache so checks stay free of writes.
+    if not args.check:
+        digest_cache.save()
+    print(digest_cache.describe())
+    if not args.check and args.link_mode != "copy":
+        print(materializer.describe())
+
+    if args.watch:
+        watcher = TemplateWatcher(
+            manifest_path,
+            source_root,
+            output_root,
+            selected_names,
+            dict(zip(selected_names, file_maps)),
+            digest_cache,
+            materializer,
+        )
+        print(f"[WATCH] watching {source_root} every {args.watch_interval}s (Ctrl+C to stop)", flush=True)
+        try:
+            while True:
+                time.sleep(args.watch_interval)
+                for line in watcher.poll():
+                    print(line, flush=True)
+        except KeyboardInterrupt:
+            digest_cache.save()
+            return 0
 
     if args.check and had_mismatch:
         return 1
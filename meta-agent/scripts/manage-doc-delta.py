@@ -4,10 +4,12 @@
 from __future__ import annotations
 
 import argparse
+import bisect
 import contextlib
 from dataclasses import dataclass
 from datetime import datetime, timezone
 import getpass
+import hashlib
 import json
 import os
 import pathlib
@@ -15,6 +17,7 @@ import re
 import socket
 import sys
 import time
+import uuid
 
 if os.name == "nt":
     import msvcrt
@@ -25,6 +28,10 @@ TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%SZ"
 DEFAULT_DOC_DELTA_RELATIVE_PATH = "meta-agent/DOC_DELTA.md"
 DEFAULT_LOCK_TIMEOUT_SECONDS = 30.0
 DEFAULT_LOCK_POLL_INTERVAL_MS = 200
+INDEX_CACHE_VERSION = 1
+JOURNAL_ENTRY_SUFFIX = ".entry.md"
+# Written by `compact` before DOC_DELTA is rewritten and removed once the spool is cleared.
+COMPACT_LEDGER_NAME = ".compact-in-progress.json"
 ENTRY_HEADER_LINE_PATTERN = re.compile(
     r"^## (?P<timestamp>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}Z) - (?P<title>.+)$"
 )
@@ -46,6 +53,15 @@ class ParsedDocDelta:
     entries: list[DocDeltaEntry]
 
 
+@dataclass(frozen=True)
+class HeaderRecord:
+    line: int
+    position: int
+    timestamp_text: str
+    timestamp_value: datetime
+    title: str
+
+
 class LockTimeoutError(RuntimeError):
     """Raised when DOC_DELTA lock cannot be acquired before timeout."""
 
@@ -97,10 +113,48 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Optional markdown body file for the entry (mutually exclusive with --change/--verification).",
     )
+    add_parser.add_argument(
+        "--journal",
+        action="store_true",
+        help="Write the entry to the lock-free journal spool instead of DOC_DELTA (merge later with `compact`).",
+    )
 
-    subparsers.add_parser("check", help="Validate header format and chronological order.")
+    check_parser = subparsers.add_parser("check", help="Validate header format and chronological order.")
+    check_parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Report every invalid header, duplicate entry and minimal set of out-of-order entries.",
+    )
+    check_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print --all diagnostics as JSON on stdout (implies --all).",
+    )
     subparsers.add_parser("fix", help="Sort entries by timestamp and rewrite canonically.")
 
+    subparsers.add_parser("compact", help="Merge journal spool entries into DOC_DELTA in timestamp order.")
+
+    query_parser = subparsers.add_parser("query", help="Filter entries and print matches as JSON.")
+    query_parser.add_argument(
+        "--since",
+        default=None,
+        help="Inclusive lower timestamp bound in format YYYY-MM-DD HH:MM:SSZ.",
+    )
+    query_parser.add_argument(
+        "--until",
+        default=None,
+        help="Inclusive upper timestamp bound in format YYYY-MM-DD HH:MM:SSZ.",
+    )
+    title_group = query_parser.add_mutually_exclusive_group()
+    title_group.add_argument("--title", default=None, help="Case-insensitive title substring filter.")
+    title_group.add_argument("--title-regex", default=None, help="Python regular expression matched against titles.")
+    query_parser.add_argument(
+        "--keyword",
+        action="append",
+        default=[],
+        help="Repeatable case-insensitive body keyword; all keywords must match.",
+    )
+
     return parser.parse_args()
 
 
@@ -112,6 +166,14 @@ def doc_delta_lock_path(doc_delta_path: pathlib.Path) -> pathlib.Path:
     return doc_delta_path.parent / f"{doc_delta_path.name}.lock"
 
 
+def doc_delta_journal_dir(doc_delta_path: pathlib.Path) -> pathlib.Path:
+    return doc_delta_path.parent / f"{doc_delta_path.name}.journal"
+
+
+def doc_delta_index_path(doc_delta_path: pathlib.Path) -> pathlib.Path:
+    return doc_delta_path.parent / f"{doc_delta_path.name}.index.json"
+
+
 def lock_holder_metadata(operation: str) -> dict[str, object]:
     return {
         "heldByPid": os.getpid(),
@@ -288,7 +350,10 @@ def read_doc_delta(path: pathlib.Path) -> tuple[str, ParsedDocDelta]:
 
 
 def write_doc_delta(path: pathlib.Path, preamble: str, entries: list[DocDeltaEntry]) -> None:
-    path.write_text(render_doc_delta(preamble, entries), encoding="utf-8")
+    # Replace atomically: `query` reads without the lock and must never see a partial rewrite.
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    temp_path.write_text(render_doc_delta(preamble, entries), encoding="utf-8")
+    os.replace(temp_path, path)
 
 
 def create_entry_block(title: str, timestamp_text: str, body_text: str) -> str:
@@ -328,10 +393,7 @@ def resolve_body_text(args: argparse.Namespace) -> str:
     return "\n".join(bullets)
 
 
-def run_add(doc_delta_path: pathlib.Path, args: argparse.Namespace) -> int:
-    text, parsed = read_doc_delta(doc_delta_path)
-    _ = text  # keep symmetry with other modes
-
+def build_new_entry(args: argparse.Namespace) -> tuple[str, datetime, str, str]:
     title = args.title.strip()
     if not title:
         raise ValueError("Title must not be empty.")
@@ -346,6 +408,14 @@ def run_add(doc_delta_path: pathlib.Path, args: argparse.Namespace) -> int:
 
     body_text = resolve_body_text(args)
     entry_block = create_entry_block(title=title, timestamp_text=timestamp_text, body_text=body_text)
+    return timestamp_text, timestamp_value, title, entry_block
+
+
+def run_add(doc_delta_path: pathlib.Path, args: argparse.Namespace) -> int:
+    text, parsed = read_doc_delta(doc_delta_path)
+    _ = text  # keep symmetry with other modes
+
+    timestamp_text, timestamp_value, title, entry_block = build_new_entry(args)
     new_entry = DocDeltaEntry(
         index=len(parsed.entries),
         timestamp_text=timestamp_text,
@@ -360,6 +430,116 @@ def run_add(doc_delta_path: pathlib.Path, args: argparse.Namespace) -> int:
     return 0
 
 
+def run_journal_add(doc_delta_path: pathlib.Path, args: argparse.Namespace) -> int:
+    """Spool one entry without taking the DOC_DELTA lock.
+
+    Each writer publishes a uniquely named file via rename, so concurrent
+    writers never contend and `compact` never observes a partial entry.
+    """
+    timestamp_text, timestamp_value, title, entry_block = build_new_entry(args)
+    journal_dir = doc_delta_journal_dir(doc_delta_path)
+    journal_dir.mkdir(parents=True, exist_ok=True)
+
+    stem = f"{timestamp_value.strftime('%Y%m%dT%H%M%SZ')}-{time.time_ns()}-{os.getpid()}-{uuid.uuid4().hex}"
+    temp_path = journal_dir / f".{stem}.tmp"
+    entry_path = journal_dir / f"{stem}{JOURNAL_ENTRY_SUFFIX}"
+    with temp_path.open("x", encoding="utf-8") as handle:
+        handle.write(entry_block.rstrip() + "\n")
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temp_path, entry_path)
+    print(f"Journaled DOC_DELTA entry: {timestamp_text} - {title} ({entry_path.name})")
+    return 0
+
+
+def load_journal_entries(journal_dir: pathlib.Path, first_index: int) -> list[tuple[pathlib.Path, DocDeltaEntry]]:
+    if not journal_dir.is_dir():
+        return []
+
+    spooled: list[tuple[pathlib.Path, DocDeltaEntry]] = []
+    # Filenames start with the entry timestamp and a write-time counter, so
+    # name order gives a stable tie-break for equal timestamps.
+    for entry_path in sorted(journal_dir.glob(f"*{JOURNAL_ENTRY_SUFFIX}")):
+        try:
+            parsed = parse_doc_delta(entry_path.read_text(encoding="utf-8"))
+        except ValueError as exc:
+            raise ValueError(f"Invalid journal entry {entry_path}: {exc}") from exc
+        if len(parsed.entries) != 1:
+            raise ValueError(f"Journal entry {entry_path} must contain exactly one entry header.")
+        entry = parsed.entries[0]
+        spooled.append(
+            (
+                entry_path,
+                DocDeltaEntry(
+                    index=first_index + len(spooled),
+                    timestamp_text=entry.timestamp_text,
+                    timestamp_value=entry.timestamp_value,
+                    title=entry.title,
+                    block=entry.block,
+                ),
+            )
+        )
+    return spooled
+
+
+def merged_spool_files(journal_dir: pathlib.Path, doc_delta_text: str) -> set[str]:
+    """Spool filenames an interrupted compaction already wrote into DOC_DELTA.
+
+    The ledger names the spool files being merged and the DOC_DELTA digest
+    before the rewrite; if DOC_DELTA still has that digest the rewrite never
+    happened and nothing counts as merged.
+    """
+    try:
+        ledger = json.loads((journal_dir / COMPACT_LEDGER_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return set()
+    if ledger.get("docDeltaSha256Before") == hashlib.sha256(doc_delta_text.encode("utf-8")).hexdigest():
+        return set()
+    return set(ledger.get("files", []))
+
+
+def run_compact(doc_delta_path: pathlib.Path) -> int:
+    text, parsed = read_doc_delta(doc_delta_path)
+    journal_dir = doc_delta_journal_dir(doc_delta_path)
+    ledger_path = journal_dir / COMPACT_LEDGER_NAME
+    spooled = load_journal_entries(journal_dir, len(parsed.entries))
+    if not spooled:
+        with contextlib.suppress(FileNotFoundError):
+            ledger_path.unlink()
+        print("DOC_DELTA journal is empty; nothing to compact.")
+        return 0
+
+    # A compaction interrupted after writing DOC_DELTA leaves its spool files
+    # behind. Only those files are deduplicated (by their own block), so two
+    # intentionally identical entries from separate spool files both survive.
+    in_flight = merged_spool_files(journal_dir, text)
+    existing_blocks = {entry.block.rstrip() for entry in parsed.entries}
+    new_entries = [
+        entry
+        for entry_path, entry in spooled
+        if entry_path.name not in in_flight or entry.block.rstrip() not in existing_blocks
+    ]
+    if new_entries:
+        ledger = {
+            "docDeltaSha256Before": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+            "files": [entry_path.name for entry_path, _ in spooled],
+        }
+        temp_ledger = journal_dir / f"{COMPACT_LEDGER_NAME}.{os.getpid()}.tmp"
+        temp_ledger.write_text(json.dumps(ledger, sort_keys=True) + "\n", encoding="utf-8")
+        os.replace(temp_ledger, ledger_path)
+        write_doc_delta(doc_delta_path, parsed.preamble, sort_entries(parsed.entries + new_entries))
+
+    for entry_path, _ in spooled:
+        entry_path.unlink()
+    with contextlib.suppress(FileNotFoundError):
+        ledger_path.unlink()
+    print(
+        f"Compacted {len(new_entries)} journal entr{'y' if len(new_entries) == 1 else 'ies'} into DOC_DELTA "
+        f"({len(spooled) - len(new_entries)} already present)."
+    )
+    return 0
+
+
 def run_check(doc_delta_path: pathlib.Path) -> int:
     _, parsed = read_doc_delta(doc_delta_path)
     expected_order = sort_entries(parsed.entries)
@@ -389,6 +569,260 @@ def run_check(doc_delta_path: pathlib.Path) -> int:
     return 0
 
 
+def entry_body(entry: DocDeltaEntry) -> str:
+    _, _, body = entry.block.partition("\n")
+    return body.strip("\n")
+
+
+def build_index(parsed: ParsedDocDelta) -> list[dict[str, object]]:
+    return [
+        {
+            "index": entry.index,
+            "timestamp": entry.timestamp_text,
+            "title": entry.title,
+            "body": entry_body(entry),
+        }
+        for entry in parsed.entries
+    ]
+
+
+def doc_delta_source_key(doc_delta_path: pathlib.Path) -> dict[str, int]:
+    stat = doc_delta_path.stat()
+    return {"size": stat.st_size, "mtimeNs": stat.st_mtime_ns}
+
+
+def load_index(doc_delta_path: pathlib.Path) -> tuple[list[dict[str, object]], bool]:
+    """Return indexed entries and whether the on-disk cache was reused.
+
+    Runs without the DOC_DELTA lock. The cache is keyed on the DOC_DELTA file
+    size and mtime, so any rewrite through add/fix (or a manual edit) rebuilds
+    it on the next query; a rebuild is only kept when the file did not change
+    while it was being parsed.
+    """
+    if not doc_delta_path.exists():
+        raise ValueError(f"DOC_DELTA file not found: {doc_delta_path}")
+
+    source_key = doc_delta_source_key(doc_delta_path)
+    index_path = doc_delta_index_path(doc_delta_path)
+    try:
+        cached = json.loads(index_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        cached = None
+    if (
+        isinstance(cached, dict)
+        and cached.get("version") == INDEX_CACHE_VERSION
+        and cached.get("source") == source_key
+        and isinstance(cached.get("entries"), list)
+    ):
+        return cached["entries"], True
+
+    _, parsed = read_doc_delta(doc_delta_path)
+    entries = build_index(parsed)
+    if doc_delta_source_key(doc_delta_path) != source_key:
+        # Rewritten while parsing: the result is still a consistent snapshot
+        # (writes are atomic renames) but must not be cached under the old key.
+        return entries, False
+    payload = {"version": INDEX_CACHE_VERSION, "source": source_key, "entries": entries}
+    temp_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+    try:
+        temp_path.write_text(json.dumps(payload, sort_keys=True) + "\n", encoding="utf-8")
+        os.replace(temp_path, index_path)
+    except OSError:
+        # The index is only a cache; an unwritable location must not fail the query.
+        with contextlib.suppress(OSError):
+            temp_path.unlink()
+    return entries, False
+
+
+def parse_query_bound(value: str | None, option_name: str) -> datetime | None:
+    if value is None:
+        return None
+    try:
+        return parse_timestamp(value.strip())
+    except ValueError as exc:
+        raise ValueError(f"Invalid {option_name} '{value}'. Expected format: YYYY-MM-DD HH:MM:SSZ.") from exc
+
+
+def run_query(doc_delta_path: pathlib.Path, args: argparse.Namespace) -> int:
+    since = parse_query_bound(args.since, "--since")
+    until = parse_query_bound(args.until, "--until")
+    title_pattern: re.Pattern[str] | None = None
+    if args.title_regex is not None:
+        try:
+            title_pattern = re.compile(args.title_regex)
+        except re.error as exc:
+            raise ValueError(f"Invalid --title-regex '{args.title_regex}': {exc}") from exc
+    title_needle = args.title.casefold() if args.title is not None else None
+    keywords = [keyword.casefold() for keyword in args.keyword if keyword.strip()]
+
+    entries, cache_hit = load_index(doc_delta_path)
+    matches: list[dict[str, object]] = []
+    for entry in entries:
+        timestamp_value = parse_timestamp(str(entry["timestamp"]))
+        if since is not None and timestamp_value < since:
+            continue
+        if until is not None and timestamp_value > until:
+            continue
+        title = str(entry["title"])
+        if title_needle is not None and title_needle not in title.casefold():
+            continue
+        if title_pattern is not None and title_pattern.search(title) is None:
+            continue
+        body = str(entry["body"]).casefold()
+        if any(keyword not in body for keyword in keywords):
+            continue
+        matches.append(entry)
+
+    result = {
+        "docDelta": str(doc_delta_path),
+        "indexCacheHit": cache_hit,
+        "totalEntries": len(entries),
+        "matchedEntries": len(matches),
+        "entries": matches,
+    }
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+def scan_headers(text: str) -> tuple[list[HeaderRecord], list[dict[str, object]]]:
+    """Collect valid entry headers and every invalid level-2 heading in one pass."""
+    headers: list[HeaderRecord] = []
+    invalid: list[dict[str, object]] = []
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        if not line.startswith("## "):
+            continue
+        match = ENTRY_HEADER_LINE_PATTERN.fullmatch(line)
+        if match is None:
+            invalid.append(
+                {
+                    "line": line_number,
+                    "text": line,
+                    "reason": "Expected `## YYYY-MM-DD HH:MM:SSZ - Title`.",
+                }
+            )
+            continue
+        try:
+            timestamp_value = parse_timestamp(match.group("timestamp"))
+        except ValueError:
+            invalid.append({"line": line_number, "text": line, "reason": "Invalid timestamp value."})
+            continue
+        headers.append(
+            HeaderRecord(
+                line=line_number,
+                position=len(headers) + 1,
+                timestamp_text=match.group("timestamp"),
+                timestamp_value=timestamp_value,
+                title=match.group("title"),
+            )
+        )
+    return headers, invalid
+
+
+def entries_to_move(headers: list[HeaderRecord]) -> list[HeaderRecord]:
+    """Return the minimal set of headers to move so the rest stay in timestamp order.
+
+    The complement of a longest non-decreasing subsequence of timestamps is the
+    smallest set whose relocation yields the `sort_entries` order.
+    """
+    tail_values: list[datetime] = []
+    tail_indices: list[int] = []
+    predecessors: list[int] = [-1] * len(headers)
+    for idx, header in enumerate(headers):
+        slot = bisect.bisect_right(tail_values, header.timestamp_value)
+        if slot > 0:
+            predecessors[idx] = tail_indices[slot - 1]
+        if slot == len(tail_values):
+            tail_values.append(header.timestamp_value)
+            tail_indices.append(idx)
+        else:
+            tail_values[slot] = header.timestamp_value
+            tail_indices[slot] = idx
+
+    keep: set[int] = set()
+    cursor = tail_indices[-1] if tail_indices else -1
+    while cursor != -1:
+        keep.add(cursor)
+        cursor = predecessors[cursor]
+    return [header for idx, header in enumerate(headers) if idx not in keep]
+
+
+def diagnose_doc_delta(text: str) -> dict[str, object]:
+    headers, invalid_headers = scan_headers(text)
+    if not headers and not invalid_headers:
+        raise ValueError("No DOC_DELTA entries found.")
+
+    seen: dict[tuple[str, str], list[int]] = {}
+    for header in headers:
+        seen.setdefault((header.timestamp_text, header.title), []).append(header.line)
+    duplicates = [
+        {"timestamp": timestamp_text, "title": title, "lines": lines}
+        for (timestamp_text, title), lines in seen.items()
+        if len(lines) > 1
+    ]
+
+    expected_positions = {
+        header.position: rank
+        for rank, header in enumerate(
+            sorted(headers, key=lambda item: (item.timestamp_value, item.position)), start=1
+        )
+    }
+    out_of_order = [
+        {
+            "line": header.line,
+            "timestamp": header.timestamp_text,
+            "title": header.title,
+            "position": header.position,
+            "expectedPosition": expected_positions[header.position],
+        }
+        for header in entries_to_move(headers)
+    ]
+
+    return {
+        "passed": not invalid_headers and not duplicates and not out_of_order,
+        "entries": len(headers),
+        "invalidHeaders": invalid_headers,
+        "duplicates": duplicates,
+        "outOfOrder": out_of_order,
+    }
+
+
+def run_check_all(doc_delta_path: pathlib.Path, as_json: bool) -> int:
+    if not doc_delta_path.exists():
+        raise ValueError(f"DOC_DELTA file not found: {doc_delta_path}")
+    report = diagnose_doc_delta(doc_delta_path.read_text(encoding="utf-8"))
+
+    if as_json:
+        print(json.dumps({"docDelta": str(doc_delta_path), **report}, indent=2))
+        return 0 if report["passed"] else 1
+
+    if report["passed"]:
+        print(f"DOC_DELTA check passed ({report['entries']} entries).")
+        return 0
+
+    print("DOC_DELTA check failed.", file=sys.stderr)
+    for item in report["invalidHeaders"]:
+        print(f"line {item['line']}: invalid heading: {item['text']} ({item['reason']})", file=sys.stderr)
+    for item in report["duplicates"]:
+        lines = ", ".join(str(line) for line in item["lines"])
+        print(
+            f"lines {lines}: duplicate entry '{item['timestamp']} - {item['title']}'",
+            file=sys.stderr,
+        )
+    for item in report["outOfOrder"]:
+        print(
+            f"line {item['line']}: out of order '{item['timestamp']} - {item['title']}' "
+            f"(position {item['position']}, expected {item['expectedPosition']})",
+            file=sys.stderr,
+        )
+    if report["outOfOrder"]:
+        print(
+            f"{len(report['outOfOrder'])} entr{'y' if len(report['outOfOrder']) == 1 else 'ies'} must move. "
+            f"Run `python3 ./meta-agent/scripts/manage-doc-delta.py --doc-delta {doc_delta_path} fix` to normalize.",
+            file=sys.stderr,
+        )
+    return 1
+
+
 def run_fix(doc_delta_path: pathlib.Path) -> int:
     current_text, parsed = read_doc_delta(doc_delta_path)
     sorted_entries = sort_entries(parsed.entries)
@@ -420,6 +854,12 @@ def main() -> int:
         return 2
 
     try:
+        if args.command == "add" and args.journal:
+            return run_journal_add(doc_delta_path, args)
+        if args.command == "query":
+            # Read-only: DOC_DELTA is replaced atomically, so readers never wait behind writers.
+            return run_query(doc_delta_path, args)
+
         with acquire_doc_delta_lock(
             doc_delta_path=doc_delta_path,
             timeout_seconds=lock_timeout_seconds,
@@ -429,9 +869,13 @@ def main() -> int:
             if args.command == "add":
                 return run_add(doc_delta_path, args)
             if args.command == "check":
+                if args.all or args.json:
+                    return run_check_all(doc_delta_path, as_json=args.json)
                 return run_check(doc_delta_path)
             if args.command == "fix":
                 return run_fix(doc_delta_path)
+            if args.command == "compact":
+                return run_compact(doc_delta_path)
     except ValueError as exc:
         print(str(exc), file=sys.stderr)
         return 1
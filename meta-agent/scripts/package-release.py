@@ -5,17 +5,28 @@ from __future__ import annotations
 
 import argparse
 import hashlib
+import os
 import pathlib
 import shutil
 import subprocess
 import sys
+import tarfile
 import tempfile
+import threading
+import time
 import xml.etree.ElementTree as ET
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import IO
 
 DEFAULT_RUNTIMES = ["win-x64", "linux-x64", "osx-arm64", "osx-x64"]
 DEFAULT_CONFIGURATION = "Release"
 DEFAULT_OUTPUT_DIR = ".meta-agent-temp/release-packages"
 PROJECT_RELATIVE_PATH = "meta-agent/dotnet/MetaAgent.Cli/MetaAgent.Cli.csproj"
+# Runtime-independent asset directories under meta-agent/, packaged next to templates/.
+SHARED_ASSET_DIRS = ("agents", "schema", "examples")
+# 1980-01-01T00:00:00Z: the earliest timestamp a zip entry can carry.
+ZIP_MIN_EPOCH = 315532800
 
 
 def parse_args() -> argparse.Namespace:
@@ -40,12 +51,35 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--artifact-name", default=None, help="Override zip filename")
     parser.add_argument("--skip-publish", action="store_true", help="Skip dotnet publish and package existing output")
     parser.add_argument("--publish-dir", default=None, help="Use existing publish directory (required with --skip-publish)")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Runtimes to dotnet publish concurrently; each finished runtime is zipped while the rest publish (default: 1)",
+    )
     return parser.parse_args()
 
 
-def run(command: list[str], cwd: pathlib.Path) -> None:
-    print("$ " + " ".join(command))
-    result = subprocess.run(command, cwd=str(cwd), check=False)
+OUTPUT_LOCK = threading.Lock()
+
+
+def run(command: list[str], cwd: pathlib.Path, capture: bool = False) -> None:
+    """Run a command, streaming its output, or buffering it when `capture` (concurrent publishes).
+
+    Buffered output is only printed when the command fails, as one block, so
+    parallel runs do not interleave their logs.
+    """
+    with OUTPUT_LOCK:
+        print("$ " + " ".join(command), flush=True)
+    if not capture:
+        result = subprocess.run(command, cwd=str(cwd), check=False)
+    else:
+        result = subprocess.run(command, cwd=str(cwd), check=False, capture_output=True, text=True)
+        if result.returncode != 0:
+            with OUTPUT_LOCK:
+                sys.stdout.write(result.stdout)
+                sys.stderr.write(result.stderr)
+                sys.stdout.flush()
     if result.returncode != 0:
         raise RuntimeError(f"Command failed ({result.returncode}): {' '.join(command)}")
 
@@ -60,10 +94,70 @@ def detect_version(csproj_path: pathlib.Path) -> str:
     return "0.0.0-dev"
 
 
-def copy_tree(src: pathlib.Path, dst: pathlib.Path) -> None:
-    if not src.is_dir():
-        raise FileNotFoundError(f"Missing required directory: {src}")
-    shutil.copytree(src, dst)
+class ReleaseZip:
+    """Write a release zip entry by entry, streaming file contents from their source.
+
+    Entries get a fixed timestamp (SOURCE_DATE_EPOCH, else 1980-01-01) and
+    normalized permissions, so rebuilding from the same inputs gives the same
+    bytes and checksum.
+    """
+
+    def __init__(self, path: pathlib.Path) -> None:
+        raw_epoch = os.environ.get("SOURCE_DATE_EPOCH", "").strip()
+        epoch = max(ZIP_MIN_EPOCH, int(raw_epoch)) if raw_epoch else ZIP_MIN_EPOCH
+        self.date_time = time.gmtime(epoch)[:6]
+        self.path = path
+        self.archive = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+
+    def __enter__(self) -> ReleaseZip:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.archive.close()
+
+    def _info(self, arcname: str, mode: int) -> zipfile.ZipInfo:
+        info = zipfile.ZipInfo(arcname, date_time=self.date_time)
+        info.external_attr = mode << 16
+        info.create_system = 3
+        info.compress_type = zipfile.ZIP_DEFLATED
+        return info
+
+    def add_directory(self, arcname: str) -> None:
+        info = self._info(arcname.rstrip("/") + "/", 0o40755)
+        info.external_attr |= 0x10
+        self.archive.writestr(info, b"")
+
+    def add_stream(self, arcname: str, handle: IO[bytes], executable: bool = False) -> None:
+        with self.archive.open(self._info(arcname, 0o100755 if executable else 0o100644), "w") as entry:
+            shutil.copyfileobj(handle, entry, 1024 * 1024)
+
+    def add_file(self, arcname: str, source: pathlib.Path, executable: bool | None = None) -> None:
+        if executable is None:
+            executable = bool(source.stat().st_mode & 0o111)
+        with source.open("rb") as handle:
+            self.add_stream(arcname, handle, executable)
+
+    def add_text(self, arcname: str, text: str) -> None:
+        self.archive.writestr(self._info(arcname, 0o100644), text.encode("utf-8"))
+
+    def add_tar(self, tar_path: pathlib.Path, arcname: str) -> None:
+        """Re-emit every member of an uncompressed tar under `arcname`, in tar order.
+
+        The bundle must hold only regular files and directories (links are
+        dereferenced when it is built); anything else fails the package.
+        """
+        with tarfile.open(tar_path) as bundle:
+            for member in bundle:
+                target = f"{arcname}/{member.name}"
+                if member.isdir():
+                    self.add_directory(target)
+                elif member.isfile():
+                    handle = bundle.extractfile(member)
+                    if handle is None:
+                        raise ValueError(f"Unreadable member '{member.name}' in {tar_path}")
+                    self.add_stream(target, handle, bool(member.mode & 0o111))
+                else:
+                    raise ValueError(f"Unsupported member '{member.name}' (type {member.type!r}) in {tar_path}")
 
 
 def sha256_file(path: pathlib.Path) -> str:
@@ -74,20 +168,26 @@ def sha256_file(path: pathlib.Path) -> str:
     return digest.hexdigest()
 
 
-def write_sha256_sums(output_dir: pathlib.Path, zip_paths: list[pathlib.Path]) -> pathlib.Path:
+def write_sha256_sums(
+    output_dir: pathlib.Path,
+    zip_paths: list[pathlib.Path],
+    digests: dict[pathlib.Path, str] | None = None,
+) -> pathlib.Path:
+    """Write SHA256SUMS.txt; `digests` holds checksums already computed as each zip was written."""
     sums_path = output_dir / "SHA256SUMS.txt"
+    digests = digests or {}
     lines: list[str] = []
     for zip_path in sorted(zip_paths):
         rel = zip_path.relative_to(output_dir).as_posix()
-        lines.append(f"{sha256_file(zip_path)}  {rel}")
+        lines.append(f"{digests.get(zip_path) or sha256_file(zip_path)}  {rel}")
 
     sums_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
     return sums_path
 
 
-def create_readme(destination: pathlib.Path, version: str, runtime: str) -> None:
+def render_readme(version: str, runtime: str) -> str:
     executable_name = "meta-agent.exe" if runtime.startswith("win") else "meta-agent"
-    text = "\n".join(
+    return "\n".join(
         [
             "meta-agent release package",
             "",
@@ -112,10 +212,43 @@ def create_readme(destination: pathlib.Path, version: str, runtime: str) -> None
             "",
         ]
     )
-    destination.write_text(text, encoding="utf-8")
 
 
-def compose_templates_to_output(repo_root: pathlib.Path, output_root: pathlib.Path) -> None:
+def add_tree_to_tar(bundle: tarfile.TarFile, src: pathlib.Path, arcname: str) -> None:
+    """Add `src` under `arcname`, following symlinks like the copytree it replaced.
+
+    `bundle` must be opened with `dereference=True` so linked files are stored
+    as regular members rather than symlink/hardlink entries.
+    """
+    if not src.is_dir():
+        raise FileNotFoundError(f"Missing required directory: {src}")
+    for dirpath, dirnames, filenames in os.walk(src, followlinks=True):
+        dirnames.sort()
+        current = pathlib.Path(dirpath)
+        rel_dir = current.relative_to(src).as_posix()
+        prefix = arcname if rel_dir == "." else f"{arcname}/{rel_dir}"
+        bundle.add(current, arcname=prefix, recursive=False)
+        for filename in sorted(filenames):
+            bundle.add(current / filename, arcname=f"{prefix}/{filename}", recursive=False)
+
+
+def prepare_shared_assets(repo_root: pathlib.Path, staging_dir: pathlib.Path) -> pathlib.Path:
+    """Bundle everything that is identical across runtimes into one uncompressed tar.
+
+    Templates are composed once straight into the tar, and agents/schema/
+    examples are appended; each runtime's zip then streams this bundle instead
+    of recomposing and re-walking the repo.
+    """
+    bundle_path = staging_dir / "shared-assets.tar"
+    compose_templates_to_archive(repo_root, bundle_path)
+    with tarfile.open(bundle_path, "a", dereference=True) as bundle:
+        for name in SHARED_ASSET_DIRS:
+            add_tree_to_tar(bundle, repo_root / "meta-agent" / name, name)
+    return bundle_path
+
+
+def compose_templates_to_archive(repo_root: pathlib.Path, archive_path: pathlib.Path) -> None:
+    """Compose templates straight into an uncompressed tar under templates/; no composed tree is written."""
     compose_script = repo_root / "meta-agent" / "scripts" / "compose-templates.py"
     if not compose_script.exists():
         raise FileNotFoundError(f"Template composition script not found: {compose_script}")
@@ -124,14 +257,22 @@ def compose_templates_to_output(repo_root: pathlib.Path, output_root: pathlib.Pa
         [
             "python3",
             str(compose_script),
-            "--output-root",
-            str(output_root),
+            "--archive",
+            str(archive_path),
+            "--archive-prefix",
+            "templates",
         ],
         repo_root,
     )
 
 
-def resolve_publish_dir(args: argparse.Namespace, repo_root: pathlib.Path) -> pathlib.Path:
+def resolve_publish_dir(args: argparse.Namespace, repo_root: pathlib.Path, work_dir: pathlib.Path) -> pathlib.Path:
+    """Publish one runtime (or locate --publish-dir) and return the directory holding its executable.
+
+    Each runtime publishes into its own output dir under `work_dir` with its
+    own `--artifacts-path`, so concurrent publishes never share obj/ or bin/
+    (restore writes a runtime-specific project.assets.json).
+    """
     if args.skip_publish:
         if not args.publish_dir:
             raise ValueError("--publish-dir is required when --skip-publish is used")
@@ -140,8 +281,11 @@ def resolve_publish_dir(args: argparse.Namespace, repo_root: pathlib.Path) -> pa
             publish_dir = (repo_root / publish_dir).resolve()
         return publish_dir
 
-    publish_dir = pathlib.Path(tempfile.mkdtemp(prefix="meta-agent-publish-", dir="/tmp"))
+    publish_dir = work_dir / "publish" / args.runtime
+    artifacts_dir = work_dir / "artifacts" / args.runtime
+    publish_dir.mkdir(parents=True, exist_ok=True)
     project_path = repo_root / PROJECT_RELATIVE_PATH
+    started = time.perf_counter()
     run(
         [
             "dotnet",
@@ -155,14 +299,50 @@ def resolve_publish_dir(args: argparse.Namespace, repo_root: pathlib.Path) -> pa
             "true",
             "/p:PublishSingleFile=true",
             "/p:PublishTrimmed=false",
+            "--artifacts-path",
+            str(artifacts_dir),
             "-o",
             str(publish_dir),
         ],
         repo_root,
+        capture=args.jobs > 1,
     )
+    with OUTPUT_LOCK:
+        print(f"Published {args.runtime} in {time.perf_counter() - started:.1f}s", flush=True)
     return publish_dir
 
 
+def write_release_zip(
+    output_dir: pathlib.Path,
+    artifact_name: str,
+    runtime: str,
+    version: str,
+    publish_dir: pathlib.Path,
+    shared_assets: pathlib.Path,
+) -> pathlib.Path:
+    if not publish_dir.is_dir():
+        raise FileNotFoundError(f"Publish directory not found: {publish_dir}")
+    candidates = [
+        publish_dir / "MetaAgent.Cli.exe",
+        publish_dir / "meta-agent.exe",
+        publish_dir / "MetaAgent.Cli",
+        publish_dir / "meta-agent",
+    ]
+    exe_source = next((path for path in candidates if path.exists()), None)
+    if exe_source is None:
+        raise FileNotFoundError(f"Published executable not found in {publish_dir}")
+
+    packaged_exe_name = "meta-agent.exe" if runtime.startswith("win") else "meta-agent"
+    # Entries are streamed from their sources into the zip; no package tree is staged.
+    zip_path = output_dir / f"{artifact_name}.zip"
+    with ReleaseZip(zip_path) as release_zip:
+        release_zip.add_directory(artifact_name)
+        release_zip.add_file(f"{artifact_name}/{packaged_exe_name}", exe_source, executable=True)
+        release_zip.add_tar(shared_assets, artifact_name)
+        release_zip.add_text(f"{artifact_name}/README.txt", render_readme(version, runtime))
+    return zip_path
+
+
 def main() -> int:
     args = parse_args()
     repo_root = pathlib.Path(__file__).resolve().parents[2]
@@ -177,47 +357,42 @@ def main() -> int:
     try:
         if args.skip_publish and len(runtimes) != 1:
             raise ValueError("--skip-publish currently supports exactly one --runtime value")
+        if args.jobs < 1:
+            raise ValueError("--jobs must be >= 1")
 
         generated_zip_paths: list[pathlib.Path] = []
-        for runtime in runtimes:
-            artifact_name = args.artifact_name or f"meta-agent-{version}-{runtime}"
-            runtime_args = argparse.Namespace(**vars(args))
-            runtime_args.runtime = runtime
-            publish_dir = resolve_publish_dir(runtime_args, repo_root)
-            if not publish_dir.is_dir():
-                raise FileNotFoundError(f"Publish directory not found: {publish_dir}")
-
-            with tempfile.TemporaryDirectory(prefix="meta-agent-package-", dir="/tmp") as temp_dir:
-                temp_root = pathlib.Path(temp_dir)
-                package_root = temp_root / artifact_name
-                package_root.mkdir(parents=True, exist_ok=True)
-                composed_templates_dir = temp_root / "composed-templates"
-                compose_templates_to_output(repo_root, composed_templates_dir)
-
-                candidates = [
-                    publish_dir / "MetaAgent.Cli.exe",
-                    publish_dir / "meta-agent.exe",
-                    publish_dir / "MetaAgent.Cli",
-                    publish_dir / "meta-agent",
-                ]
-                exe_source = next((path for path in candidates if path.exists()), None)
-                if exe_source is None:
-                    raise FileNotFoundError(f"Published executable not found in {publish_dir}")
-
-                packaged_exe_name = "meta-agent.exe" if runtime.startswith("win") else "meta-agent"
-                shutil.copy2(exe_source, package_root / packaged_exe_name)
-                copy_tree(composed_templates_dir, package_root / "templates")
-                copy_tree(repo_root / "meta-agent" / "agents", package_root / "agents")
-                copy_tree(repo_root / "meta-agent" / "schema", package_root / "schema")
-                copy_tree(repo_root / "meta-agent" / "examples", package_root / "examples")
-                create_readme(package_root / "README.txt", version, runtime)
-
-                zip_base = output_dir / artifact_name
-                zip_path = pathlib.Path(shutil.make_archive(str(zip_base), "zip", root_dir=temp_root, base_dir=artifact_name))
-                print(f"Release package created: {zip_path}")
-                generated_zip_paths.append(zip_path)
-
-        checksums_path = write_sha256_sums(output_dir, generated_zip_paths)
+        digests: dict[pathlib.Path, str] = {}
+        with tempfile.TemporaryDirectory(prefix="meta-agent-package-", dir="/tmp") as temp_dir:
+            work_dir = pathlib.Path(temp_dir)
+            # Prepared before any publish so a broken template or missing asset fails fast.
+            shared_assets = prepare_shared_assets(repo_root, work_dir)
+
+            def publish(runtime: str) -> pathlib.Path:
+                runtime_args = argparse.Namespace(**vars(args))
+                runtime_args.runtime = runtime
+                return resolve_publish_dir(runtime_args, repo_root, work_dir)
+
+            # Publishes run in the pool; each runtime is zipped and checksummed
+            # on this thread as soon as its publish finishes.
+            with ThreadPoolExecutor(max_workers=min(args.jobs, len(runtimes))) as pool:
+                futures: dict[Future[pathlib.Path], str] = {pool.submit(publish, runtime): runtime for runtime in runtimes}
+                try:
+                    for future in as_completed(futures):
+                        runtime = futures[future]
+                        artifact_name = args.artifact_name or f"meta-agent-{version}-{runtime}"
+                        zip_path = write_release_zip(
+                            output_dir, artifact_name, runtime, version, future.result(), shared_assets
+                        )
+                        digests[zip_path] = sha256_file(zip_path)
+                        with OUTPUT_LOCK:
+                            print(f"Release package created: {zip_path}", flush=True)
+                        generated_zip_paths.append(zip_path)
+                except BaseException:
+                    for pending in futures:
+                        pending.cancel()
+                    raise
+
+        checksums_path = write_sha256_sums(output_dir, generated_zip_paths, digests)
         print(f"SHA256 checksums written: {checksums_path}")
 
     except Exception as exc:  # noqa: BLE001
@@ -115,6 +115,7 @@ def build_steps(skip_clean_apply: bool, tag: str | None) -> list[list[str]]:
         ["python3", "meta-agent/scripts/test-structurizr-site-wrappers.py"],
         ["python3", "meta-agent/scripts/test-manage-doc-delta.py"],
         ["python3", "meta-agent/scripts/manage-doc-delta.py", "check"],
+        ["python3", "meta-agent/scripts/test-run-regression-harness.py"],
         ["python3", "meta-agent/scripts/check-doc-command-alignment.py"],
         ["python3", "meta-agent/scripts/structurizr-site.py", "generate", "--dry-run"],
         ["python3", "meta-agent/scripts/structurizr-site.py", "serve", "--port", "8080", "--dry-run"],
@@ -10,9 +10,20 @@ import hashlib
 import json
 import os
 import pathlib
+import shutil
+import shlex
+import signal
+import sqlite3
+import statistics
 import subprocess
+import sys
+import tempfile
+import threading
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Callable
 
 
 @dataclass
@@ -21,15 +32,27 @@ class TaskResult:
     description: str
     command: list[str]
     expected_exit_code: int
-    exit_code: int
+    exit_code: int | None
     passed: bool
     duration_ms: int
     stdout_path: str
     stderr_path: str
+    cached: bool = False
+    timed_out: bool = False
+    timeout_seconds: float | None = None
+    stdout_tail: str = ""
+    stderr_tail: str = ""
+    skipped: bool = False
+    blocked_by: str | None = None
 
 
 def parse_args() -> argparse.Namespace:
-    parser = argparse.ArgumentParser(description="Run canonical meta-agent regression harness tasks")
+    # Subcommand options such as `history tasks --task` would otherwise be rejected as
+    # ambiguous abbreviations of top-level options (`--tasks`, `--task-timeout-seconds`).
+    parser = argparse.ArgumentParser(
+        description="Run canonical meta-agent regression harness tasks",
+        allow_abbrev=False,
+    )
     parser.add_argument(
         "--tasks",
         default=str(pathlib.Path(__file__).resolve().parent / "canonical-regression-tasks.json"),
@@ -50,11 +73,123 @@ def parse_args() -> argparse.Namespace:
         default=dt.datetime.now(dt.timezone.utc).strftime("%Y%m%dT%H%M%SZ"),
         help="Explicit run id (defaults to current UTC timestamp)",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of tasks to run concurrently; values above 1 give each task an isolated workspace (default: 1)",
+    )
+    parser.add_argument(
+        "--cli-mode",
+        choices=["prebuilt", "dotnet-run"],
+        default="prebuilt",
+        help="prebuilt: build the CLI once (cached by source hash) and exec the binary per task; "
+        "dotnet-run: invoke `dotnet run` per task (default: prebuilt)",
+    )
+    parser.add_argument(
+        "--cli-command",
+        default=None,
+        help="Command template used instead of the .NET CLI (overrides --cli-mode); placeholders: "
+        "{python}, {repo_root}, {scripts_dir}. Example: '{python} {scripts_dir}/fake-meta-agent-cli.py'",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Execute every task even when a cached passing result matches its inputs",
+    )
+    parser.add_argument(
+        "--cache-max-entries",
+        type=int,
+        default=200,
+        help="Keep at most this many result-cache entries, evicting the least recently used after each run; "
+        "0 disables pruning (default: 200)",
+    )
+    parser.add_argument(
+        "--perf-window",
+        type=int,
+        default=20,
+        help="Number of previous uncached runs per task used for the latency baseline (default: 20)",
+    )
+    parser.add_argument(
+        "--perf-min-samples",
+        type=int,
+        default=5,
+        help="Minimum baseline samples before a task is evaluated for latency regressions (default: 5)",
+    )
+    parser.add_argument(
+        "--perf-threshold-pct",
+        type=float,
+        default=25.0,
+        help="Flag a task when its duration exceeds the baseline median by more than this percent (default: 25)",
+    )
+    parser.add_argument(
+        "--perf-mad-k",
+        type=float,
+        default=3.0,
+        help="Also require the duration to exceed median + k * scaled MAD (default: 3.0)",
+    )
+    parser.add_argument(
+        "--fail-on-perf-regression",
+        action="store_true",
+        help="Exit non-zero when any task latency regresses beyond the perf-drift thresholds",
+    )
+    parser.add_argument(
+        "--task-timeout-seconds",
+        type=float,
+        default=600.0,
+        help="Default per-task timeout when a task has no 'timeout_seconds'; 0 disables (default: 600)",
+    )
+    parser.add_argument(
+        "--log-tail-bytes",
+        type=int,
+        default=4096,
+        help="Bytes of stdout/stderr tail kept in the summary per task (default: 4096)",
+    )
+    parser.add_argument(
+        "--shard",
+        default=None,
+        help="Run only shard i of n (format: i/n, 1-based); combine shard summaries with the `merge` subcommand",
+    )
+    parser.add_argument(
+        "--shard-durations",
+        default=None,
+        help="harness-summary.json whose task durations balance shards; pass the same file on every runner "
+        "(default: stable name hashing)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Benchmark mode: run each task N times in fresh workspaces and write benchmark-report.json",
+    )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=0,
+        help="Benchmark mode: untimed warm-up runs per task before the measured repeats (default: 0)",
+    )
     parser.add_argument(
         "--skip-execute",
         action="store_true",
         help="Skip command execution and only validate/load the manifest",
     )
+    subparsers = parser.add_subparsers(dest="command")
+    history_parser = subparsers.add_parser("history", help="Query harness history trends")
+    history_subparsers = history_parser.add_subparsers(dest="history_command", required=True)
+    pass_rate_parser = history_subparsers.add_parser("pass-rate", help="Run-level pass rate over time (JSON)")
+    pass_rate_parser.add_argument("--limit", type=int, default=50, help="Number of most recent runs (default: 50)")
+    tasks_parser = history_subparsers.add_parser("tasks", help="Per-task pass rate and latency percentiles (JSON)")
+    tasks_parser.add_argument("--task", default=None, help="Restrict output to one task name")
+    tasks_parser.add_argument(
+        "--window",
+        type=int,
+        default=20,
+        help="Number of recent uncached passing runs per task for latency percentiles (default: 20)",
+    )
+    export_parser = history_subparsers.add_parser("export-csv", help="Export run-level history as legacy CSV")
+    export_parser.add_argument("--out", required=True, help="Destination CSV path")
+    merge_parser = subparsers.add_parser("merge", help="Combine per-shard harness summaries into one run")
+    merge_parser.add_argument("summaries", nargs="+", help="Per-shard harness-summary.json files")
     return parser.parse_args()
 
 
@@ -66,6 +201,129 @@ def load_tasks(path: pathlib.Path) -> list[dict[str, Any]]:
     return tasks
 
 
+def task_dependencies(tasks: list[dict[str, Any]]) -> list[list[int]]:
+    """Resolve each task's `depends_on` names to manifest indexes."""
+    index_by_name = {str(task["name"]): index for index, task in enumerate(tasks)}
+    dependencies: list[list[int]] = []
+    for task in tasks:
+        name = str(task["name"])
+        raw = task.get("depends_on", [])
+        if not isinstance(raw, list):
+            raise ValueError(f"Task '{name}' depends_on must be a list of task names")
+        resolved: list[int] = []
+        for dependency in raw:
+            if dependency == name:
+                raise ValueError(f"Task '{name}' cannot depend on itself")
+            if dependency not in index_by_name:
+                raise ValueError(f"Task '{name}' depends on unknown task '{dependency}'")
+            resolved.append(index_by_name[dependency])
+        dependencies.append(resolved)
+    return dependencies
+
+
+def order_tasks(tasks: list[dict[str, Any]]) -> list[int]:
+    """Return a topological execution order that keeps manifest order where dependencies allow."""
+    dependencies = task_dependencies(tasks)
+    remaining = [len(deps) for deps in dependencies]
+    dependents: list[list[int]] = [[] for _ in tasks]
+    for index, deps in enumerate(dependencies):
+        for dependency in deps:
+            dependents[dependency].append(index)
+
+    ready = [index for index, count in enumerate(remaining) if count == 0]
+    order: list[int] = []
+    while ready:
+        index = min(ready)
+        ready.remove(index)
+        order.append(index)
+        for dependent in dependents[index]:
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                ready.append(dependent)
+
+    if len(order) != len(tasks):
+        cyclic = sorted(str(tasks[index]["name"]) for index, count in enumerate(remaining) if count > 0)
+        raise ValueError(f"Task manifest has a depends_on cycle involving: {', '.join(cyclic)}")
+    return order
+
+
+def compute_critical_path(tasks: list[dict[str, Any]], task_results: list[dict[str, Any]]) -> dict[str, Any]:
+    """Longest chain of dependent tasks by recorded duration.
+
+    This is the lower bound on harness wall time no matter how many jobs run.
+    """
+    duration_by_name = {str(result["name"]): int(result["duration_ms"]) for result in task_results}
+    dependencies = task_dependencies(tasks)
+    finish: dict[int, int] = {}
+    previous: dict[int, int | None] = {}
+    for index in order_tasks(tasks):
+        name = str(tasks[index]["name"])
+        if name not in duration_by_name:
+            continue
+        best = max(
+            (dependency for dependency in dependencies[index] if dependency in finish),
+            key=lambda dependency: finish[dependency],
+            default=None,
+        )
+        previous[index] = best
+        finish[index] = duration_by_name[name] + (finish[best] if best is not None else 0)
+
+    if not finish:
+        return {"tasks": [], "duration_ms": 0}
+    tail: int | None = max(finish, key=lambda index: (finish[index], -index))
+    duration_ms = finish[tail]
+    path: list[str] = []
+    while tail is not None:
+        path.append(str(tasks[tail]["name"]))
+        tail = previous[tail]
+    return {"tasks": list(reversed(path)), "duration_ms": duration_ms}
+
+
+def run_task_graph(
+    tasks: list[dict[str, Any]],
+    jobs: int,
+    run_one: Callable[[int], TaskResult],
+    skip_one: Callable[[int, str], TaskResult],
+    report: Callable[[TaskResult], None],
+) -> list[TaskResult]:
+    """Run tasks on `jobs` workers, starting each one once its dependencies finished.
+
+    Tasks whose dependency did not pass (or was itself skipped) are not run;
+    `skip_one` records them instead. With one job this is plain topological
+    order, which equals manifest order for manifests without `depends_on`.
+    """
+    order = order_tasks(tasks)
+    dependencies = task_dependencies(tasks)
+    results: list[TaskResult | None] = [None] * len(tasks)
+    pending = list(order)
+    running: dict[Future[TaskResult], int] = {}
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            for index in list(pending):
+                if len(running) >= jobs:
+                    break
+                dependency_results = [results[dependency] for dependency in dependencies[index]]
+                if any(result is None for result in dependency_results):
+                    continue
+                pending.remove(index)
+                blocker = next((result for result in dependency_results if result is not None and not result.passed), None)
+                if blocker is not None:
+                    results[index] = skip_one(index, blocker.name)
+                    report(results[index])
+                    continue
+                running[pool.submit(run_one, index)] = index
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=lambda item: order.index(running[item])):
+                index = running.pop(future)
+                results[index] = future.result()
+                report(results[index])
+
+    return [result for result in results if result is not None]
+
+
 def write_default_policy(path: pathlib.Path) -> None:
     policy = {
         "name": "harness-policy",
@@ -97,52 +355,320 @@ def write_default_policy(path: pathlib.Path) -> None:
     path.write_text(json.dumps(policy, indent=2) + "\n", encoding="utf-8")
 
 
+def resolve_task_timeout(task: dict[str, Any], default_timeout_seconds: float) -> float | None:
+    raw = task.get("timeout_seconds", default_timeout_seconds)
+    timeout_seconds = float(raw)
+    if timeout_seconds < 0:
+        raise ValueError(f"Task '{task.get('name', '<unknown>')}' has a negative timeout_seconds")
+    return timeout_seconds or None
+
+
+def kill_process_tree(process: subprocess.Popen[bytes]) -> None:
+    try:
+        if os.name == "nt":
+            process.kill()
+        else:
+            # Tasks start in their own session so `dotnet run` children die with the host.
+            os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def run_process(
+    command: list[str],
+    repo_root: pathlib.Path,
+    env: dict[str, str],
+    stdout_path: pathlib.Path,
+    stderr_path: pathlib.Path,
+    timeout_seconds: float | None = None,
+) -> dict[str, Any]:
+    """Run one command, streaming output straight to log files.
+
+    Output never passes through harness memory. On timeout the whole process
+    group is killed. On POSIX the child is reaped with os.wait4, which returns
+    the same rusage that getrusage(RUSAGE_CHILDREN) accumulates, scoped to
+    this one child.
+    """
+    stdout_path.parent.mkdir(parents=True, exist_ok=True)
+    stderr_path.parent.mkdir(parents=True, exist_ok=True)
+    timed_out = threading.Event()
+    with stdout_path.open("wb") as stdout_handle, stderr_path.open("wb") as stderr_handle:
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            command,
+            cwd=str(repo_root),
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=stdout_handle,
+            stderr=stderr_handle,
+            start_new_session=os.name != "nt",
+        )
+
+        def on_timeout() -> None:
+            timed_out.set()
+            kill_process_tree(process)
+
+        timer = threading.Timer(timeout_seconds, on_timeout) if timeout_seconds else None
+        if timer is not None:
+            timer.daemon = True
+            timer.start()
+        cpu_ms: float | None = None
+        max_rss_kb: int | None = None
+        try:
+            if hasattr(os, "wait4"):
+                _, status, usage = os.wait4(process.pid, 0)
+                process.returncode = os.waitstatus_to_exitcode(status)
+                cpu_ms = round((usage.ru_utime + usage.ru_stime) * 1000.0, 3)
+                # ru_maxrss is reported in bytes on macOS and kilobytes on Linux.
+                max_rss_kb = int(usage.ru_maxrss / 1024) if sys.platform == "darwin" else int(usage.ru_maxrss)
+            else:
+                process.wait()
+        finally:
+            if timer is not None:
+                timer.cancel()
+        wall_ms = round((time.perf_counter() - start) * 1000.0, 3)
+    return {
+        "exit_code": process.returncode,
+        "wall_ms": wall_ms,
+        "cpu_ms": cpu_ms,
+        "max_rss_kb": max_rss_kb,
+        "timed_out": timed_out.is_set(),
+    }
+
+
+def read_log_tail(path: pathlib.Path, max_bytes: int) -> str:
+    if max_bytes <= 0 or not path.exists():
+        return ""
+    with path.open("rb") as handle:
+        handle.seek(0, os.SEEK_END)
+        size = handle.tell()
+        handle.seek(max(0, size - max_bytes))
+        return handle.read().decode("utf-8", errors="replace")
+
+
 def execute_task(
     task: dict[str, Any],
     repo_root: pathlib.Path,
-    cli_project: pathlib.Path,
+    cli_command: list[str],
     command_args: list[str],
     env: dict[str, str],
     logs_dir: pathlib.Path,
+    timeout_seconds: float | None = None,
+    log_tail_bytes: int = 4096,
 ) -> TaskResult:
     expected_exit_code = int(task["expected_exit_code"])
     name = str(task["name"])
     description = str(task.get("description", ""))
-    command = ["dotnet", "run", "--project", str(cli_project), "--", *command_args]
-
-    start = dt.datetime.now(dt.timezone.utc)
-    completed = subprocess.run(
-        command,
-        cwd=str(repo_root),
-        env=env,
-        text=True,
-        capture_output=True,
-        check=False,
-    )
-    finish = dt.datetime.now(dt.timezone.utc)
-    duration_ms = int((finish - start).total_seconds() * 1000)
+    command = [*cli_command, *command_args]
 
     stdout_path = logs_dir / f"{name}.stdout.log"
     stderr_path = logs_dir / f"{name}.stderr.log"
-    stdout_path.write_text(completed.stdout or "", encoding="utf-8")
-    stderr_path.write_text(completed.stderr or "", encoding="utf-8")
+    outcome = run_process(command, repo_root, env, stdout_path, stderr_path, timeout_seconds)
+    timed_out = bool(outcome["timed_out"])
 
     return TaskResult(
         name=name,
         description=description,
         command=command,
         expected_exit_code=expected_exit_code,
-        exit_code=completed.returncode,
-        passed=completed.returncode == expected_exit_code,
-        duration_ms=duration_ms,
+        exit_code=outcome["exit_code"],
+        passed=not timed_out and outcome["exit_code"] == expected_exit_code,
+        duration_ms=int(outcome["wall_ms"]),
         stdout_path=str(stdout_path),
         stderr_path=str(stderr_path),
+        timed_out=timed_out,
+        timeout_seconds=timeout_seconds,
+        stdout_tail=read_log_tail(stdout_path, log_tail_bytes),
+        stderr_tail=read_log_tail(stderr_path, log_tail_bytes),
     )
 
 
-def ensure_templates_composed(repo_root: pathlib.Path) -> None:
+COMPOSE_MANIFEST_SUFFIX = ".compose-manifest.json"
+
+
+def run_compose_script(repo_root: pathlib.Path, *extra: str) -> subprocess.CompletedProcess[str]:
     compose_script = repo_root / "meta-agent" / "scripts" / "compose-templates.py"
-    command = ["python3", str(compose_script)]
+    return subprocess.run(
+        ["python3", str(compose_script), "--repo-root", str(repo_root), *extra],
+        cwd=str(repo_root),
+        text=True,
+        capture_output=True,
+        check=False,
+    )
+
+
+def load_compose_source_digests(repo_root: pathlib.Path) -> dict[str, str] | None:
+    """Read each template's source digest from the compose manifests written by compose-templates.py."""
+    meta_agent_root = repo_root / "meta-agent"
+    manifest = json.loads((meta_agent_root / "template-src" / "manifest.json").read_text(encoding="utf-8"))
+    digests: dict[str, str] = {}
+    for name in sorted(manifest.get("templates", {})):
+        path = meta_agent_root / "templates" / f"{name}{COMPOSE_MANIFEST_SUFFIX}"
+        try:
+            digests[name] = str(json.loads(path.read_text(encoding="utf-8"))["source_digest"])
+        except (OSError, ValueError, KeyError):
+            return None
+    return digests
+
+
+def ensure_templates_composed(repo_root: pathlib.Path) -> dict[str, Any]:
+    """Compose templates only when `compose-templates.py --check` reports drift.
+
+    The check short-circuits on current compose manifests and otherwise
+    hashes through compose-templates' persistent digest cache, so unchanged
+    templates are never re-hashed here. The manifests' source digests then
+    stand in for the composed tree in result-cache keys.
+    """
+    started = time.perf_counter()
+    digests = load_compose_source_digests(repo_root)
+    skipped = digests is not None and run_compose_script(repo_root, "--check").returncode == 0
+    if not skipped:
+        completed = run_compose_script(repo_root)
+        if completed.returncode != 0:
+            raise RuntimeError(
+                "template composition failed before regression harness execution:\n"
+                f"$ {' '.join(completed.args)}\n"
+                f"stdout:\n{completed.stdout}\n"
+                f"stderr:\n{completed.stderr}"
+            )
+        digests = load_compose_source_digests(repo_root)
+        if digests is None:
+            raise RuntimeError("compose-templates.py did not write a compose manifest for every template")
+    return {
+        "skipped": skipped,
+        "reason": "compose-templates.py --check reports composed templates current"
+        if skipped
+        else "composed templates missing, stale or without compose manifests",
+        "source_digests": digests,
+        "templates_hash": hashlib.sha256(json.dumps(digests, sort_keys=True).encode("utf-8")).hexdigest(),
+        "duration_ms": int((time.perf_counter() - started) * 1000),
+    }
+
+
+CLI_SOURCE_PROJECTS = ("MetaAgent.Cli", "MetaAgent.Core")
+CLI_BUILD_INFO_FILE = "build-info.json"
+
+
+def compute_cli_source_hash(dotnet_root: pathlib.Path) -> str:
+    """Hash the CLI and Core project sources (excluding bin/obj) plus the SDK version."""
+    digest = hashlib.sha256()
+    sdk = subprocess.run(["dotnet", "--version"], text=True, capture_output=True, check=False)
+    digest.update(f"sdk:{sdk.stdout.strip()}\n".encode("utf-8"))
+    for project in CLI_SOURCE_PROJECTS:
+        project_dir = dotnet_root / project
+        for dirpath, dirnames, filenames in os.walk(project_dir):
+            dirnames[:] = sorted(d for d in dirnames if d not in {"bin", "obj"})
+            for filename in sorted(filenames):
+                path = pathlib.Path(dirpath) / filename
+                digest.update(path.relative_to(dotnet_root).as_posix().encode("utf-8") + b"\0")
+                digest.update(hashlib.sha256(path.read_bytes()).digest())
+    return digest.hexdigest()
+
+
+def find_cli_binary(build_dir: pathlib.Path) -> list[str] | None:
+    apphost = build_dir / ("MetaAgent.Cli.exe" if os.name == "nt" else "MetaAgent.Cli")
+    if apphost.is_file():
+        return [str(apphost)]
+    dll = build_dir / "MetaAgent.Cli.dll"
+    if dll.is_file():
+        return ["dotnet", str(dll)]
+    return None
+
+
+def time_command(command: list[str], repo_root: pathlib.Path, env: dict[str, str]) -> int:
+    start = time.perf_counter()
+    subprocess.run(command, cwd=str(repo_root), env=env, capture_output=True, check=False)
+    return int((time.perf_counter() - start) * 1000)
+
+
+def probe_startup(
+    repo_root: pathlib.Path,
+    cli_project: pathlib.Path,
+    cli_command: list[str],
+    env: dict[str, str],
+    warm_up: bool = False,
+) -> dict[str, Any]:
+    """Time one `version` call through `dotnet run` and through the built binary.
+
+    Without `warm_up` this is a single `dotnet run`, which may include the
+    project's first incremental build; benchmark mode adds an untimed run first
+    so the measurement reflects the steady-state up-to-date check.
+    """
+    with tempfile.TemporaryDirectory(prefix="meta-agent-harness-probe-") as probe_dir:
+        version_args = ["version", "--output", probe_dir]
+        dotnet_run = ["dotnet", "run", "--project", str(cli_project), "--", *version_args]
+        if warm_up:
+            time_command(dotnet_run, repo_root, env)
+        dotnet_run_ms = time_command(dotnet_run, repo_root, env)
+        binary_ms = time_command([*cli_command, *version_args], repo_root, env)
+    return {
+        "dotnet_run_ms": dotnet_run_ms,
+        "binary_ms": binary_ms,
+        "savings_per_invocation_ms": dotnet_run_ms - binary_ms,
+        "warmed_up": warm_up,
+    }
+
+
+def ensure_cli_binary(
+    repo_root: pathlib.Path,
+    cli_project: pathlib.Path,
+    cache_root: pathlib.Path,
+    env: dict[str, str],
+    warm_probe: bool = False,
+) -> tuple[list[str], dict[str, Any]]:
+    """Build the CLI once per source hash and return the command prefix to exec it.
+
+    Build output and the startup probe are cached under `cache_root/<hash>/`.
+    The probe runs once per build with a single `dotnet run`; `warm_probe`
+    (benchmark mode) replaces an unwarmed probe with a warmed-up measurement.
+    """
+    source_hash = compute_cli_source_hash(cli_project.parent)
+    build_dir = cache_root / source_hash[:16]
+    info_path = build_dir / CLI_BUILD_INFO_FILE
+
+    if info_path.exists():
+        cli_command = find_cli_binary(build_dir)
+        if cli_command is not None:
+            info = json.loads(info_path.read_text(encoding="utf-8"))
+            cached_probe = info.get("startup_probe")
+            if not isinstance(cached_probe, dict) or (warm_probe and not cached_probe.get("warmed_up")):
+                info["startup_probe"] = probe_startup(repo_root, cli_project, cli_command, env, warm_probe)
+                info_path.write_text(json.dumps(info, indent=2) + "\n", encoding="utf-8")
+            info["cache_hit"] = True
+            return cli_command, info
+
+    if build_dir.exists():
+        shutil.rmtree(build_dir)
+    command = ["dotnet", "build", str(cli_project), "-c", "Release", "-o", str(build_dir), "-v", "quiet", "-nologo"]
+    start = time.perf_counter()
+    completed = subprocess.run(command, cwd=str(repo_root), text=True, capture_output=True, check=False)
+    build_ms = int((time.perf_counter() - start) * 1000)
+    if completed.returncode != 0:
+        raise RuntimeError(
+            "CLI build failed before regression harness execution:\n"
+            f"$ {' '.join(command)}\n"
+            f"stdout:\n{completed.stdout}\n"
+            f"stderr:\n{completed.stderr}"
+        )
+    cli_command = find_cli_binary(build_dir)
+    if cli_command is None:
+        raise FileNotFoundError(f"Built CLI binary not found in {build_dir}")
+
+    info: dict[str, Any] = {
+        "source_hash": source_hash,
+        "build_dir": str(build_dir),
+        "build_ms": build_ms,
+        "startup_probe": probe_startup(repo_root, cli_project, cli_command, env, warm_probe),
+    }
+    info_path.write_text(json.dumps(info, indent=2) + "\n", encoding="utf-8")
+    info["cache_hit"] = False
+    return cli_command, info
+
+
+def build_cli_project(repo_root: pathlib.Path, cli_project: pathlib.Path) -> None:
+    # Concurrent `dotnet run` invocations race on the shared bin/obj outputs,
+    # so parallel runs build once up front and then run with --no-build.
+    command = ["dotnet", "build", str(cli_project), "-v", "quiet", "-nologo"]
     completed = subprocess.run(
         command,
         cwd=str(repo_root),
@@ -152,29 +678,489 @@ def ensure_templates_composed(repo_root: pathlib.Path) -> None:
     )
     if completed.returncode != 0:
         raise RuntimeError(
-            "template composition failed before regression harness execution:\n"
+            "CLI build failed before parallel regression harness execution:\n"
             f"$ {' '.join(command)}\n"
             f"stdout:\n{completed.stdout}\n"
             f"stderr:\n{completed.stderr}"
         )
 
 
+def resolve_cli_command_template(template: str, repo_root: pathlib.Path) -> tuple[list[str], dict[str, Any]]:
+    """Expand a `--cli-command` template into an argv prefix plus build info.
+
+    The source hash covers the expanded command and the contents of every
+    argument that names an existing file, so editing a stand-in script
+    invalidates cached task results just like a CLI source change would.
+    """
+    placeholders = {
+        "python": sys.executable,
+        "repo_root": str(repo_root),
+        "scripts_dir": str(repo_root / "meta-agent" / "scripts"),
+    }
+    command = [token.format(**placeholders) for token in shlex.split(template)]
+    if not command:
+        raise ValueError("--cli-command must not be empty")
+
+    digest = hashlib.sha256()
+    for token in command:
+        digest.update(token.encode("utf-8") + b"\0")
+        path = pathlib.Path(token)
+        if path.is_file():
+            digest.update(path.read_bytes())
+    return command, {"command": command, "source_hash": digest.hexdigest()}
+
+
 def load_metrics(metrics_path: pathlib.Path) -> dict[str, Any]:
     if not metrics_path.exists():
         return {}
     return json.loads(metrics_path.read_text(encoding="utf-8"))
 
 
+METRICS_COUNTER_FIELDS = (
+    "totalRuns",
+    "successfulRuns",
+    "failedRuns",
+    "reworkRuns",
+    "clarificationRuns",
+    "totalTokensRequested",
+    "defectLeakageIncidents",
+    "totalAcceptedSolutions",
+    "totalRunsAtAcceptance",
+    "runsSinceLastAccepted",
+)
+
+
+def merge_metrics(parts: list[dict[str, Any]]) -> dict[str, Any]:
+    """Combine per-task metrics scoreboards into one scoreboard.
+
+    Counters are summed and derived rates recomputed the same way
+    MetricsScoreboard.Apply does. The init->validate leakage proxy only
+    fires within a single scoreboard, so isolated tasks cannot trigger it
+    across task boundaries; history and drift therefore record the run's
+    isolation mode and only compare runs of the same mode.
+    """
+    parts = [part for part in parts if part]
+    if not parts:
+        return {}
+
+    merged: dict[str, Any] = {
+        "version": str(parts[0].get("version", "1")),
+        "lastUpdatedUtc": max(str(part.get("lastUpdatedUtc", "")) for part in parts),
+    }
+    for field in METRICS_COUNTER_FIELDS:
+        merged[field] = sum(int(part.get(field, 0) or 0) for part in parts)
+    merged["pendingPostChangeValidation"] = any(bool(part.get("pendingPostChangeValidation")) for part in parts)
+
+    total_runs = merged["totalRuns"]
+    successful_runs = merged["successfulRuns"]
+    accepted = merged["totalAcceptedSolutions"]
+    merged["successRate"] = successful_runs / total_runs if total_runs else 0.0
+    merged["reworkRate"] = merged["reworkRuns"] / total_runs if total_runs else 0.0
+    merged["clarificationRate"] = merged["clarificationRuns"] / total_runs if total_runs else 0.0
+    merged["tokenCostPerSuccess"] = merged["totalTokensRequested"] / successful_runs if successful_runs else 0.0
+    merged["timeToAcceptedSolution"] = merged["totalRunsAtAcceptance"] / accepted if accepted else 0.0
+    return merged
+
+
+def prepare_workspace(workspace_dir: pathlib.Path) -> pathlib.Path:
+    workspace_dir.mkdir(parents=True, exist_ok=True)
+    (workspace_dir / "existing-repo").mkdir(parents=True, exist_ok=True)
+    policy_path = workspace_dir / ".meta-agent-policy.json"
+    write_default_policy(policy_path)
+    return policy_path
+
+
+def build_task_context(
+    task: dict[str, Any],
+    run_dir: pathlib.Path,
+    run_id: str,
+    seed_workspace_dir: pathlib.Path,
+    isolated: bool,
+    task_root: pathlib.Path | None = None,
+    dependency_workspace_dirs: list[pathlib.Path] | None = None,
+) -> dict[str, str]:
+    """Resolve the manifest placeholders for one task.
+
+    Shared mode reuses the run-level workspace/artifacts so tasks observe each
+    other's state in execution order. Isolated mode copies the seeded workspace
+    (including the policy file) into `tasks/<name>/` so concurrent tasks never
+    write to the same paths; the workspaces of `depends_on` tasks are layered
+    on top, in manifest order, so dependents start from their dependencies' state.
+    """
+    if isolated:
+        task_root = task_root or run_dir / "tasks" / str(task["name"])
+        workspace_dir = task_root / "workspace"
+        artifacts_dir = task_root / "artifacts"
+        if task_root.exists():
+            shutil.rmtree(task_root)
+        shutil.copytree(seed_workspace_dir, workspace_dir)
+        for dependency_workspace_dir in dependency_workspace_dirs or []:
+            shutil.copytree(dependency_workspace_dir, workspace_dir, dirs_exist_ok=True)
+        artifacts_dir.mkdir(parents=True, exist_ok=True)
+    else:
+        workspace_dir = seed_workspace_dir
+        artifacts_dir = run_dir / "artifacts"
+
+    return {
+        "workspace_dir": str(workspace_dir),
+        "artifacts_dir": str(artifacts_dir),
+        "policy_path": str(workspace_dir / ".meta-agent-policy.json"),
+        "metrics_path": str(artifacts_dir / "metrics-scoreboard.json"),
+        "run_id": run_id,
+    }
+
+
+def format_command_args(task: dict[str, Any], ctx: dict[str, str]) -> list[str]:
+    raw_args = task.get("args", [])
+    if not isinstance(raw_args, list) or not raw_args:
+        raise ValueError(f"Task '{task.get('name', '<unknown>')}' must include a non-empty args list")
+    return [str(arg).format(**ctx) for arg in raw_args]
+
+
 def compute_task_signature(tasks: list[dict[str, Any]]) -> str:
     canonical = json.dumps(tasks, sort_keys=True, separators=(",", ":"))
     return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
 
 
-def append_history(history_csv: pathlib.Path, summary: dict[str, Any], task_signature: str) -> None:
-    history_csv.parent.mkdir(parents=True, exist_ok=True)
-    write_header = not history_csv.exists()
+def compute_cache_keys(
+    tasks: list[dict[str, Any]],
+    cli_hash: str,
+    templates_hash: str,
+    policy_hash: str,
+    isolated: bool,
+) -> list[str]:
+    """Derive one content-addressed result-cache key per task, in manifest order.
+
+    In shared mode every task can observe state left by earlier tasks, so each
+    key also chains the key of the task executed before it: a hit for a task
+    implies everything before it ran with identical inputs too. In isolated
+    mode a task only sees its `depends_on` workspaces, so only those keys chain.
+    """
+    dependencies = task_dependencies(tasks)
+    keys: list[str] = [""] * len(tasks)
+    previous = ""
+    for index in order_tasks(tasks):
+        chained = ",".join(keys[dependency] for dependency in dependencies[index]) if isolated else previous
+        material = json.dumps(
+            {
+                "task": compute_task_signature([tasks[index]]),
+                "cli": cli_hash,
+                "templates": templates_hash,
+                "policy": policy_hash,
+                "isolation": "per_task" if isolated else "shared",
+                "previous": chained,
+            },
+            sort_keys=True,
+        )
+        previous = hashlib.sha256(material.encode("utf-8")).hexdigest()
+        keys[index] = previous
+    return keys
+
+
+def task_state_dirs(ctx: dict[str, str]) -> dict[str, pathlib.Path]:
+    return {
+        "workspace": pathlib.Path(ctx["workspace_dir"]),
+        "artifacts": pathlib.Path(ctx["artifacts_dir"]),
+    }
+
+
+def cache_entry_dir(cache_root: pathlib.Path, key: str) -> pathlib.Path:
+    return cache_root / key[:2] / key
+
+
+def copy_with_run_dir(source: pathlib.Path, target: pathlib.Path, old_run_dir: str, new_run_dir: str) -> None:
+    """Copy one file, rewriting absolute paths into the producing run to the restoring run."""
+    data = pathlib.Path(source).read_bytes()
+    old, new = old_run_dir.encode("utf-8"), new_run_dir.encode("utf-8")
+    if old != new and old in data:
+        pathlib.Path(target).write_bytes(data.replace(old, new))
+        shutil.copystat(source, target)
+    else:
+        shutil.copy2(source, target)
+
+
+def store_cached_result(
+    cache_root: pathlib.Path,
+    key: str,
+    result: TaskResult,
+    ctx: dict[str, str],
+    run_dir: pathlib.Path,
+) -> None:
+    entry_dir = cache_entry_dir(cache_root, key)
+    if entry_dir.exists():
+        return
+    entry_dir.parent.mkdir(parents=True, exist_ok=True)
+    staging = pathlib.Path(tempfile.mkdtemp(prefix=f".{key[:12]}-", dir=entry_dir.parent))
+    try:
+        shutil.copy2(result.stdout_path, staging / "stdout.log")
+        shutil.copy2(result.stderr_path, staging / "stderr.log")
+        for label, source in task_state_dirs(ctx).items():
+            if source.exists():
+                shutil.copytree(source, staging / "state" / label)
+        (staging / "result.json").write_text(
+            json.dumps(
+                {
+                    "key": key,
+                    "name": result.name,
+                    "exit_code": result.exit_code,
+                    "duration_ms": result.duration_ms,
+                    "run_dir": str(run_dir),
+                    "stored_at_utc": dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                },
+                indent=2,
+            )
+            + "\n",
+            encoding="utf-8",
+        )
+        staging.rename(entry_dir)
+    except OSError:
+        # Another worker may have stored the same key first; the cache is best-effort.
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def restore_cached_result(
+    cache_root: pathlib.Path,
+    key: str,
+    task: dict[str, Any],
+    command: list[str],
+    ctx: dict[str, str],
+    logs_dir: pathlib.Path,
+    run_dir: pathlib.Path,
+    log_tail_bytes: int = 4096,
+) -> TaskResult | None:
+    """Restore a cached passing result into the current run.
+
+    Logs and workspace/artifacts files that embed the producing run's
+    directory are rewritten to point at `run_dir`, and the entry's mtime is
+    refreshed so `prune_result_cache` evicts least recently used entries first.
+    """
+    entry_dir = cache_entry_dir(cache_root, key)
+    result_path = entry_dir / "result.json"
+    if not result_path.exists():
+        return None
+    cached = json.loads(result_path.read_text(encoding="utf-8"))
+    expected_exit_code = int(task["expected_exit_code"])
+    if int(cached["exit_code"]) != expected_exit_code:
+        return None
+
+    start = time.perf_counter()
+    os.utime(result_path)
+    name = str(task["name"])
+    stdout_path = logs_dir / f"{name}.stdout.log"
+    stderr_path = logs_dir / f"{name}.stderr.log"
+
+    stored_run_dir = str(cached.get("run_dir", run_dir))
+
+    def copy_function(source: Any, target: Any) -> None:
+        copy_with_run_dir(pathlib.Path(source), pathlib.Path(target), stored_run_dir, str(run_dir))
+
+    copy_function(entry_dir / "stdout.log", stdout_path)
+    copy_function(entry_dir / "stderr.log", stderr_path)
+    # Restore the post-task workspace/artifacts so later tasks and the
+    # metrics merge see the same state a real execution would have left.
+    for label, target in task_state_dirs(ctx).items():
+        snapshot = entry_dir / "state" / label
+        if not snapshot.exists():
+            continue
+        if target.exists():
+            shutil.rmtree(target)
+        shutil.copytree(snapshot, target, copy_function=copy_function)
+
+    return TaskResult(
+        name=name,
+        description=str(task.get("description", "")),
+        command=command,
+        expected_exit_code=expected_exit_code,
+        exit_code=int(cached["exit_code"]),
+        passed=True,
+        duration_ms=int((time.perf_counter() - start) * 1000),
+        stdout_path=str(stdout_path),
+        stderr_path=str(stderr_path),
+        cached=True,
+        stdout_tail=read_log_tail(stdout_path, log_tail_bytes),
+        stderr_tail=read_log_tail(stderr_path, log_tail_bytes),
+    )
+
 
-    row = [
+def prune_result_cache(cache_root: pathlib.Path, max_entries: int) -> int:
+    """Evict the least recently stored or restored entries beyond `max_entries`; returns the count removed."""
+    if max_entries <= 0 or not cache_root.exists():
+        return 0
+    entries = [path for path in cache_root.glob("*/*") if path.is_dir() and not path.name.startswith(".")]
+    if len(entries) <= max_entries:
+        return 0
+
+    def last_used(entry: pathlib.Path) -> float:
+        try:
+            return (entry / "result.json").stat().st_mtime
+        except FileNotFoundError:
+            return 0.0
+
+    entries.sort(key=last_used)
+    stale = entries[: len(entries) - max_entries]
+    for entry in stale:
+        shutil.rmtree(entry, ignore_errors=True)
+    return len(stale)
+
+
+def describe_samples(values: list[float]) -> dict[str, float]:
+    return {
+        "min": round(min(values), 3),
+        "median": round(statistics.median(values), 3),
+        "p95": round(percentile(values, 95.0), 3),
+        "max": round(max(values), 3),
+        "stddev": round(statistics.stdev(values), 3) if len(values) > 1 else 0.0,
+    }
+
+
+def run_benchmark(
+    tasks: list[dict[str, Any]],
+    repo_root: pathlib.Path,
+    run_dir: pathlib.Path,
+    run_id: str,
+    seed_workspace_dir: pathlib.Path,
+    cli_command: list[str],
+    env: dict[str, str],
+    repeat: int,
+    warmup: int,
+    default_timeout_seconds: float,
+) -> dict[str, Any]:
+    """Run every task `warmup + repeat` times, each in a fresh isolated workspace.
+
+    Samples run sequentially so timings and resource usage are not skewed by
+    concurrently running tasks. Tasks run in dependency order and dependents
+    are seeded from the last sample workspace of each of their dependencies.
+    """
+    bench_root = run_dir / "benchmark"
+    dependencies = task_dependencies(tasks)
+    final_workspaces: dict[int, pathlib.Path] = {}
+    task_reports: list[dict[str, Any]] = []
+    for index in order_tasks(tasks):
+        task = tasks[index]
+        name = str(task["name"])
+        expected_exit_code = int(task["expected_exit_code"])
+        samples: list[dict[str, Any]] = []
+        for iteration in range(warmup + repeat):
+            is_warmup = iteration < warmup
+            label = f"warmup-{iteration + 1}" if is_warmup else f"sample-{iteration - warmup + 1}"
+            sample_root = bench_root / name / label
+            ctx = build_task_context(
+                task,
+                run_dir,
+                run_id,
+                seed_workspace_dir,
+                True,
+                task_root=sample_root,
+                dependency_workspace_dirs=[final_workspaces[dependency] for dependency in dependencies[index]],
+            )
+            final_workspaces[index] = pathlib.Path(ctx["workspace_dir"])
+            command = [*cli_command, *format_command_args(task, ctx)]
+            measured = run_process(
+                command,
+                repo_root,
+                env,
+                sample_root / "stdout.log",
+                sample_root / "stderr.log",
+                resolve_task_timeout(task, default_timeout_seconds),
+            )
+            if is_warmup:
+                continue
+            measured["passed"] = not measured["timed_out"] and measured["exit_code"] == expected_exit_code
+            samples.append(measured)
+
+        wall = [sample["wall_ms"] for sample in samples]
+        cpu = [sample["cpu_ms"] for sample in samples if sample["cpu_ms"] is not None]
+        rss = [sample["max_rss_kb"] for sample in samples if sample["max_rss_kb"] is not None]
+        task_reports.append(
+            {
+                "name": name,
+                "expected_exit_code": expected_exit_code,
+                "all_passed": all(sample["passed"] for sample in samples),
+                "wall_ms": describe_samples(wall),
+                "cpu_ms": describe_samples(cpu) if cpu else None,
+                "max_rss_kb": max(rss) if rss else None,
+                "samples": samples,
+            }
+        )
+        wall_stats = task_reports[-1]["wall_ms"]
+        print(
+            f"[BENCH] {name}: median {wall_stats['median']} ms, p95 {wall_stats['p95']} ms, "
+            f"stddev {wall_stats['stddev']} ms over {repeat} runs"
+        )
+
+    return {
+        "run_id": run_id,
+        "timestamp_utc": dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "repeat": repeat,
+        "warmup": warmup,
+        "task_signature": compute_task_signature(tasks),
+        "tasks": task_reports,
+    }
+
+
+HISTORY_FIELDS = [
+    "run_id",
+    "timestamp_utc",
+    "tasks_total",
+    "tasks_passed",
+    "tasks_failed",
+    "expected_failures",
+    "unexpected_failures",
+    "pass_rate",
+    "metrics_total_runs",
+    "metrics_successful_runs",
+    "metrics_failed_runs",
+    "metrics_clarification_runs",
+    "metrics_defect_leakage_incidents",
+    "metrics_token_cost_per_success",
+    "metrics_time_to_accepted_solution",
+    "task_signature_sha256",
+]
+# Execution-mode columns added after the legacy CSV layout. Isolated (`--jobs`
+# > 1) and shard-merged runs sum per-task scoreboards, and task latency depends
+# on how the CLI is invoked and how many tasks share the machine, so drift and
+# perf baselines only compare runs executed the same way.
+RUN_MODE_COLUMNS = {
+    "jobs": "INTEGER NOT NULL DEFAULT 1",
+    "isolation": "TEXT NOT NULL DEFAULT 'shared'",
+    "cli_mode": "TEXT NOT NULL DEFAULT 'unknown'",
+}
+HISTORY_DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    timestamp_utc TEXT NOT NULL,
+    tasks_total INTEGER NOT NULL,
+    tasks_passed INTEGER NOT NULL,
+    tasks_failed INTEGER NOT NULL,
+    expected_failures INTEGER NOT NULL,
+    unexpected_failures INTEGER NOT NULL,
+    pass_rate REAL NOT NULL,
+    metrics_total_runs INTEGER NOT NULL,
+    metrics_successful_runs INTEGER NOT NULL,
+    metrics_failed_runs INTEGER NOT NULL,
+    metrics_clarification_runs INTEGER NOT NULL,
+    metrics_defect_leakage_incidents INTEGER NOT NULL,
+    metrics_token_cost_per_success REAL NOT NULL,
+    metrics_time_to_accepted_solution REAL NOT NULL,
+    task_signature_sha256 TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_run_id ON runs (run_id);
+CREATE TABLE IF NOT EXISTS task_runs (
+    run_seq INTEGER NOT NULL REFERENCES runs (seq),
+    task_name TEXT NOT NULL,
+    exit_code INTEGER,
+    duration_ms INTEGER NOT NULL,
+    passed INTEGER NOT NULL,
+    cached INTEGER NOT NULL DEFAULT 0,
+    timed_out INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_task_runs_task ON task_runs (task_name, run_seq);
+"""
+
+
+def history_row(summary: dict[str, Any], task_signature: str) -> list[Any]:
+    return [
         summary["run_id"],
         summary["timestamp_utc"],
         summary["tasks_total"],
@@ -182,54 +1168,619 @@ def append_history(history_csv: pathlib.Path, summary: dict[str, Any], task_sign
         summary["tasks_failed"],
         summary["expected_failures"],
         summary["unexpected_failures"],
-        f"{summary['pass_rate']:.4f}",
+        round(float(summary["pass_rate"]), 4),
         summary["metrics"].get("totalRuns", 0),
         summary["metrics"].get("successfulRuns", 0),
         summary["metrics"].get("failedRuns", 0),
         summary["metrics"].get("clarificationRuns", 0),
         summary["metrics"].get("defectLeakageIncidents", 0),
-        f"{summary['metrics'].get('tokenCostPerSuccess', 0.0):.4f}",
-        f"{summary['metrics'].get('timeToAcceptedSolution', 0.0):.4f}",
+        round(float(summary["metrics"].get("tokenCostPerSuccess", 0.0)), 4),
+        round(float(summary["metrics"].get("timeToAcceptedSolution", 0.0)), 4),
         task_signature,
     ]
 
-    with history_csv.open("a", newline="", encoding="utf-8") as handle:
+
+def run_mode_row(summary: dict[str, Any]) -> list[Any]:
+    return [
+        int(summary.get("jobs", 1)),
+        str(summary.get("isolation", "shared")),
+        str(summary.get("cli_mode", "unknown")),
+    ]
+
+
+def migrate_history_db(conn: sqlite3.Connection) -> None:
+    existing = {row["name"] for row in conn.execute("PRAGMA table_info(runs)")}
+    for column, definition in RUN_MODE_COLUMNS.items():
+        if column not in existing:
+            conn.execute(f"ALTER TABLE runs ADD COLUMN {column} {definition}")
+
+
+def import_legacy_csv_history(conn: sqlite3.Connection, history_dir: pathlib.Path) -> None:
+    """Seed an empty history database from the CSV files earlier harness versions wrote."""
+    history_csv = history_dir / "harness-history.csv"
+    if not history_csv.exists():
+        return
+    placeholders = ", ".join("?" for _ in HISTORY_FIELDS)
+    seq_by_run_id: dict[str, int] = {}
+    with history_csv.open("r", newline="", encoding="utf-8") as handle:
+        for row in csv.DictReader(handle):
+            cursor = conn.execute(
+                f"INSERT INTO runs ({', '.join(HISTORY_FIELDS)}) VALUES ({placeholders})",
+                [row.get(field) or 0 for field in HISTORY_FIELDS],
+            )
+            seq_by_run_id[row["run_id"]] = int(cursor.lastrowid)
+
+    durations_csv = history_dir / "task-durations.csv"
+    if durations_csv.exists():
+        with durations_csv.open("r", newline="", encoding="utf-8") as handle:
+            for row in csv.DictReader(handle):
+                run_seq = seq_by_run_id.get(row["run_id"])
+                if run_seq is None:
+                    continue
+                conn.execute(
+                    "INSERT INTO task_runs (run_seq, task_name, duration_ms, passed, cached) VALUES (?, ?, ?, ?, ?)",
+                    (run_seq, row["task_name"], int(row["duration_ms"]), int(row["passed"]), int(row["cached"])),
+                )
+
+
+def open_history_db(history_db: pathlib.Path) -> sqlite3.Connection:
+    history_db.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(history_db))
+    conn.row_factory = sqlite3.Row
+    with conn:
+        conn.executescript(HISTORY_DB_SCHEMA)
+        migrate_history_db(conn)
+        if conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0] == 0:
+            import_legacy_csv_history(conn, history_db.parent)
+    return conn
+
+
+def record_history(conn: sqlite3.Connection, summary: dict[str, Any], task_signature: str) -> None:
+    fields = [*HISTORY_FIELDS, *RUN_MODE_COLUMNS]
+    placeholders = ", ".join("?" for _ in fields)
+    with conn:
+        cursor = conn.execute(
+            f"INSERT INTO runs ({', '.join(fields)}) VALUES ({placeholders})",
+            [*history_row(summary, task_signature), *run_mode_row(summary)],
+        )
+        run_seq = int(cursor.lastrowid)
+        conn.executemany(
+            "INSERT INTO task_runs (run_seq, task_name, exit_code, duration_ms, passed, cached, timed_out) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    run_seq,
+                    task["name"],
+                    task.get("exit_code"),
+                    int(task["duration_ms"]),
+                    int(bool(task["passed"])),
+                    int(bool(task.get("cached", False))),
+                    int(bool(task.get("timed_out", False))),
+                )
+                for task in summary["task_results"]
+            ],
+        )
+
+
+def load_latest_run(conn: sqlite3.Connection, isolation: str) -> dict[str, Any] | None:
+    """Return the most recent run recorded with the same isolation mode."""
+    row = conn.execute(
+        f"SELECT {', '.join([*HISTORY_FIELDS, *RUN_MODE_COLUMNS])} FROM runs "
+        "WHERE isolation = ? ORDER BY seq DESC LIMIT 1",
+        (isolation,),
+    ).fetchone()
+    return dict(row) if row is not None else None
+
+
+def load_task_duration_history(
+    conn: sqlite3.Connection,
+    window: int,
+    cli_mode: str | None = None,
+    jobs: int | None = None,
+) -> dict[str, list[int]]:
+    """Return the most recent `window` uncached, passing durations per task (oldest first).
+
+    `cli_mode`/`jobs` restrict the samples to runs recorded with the same CLI
+    invocation mode and concurrency, so perf baselines compare like with like.
+    """
+    mode_filter = ""
+    params: list[Any] = []
+    if cli_mode is not None:
+        mode_filter += " AND runs.cli_mode = ?"
+        params.append(cli_mode)
+    if jobs is not None:
+        mode_filter += " AND runs.jobs = ?"
+        params.append(jobs)
+    rows = conn.execute(
+        f"""
+        SELECT task_name, duration_ms FROM (
+            SELECT task_runs.task_name, task_runs.duration_ms, task_runs.run_seq,
+                   ROW_NUMBER() OVER (PARTITION BY task_runs.task_name ORDER BY task_runs.run_seq DESC) AS recency
+            FROM task_runs JOIN runs ON runs.seq = task_runs.run_seq
+            WHERE task_runs.cached = 0 AND task_runs.passed = 1{mode_filter}
+        )
+        WHERE recency <= ?
+        ORDER BY task_name, run_seq
+        """,
+        [*params, window],
+    ).fetchall()
+    history: dict[str, list[int]] = {}
+    for row in rows:
+        history.setdefault(row["task_name"], []).append(int(row["duration_ms"]))
+    return history
+
+
+def query_pass_rate_trend(conn: sqlite3.Connection, limit: int) -> list[dict[str, Any]]:
+    rows = conn.execute(
+        """
+        SELECT run_id, timestamp_utc, tasks_total, tasks_passed, unexpected_failures, pass_rate
+        FROM runs ORDER BY seq DESC LIMIT ?
+        """,
+        (limit,),
+    ).fetchall()
+    return [dict(row) for row in reversed(rows)]
+
+
+def query_task_trends(conn: sqlite3.Connection, window: int, task_name: str | None) -> list[dict[str, Any]]:
+    """Per-task pass rate and latency percentiles, one row per task, CLI mode and jobs value.
+
+    Latency samples never mix CLI invocation modes or concurrency levels, the
+    same grouping `perf_drift` baselines use.
+    """
+    params: list[Any] = []
+    task_filter = ""
+    if task_name is not None:
+        task_filter = "WHERE task_runs.task_name = ?"
+        params.append(task_name)
+    counts = conn.execute(
+        f"""
+        SELECT task_runs.task_name AS task_name, runs.cli_mode AS cli_mode, runs.jobs AS jobs, COUNT(*) AS runs,
+               SUM(task_runs.passed) AS passed, SUM(task_runs.cached) AS cached, SUM(task_runs.timed_out) AS timed_out
+        FROM task_runs JOIN runs ON runs.seq = task_runs.run_seq {task_filter}
+        GROUP BY task_runs.task_name, runs.cli_mode, runs.jobs
+        ORDER BY task_runs.task_name, runs.cli_mode, runs.jobs
+        """,
+        params,
+    ).fetchall()
+
+    durations_by_mode: dict[tuple[str, int], dict[str, list[int]]] = {}
+    trends: list[dict[str, Any]] = []
+    for row in counts:
+        mode = (row["cli_mode"], int(row["jobs"]))
+        if mode not in durations_by_mode:
+            durations_by_mode[mode] = load_task_duration_history(conn, window, *mode)
+        samples = durations_by_mode[mode].get(row["task_name"], [])
+        trends.append(
+            {
+                "task_name": row["task_name"],
+                "cli_mode": row["cli_mode"],
+                "jobs": row["jobs"],
+                "runs": row["runs"],
+                "pass_rate": round(row["passed"] / row["runs"], 4) if row["runs"] else 0.0,
+                "cached_runs": row["cached"],
+                "timed_out_runs": row["timed_out"],
+                "window_samples": len(samples),
+                "median_ms": round(statistics.median(samples), 3) if samples else None,
+                "p95_ms": round(percentile(samples, 95.0), 3) if samples else None,
+            }
+        )
+    return trends
+
+
+def export_history_csv(conn: sqlite3.Connection, destination: pathlib.Path) -> int:
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with destination.open("w", newline="", encoding="utf-8") as handle:
         writer = csv.writer(handle)
-        if write_header:
-            writer.writerow(
-                [
-                    "run_id",
-                    "timestamp_utc",
-                    "tasks_total",
-                    "tasks_passed",
-                    "tasks_failed",
-                    "expected_failures",
-                    "unexpected_failures",
-                    "pass_rate",
-                    "metrics_total_runs",
-                    "metrics_successful_runs",
-                    "metrics_failed_runs",
-                    "metrics_clarification_runs",
-                    "metrics_defect_leakage_incidents",
-                    "metrics_token_cost_per_success",
-                    "metrics_time_to_accepted_solution",
-                    "task_signature_sha256",
-                ]
+        writer.writerow(HISTORY_FIELDS)
+        for row in conn.execute(f"SELECT {', '.join(HISTORY_FIELDS)} FROM runs ORDER BY seq"):
+            values = list(row)
+            for field in ("pass_rate", "metrics_token_cost_per_success", "metrics_time_to_accepted_solution"):
+                index = HISTORY_FIELDS.index(field)
+                values[index] = f"{float(values[index]):.4f}"
+            writer.writerow(values)
+            count += 1
+    return count
+
+
+def run_history_command(args: argparse.Namespace, output_root: pathlib.Path) -> int:
+    history_db = output_root / "history" / "harness-history.sqlite3"
+    conn = open_history_db(history_db)
+    try:
+        if args.history_command == "pass-rate":
+            print(json.dumps(query_pass_rate_trend(conn, args.limit), indent=2))
+            return 0
+        if args.history_command == "tasks":
+            print(json.dumps(query_task_trends(conn, args.window, args.task), indent=2))
+            return 0
+        if args.history_command == "export-csv":
+            destination = pathlib.Path(args.out).resolve()
+            count = export_history_csv(conn, destination)
+            print(f"Exported {count} runs to {destination}")
+            return 0
+    finally:
+        conn.close()
+    raise ValueError(f"Unsupported history command: {args.history_command}")
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * pct / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def build_perf_drift(
+    summary: dict[str, Any],
+    history: dict[str, list[int]],
+    min_samples: int,
+    threshold_pct: float,
+    mad_k: float,
+) -> dict[str, Any]:
+    """Compare each executed task's duration with a rolling median/MAD baseline.
+
+    `history` must come from runs with the summary's `cli_mode` and `jobs`.
+    A task regresses only when it is both `threshold_pct` above the median and
+    `mad_k` scaled MADs above it, so a relative slowdown on a very noisy task
+    or a tiny absolute jitter on a very stable one is not flagged.
+    """
+    tasks: list[dict[str, Any]] = []
+    for task in summary["task_results"]:
+        name = task["name"]
+        entry: dict[str, Any] = {"name": name, "duration_ms": task["duration_ms"]}
+        samples = history.get(name, [])
+        if task.get("cached"):
+            entry["status"] = "cached"
+        elif task.get("skipped"):
+            entry["status"] = "skipped"
+        elif len(samples) < min_samples:
+            entry["status"] = "insufficient_history"
+            entry["samples"] = len(samples)
+        else:
+            median = statistics.median(samples)
+            mad = statistics.median(abs(value - median) for value in samples)
+            scaled_mad = 1.4826 * mad
+            limit = max(median * (1.0 + threshold_pct / 100.0), median + mad_k * scaled_mad)
+            entry.update(
+                {
+                    "samples": len(samples),
+                    "baseline_median_ms": round(median, 3),
+                    "baseline_mad_ms": round(mad, 3),
+                    "baseline_p95_ms": round(percentile(samples, 95.0), 3),
+                    "limit_ms": round(limit, 3),
+                    "delta_pct": round((task["duration_ms"] - median) / median * 100.0, 2) if median else 0.0,
+                    "status": "regressed" if task["duration_ms"] > limit else "ok",
+                }
             )
-        writer.writerow(row)
+        tasks.append(entry)
+
+    regressed = [entry["name"] for entry in tasks if entry["status"] == "regressed"]
+    return {
+        "cli_mode": summary.get("cli_mode"),
+        "jobs": summary.get("jobs"),
+        "threshold_pct": threshold_pct,
+        "mad_k": mad_k,
+        "min_samples": min_samples,
+        "regressed_tasks": regressed,
+        "tasks": tasks,
+    }
 
 
-def load_previous_row(history_csv: pathlib.Path) -> dict[str, Any] | None:
-    if not history_csv.exists():
-        return None
-    rows = list(csv.DictReader(history_csv.read_text(encoding="utf-8").splitlines()))
-    if len(rows) < 2:
-        return None
-    return rows[-2]
+def parse_shard(raw: str) -> tuple[int, int]:
+    index_text, sep, count_text = raw.partition("/")
+    if not sep or not index_text.isdigit() or not count_text.isdigit():
+        raise ValueError(f"--shard must look like i/n, got '{raw}'")
+    index, count = int(index_text), int(count_text)
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"--shard index must be within 1..n, got '{raw}'")
+    return index, count
+
+
+def load_shard_durations(durations_summary: pathlib.Path | None) -> dict[str, float]:
+    """Read task durations from an explicit summary shared by all shard runners.
+
+    Local history is deliberately not consulted: every runner has its own
+    database, so balancing on it would give each runner a different plan.
+    """
+    if durations_summary is None:
+        return {}
+    payload = json.loads(durations_summary.read_text(encoding="utf-8"))
+    return {
+        str(task["name"]): float(task["duration_ms"])
+        for task in payload.get("task_results", [])
+        if not task.get("cached")
+    }
+
+
+def compute_shard_durations_digest(durations: dict[str, float]) -> str:
+    canonical = json.dumps(durations, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def plan_shards(tasks: list[dict[str, Any]], count: int, durations: dict[str, float]) -> tuple[list[int], str]:
+    """Assign every task to a 1-based shard.
+
+    Tasks linked through `depends_on` always land on the same shard. With a
+    duration for every task, longest-processing-time-first greedy balancing is
+    used over those groups; otherwise groups are spread by a stable name hash.
+    Both are deterministic given the same inputs, and `merge` rejects shard
+    summaries whose plans differ.
+    """
+    names = [str(task["name"]) for task in tasks]
+    group_of = list(range(len(tasks)))
+
+    def find(index: int) -> int:
+        while group_of[index] != index:
+            group_of[index] = group_of[group_of[index]]
+            index = group_of[index]
+        return index
+
+    for index, deps in enumerate(task_dependencies(tasks)):
+        for dependency in deps:
+            group_of[max(find(index), find(dependency))] = min(find(index), find(dependency))
+    groups: dict[int, list[int]] = {}
+    for index in range(len(tasks)):
+        groups.setdefault(find(index), []).append(index)
+
+    assignment = [0] * len(names)
+    if names and all(name in durations for name in names):
+        loads = [0.0] * count
+        group_cost = {root: sum(durations[names[i]] for i in members) for root, members in groups.items()}
+        for root in sorted(groups, key=lambda r: (-group_cost[r], names[r])):
+            shard = min(range(count), key=lambda s: (loads[s], s))
+            loads[shard] += group_cost[root]
+            for member in groups[root]:
+                assignment[member] = shard + 1
+        return assignment, "durations"
+
+    for root, members in groups.items():
+        shard = int(hashlib.sha256(names[root].encode("utf-8")).hexdigest()[:8], 16) % count + 1
+        for member in members:
+            assignment[member] = shard
+    return assignment, "hash"
+
+
+def compute_shard_plan_signature(tasks: list[dict[str, Any]], assignment: list[int]) -> str:
+    plan = [[str(task["name"]), shard] for task, shard in zip(tasks, assignment)]
+    return hashlib.sha256(json.dumps(plan, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+class HarnessEventLog:
+    """Append-only JSON Lines event stream, flushed per event so partial runs stay readable."""
+
+    def __init__(self, path: pathlib.Path) -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle = path.open("w", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def emit(self, event: str, **fields: Any) -> None:
+        record = {"ts": dt.datetime.now(dt.timezone.utc).isoformat(timespec="milliseconds"), "event": event, **fields}
+        line = json.dumps(record, sort_keys=False) + "\n"
+        with self._lock:
+            self._handle.write(line)
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+
+    def close(self) -> None:
+        with self._lock:
+            self._handle.close()
+
+
+def task_end_event(result: TaskResult) -> dict[str, Any]:
+    return {
+        "task": result.name,
+        "status": "skipped" if result.skipped else "passed" if result.passed else "failed",
+        "expected_exit_code": result.expected_exit_code,
+        "exit_code": result.exit_code,
+        "duration_ms": result.duration_ms,
+        "cached": result.cached,
+        "timed_out": result.timed_out,
+        "blocked_by": result.blocked_by,
+    }
+
+
+def write_junit_report(summary: dict[str, Any], path: pathlib.Path) -> None:
+    """Write one JUnit testsuite with a testcase per harness task."""
+    task_results = summary["task_results"]
+    suite = ET.Element(
+        "testsuite",
+        {
+            "name": "meta-agent-regression-harness",
+            "tests": str(len(task_results)),
+            "failures": str(summary["tasks_failed"]),
+            "errors": "0",
+            "skipped": str(summary.get("tasks_skipped", 0)),
+            "time": f"{sum(int(task['duration_ms']) for task in task_results) / 1000.0:.3f}",
+            "timestamp": summary["timestamp_utc"],
+        },
+    )
+    properties = ET.SubElement(suite, "properties")
+    ET.SubElement(properties, "property", {"name": "run_id", "value": str(summary["run_id"])})
+
+    for task in task_results:
+        case = ET.SubElement(
+            suite,
+            "testcase",
+            {
+                "classname": "regression_harness",
+                "name": str(task["name"]),
+                "time": f"{int(task['duration_ms']) / 1000.0:.3f}",
+            },
+        )
+        if task.get("skipped"):
+            ET.SubElement(case, "skipped", {"message": f"dependency '{task.get('blocked_by')}' did not pass"})
+        elif not task["passed"]:
+            if task.get("timed_out"):
+                message = f"timed out after {task.get('timeout_seconds')}s"
+            else:
+                message = f"expected exit code {task['expected_exit_code']}, got {task['exit_code']}"
+            failure = ET.SubElement(case, "failure", {"message": message, "type": "exit_code"})
+            failure.text = task.get("stderr_tail") or ""
+        if task.get("stdout_tail"):
+            ET.SubElement(case, "system-out").text = task["stdout_tail"]
+        if task.get("cached"):
+            ET.SubElement(ET.SubElement(case, "properties"), "property", {"name": "cached", "value": "true"})
+
+    tree = ET.ElementTree(suite)
+    ET.indent(tree)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tree.write(path, encoding="utf-8", xml_declaration=True)
+
+
+def summarize_task_results(task_results: list[dict[str, Any]]) -> dict[str, Any]:
+    total = len(task_results)
+    passed = sum(1 for r in task_results if r["passed"])
+    skipped = sum(1 for r in task_results if r.get("skipped"))
+    return {
+        "tasks_total": total,
+        "tasks_passed": passed,
+        "tasks_failed": total - passed - skipped,
+        "tasks_skipped": skipped,
+        "expected_failures": sum(1 for r in task_results if r["expected_exit_code"] != 0),
+        "unexpected_failures": sum(1 for r in task_results if not r["passed"] and not r.get("skipped")),
+        "pass_rate": (passed / total) if total else 0.0,
+    }
+
+
+def finalize_run(
+    summary: dict[str, Any],
+    args: argparse.Namespace,
+    output_root: pathlib.Path,
+    run_dir: pathlib.Path,
+    task_signature: str,
+    record: bool,
+) -> int:
+    """Attach drift sections, persist history and summaries, and return the exit code.
+
+    Shard runs (`record=False`) skip run-level drift and history so only the
+    merged run lands in history as one comparable entry.
+    """
+    history_db = output_root / "history" / "harness-history.sqlite3"
+    conn = open_history_db(history_db)
+    try:
+        if record:
+            summary["drift"] = build_drift(summary, load_latest_run(conn, summary["isolation"]), task_signature)
+        else:
+            summary["drift"] = {"skipped": "shard run; drift is computed by `merge`"}
+        summary["perf_drift"] = build_perf_drift(
+            summary,
+            load_task_duration_history(conn, args.perf_window, summary["cli_mode"], summary["jobs"]),
+            args.perf_min_samples,
+            args.perf_threshold_pct,
+            args.perf_mad_k,
+        )
+        if record:
+            record_history(conn, summary, task_signature)
+    finally:
+        conn.close()
+
+    run_dir.mkdir(parents=True, exist_ok=True)
+    junit_path = run_dir / "junit.xml"
+    summary["artifacts"]["junit_report"] = str(junit_path)
+    write_junit_report(summary, junit_path)
+    summary_path = run_dir / "harness-summary.json"
+    summary_path.write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+
+    if record:
+        latest_path = output_root / "latest-summary.json"
+        latest_path.write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+
+    print(f"Harness summary: {summary_path}")
+    if record:
+        print(f"History database: {history_db}")
+
+    regressed_tasks = summary["perf_drift"]["regressed_tasks"]
+    if regressed_tasks:
+        print(f"Perf drift: latency regressed for {', '.join(regressed_tasks)}")
+        if args.fail_on_perf_regression:
+            return 1
+
+    return 0 if summary["unexpected_failures"] == 0 and summary["tasks_skipped"] == 0 else 1
+
+
+def run_merge_command(
+    args: argparse.Namespace,
+    tasks: list[dict[str, Any]],
+    tasks_path: pathlib.Path,
+    output_root: pathlib.Path,
+) -> int:
+    task_signature = compute_task_signature(tasks)
+    summaries = [json.loads(pathlib.Path(path).read_text(encoding="utf-8")) for path in args.summaries]
+
+    shard_infos = [summary.get("shard") for summary in summaries]
+    if not all(isinstance(info, dict) for info in shard_infos):
+        raise ValueError("merge expects summaries produced with --shard")
+    counts = {info["count"] for info in shard_infos}
+    if len(counts) != 1:
+        raise ValueError(f"shard summaries disagree on shard count: {sorted(counts)}")
+    if any(info["task_signature"] != task_signature for info in shard_infos):
+        raise ValueError(f"shard summaries were produced from a different task manifest than {tasks_path}")
+    if len({info["plan_sha256"] for info in shard_infos}) != 1:
+        if len({info.get("durations_sha256") for info in shard_infos}) != 1:
+            sources = sorted({str(info.get("durations_source")) for info in shard_infos})
+            raise ValueError(
+                "shard plans were balanced on different task durations; pass the same --shard-durations file "
+                f"to every shard run (sources: {', '.join(sources)})"
+            )
+        raise ValueError("shard summaries disagree on the task assignment plan")
+    indexes = sorted(info["index"] for info in shard_infos)
+    expected_indexes = list(range(1, counts.pop() + 1))
+    if indexes != expected_indexes:
+        raise ValueError(f"expected one summary per shard {expected_indexes}, got shards {indexes}")
+
+    order = {str(task["name"]): position for position, task in enumerate(tasks)}
+    task_results = sorted(
+        (result for summary in summaries for result in summary["task_results"]),
+        key=lambda result: order.get(result["name"], len(order)),
+    )
+    if sorted(result["name"] for result in task_results) != sorted(order):
+        raise ValueError("shard summaries do not cover every manifest task exactly once")
+
+    run_dir = output_root / "runs" / args.run_id
+    # Every shard keeps its own scoreboard, so a merged run is never directly
+    # comparable with a single shared-workspace run.
+    isolation = "per_task" if any(summary.get("isolation") == "per_task" for summary in summaries) else "per_shard"
+    cli_modes = {str(summary.get("cli_mode", "unknown")) for summary in summaries}
+    metrics = merge_metrics([summary.get("metrics", {}) for summary in summaries])
+    if metrics:
+        metrics_path = run_dir / "artifacts" / "metrics-scoreboard.json"
+        metrics_path.parent.mkdir(parents=True, exist_ok=True)
+        metrics_path.write_text(json.dumps(metrics, indent=2) + "\n", encoding="utf-8")
+
+    summary = {
+        "run_id": args.run_id,
+        "timestamp_utc": dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        **summarize_task_results(task_results),
+        "jobs": max(int(summary.get("jobs", 1)) for summary in summaries),
+        "isolation": isolation,
+        "cli_mode": cli_modes.pop() if len(cli_modes) == 1 else "mixed",
+        "critical_path": compute_critical_path(tasks, task_results),
+        "merged_from": [
+            {"path": str(pathlib.Path(path).resolve()), "run_id": summary["run_id"], "shard": summary["shard"]}
+            for path, summary in zip(args.summaries, summaries)
+        ],
+        "result_cache": {
+            "hits": sum(summary.get("result_cache", {}).get("hits", 0) for summary in summaries),
+            "misses": sum(summary.get("result_cache", {}).get("misses", 0) for summary in summaries),
+        },
+        "metrics": metrics,
+        "task_results": task_results,
+        "artifacts": {
+            "run_dir": str(run_dir),
+            "tasks_manifest": str(tasks_path),
+        },
+    }
+    print(f"Merged {len(summaries)} shard summaries ({len(task_results)} tasks)")
+    return finalize_run(summary, args, output_root, run_dir, task_signature, record=True)
 
 
 def build_drift(summary: dict[str, Any], previous: dict[str, Any] | None, task_signature: str) -> dict[str, Any]:
     drift: dict[str, Any] = {
+        "isolation": summary["isolation"],
         "task_signature_changed": False,
         "deltas": {},
     }
@@ -268,107 +1819,303 @@ def main() -> int:
     output_root = pathlib.Path(args.output_root).resolve()
     repo_root = pathlib.Path(args.repo_root).resolve()
 
+    if args.command == "history":
+        return run_history_command(args, output_root)
+
     tasks = load_tasks(tasks_path)
+    order_tasks(tasks)
     task_signature = compute_task_signature(tasks)
 
+    if args.command == "merge":
+        return run_merge_command(args, tasks, tasks_path, output_root)
+
+    shard_info: dict[str, Any] | None = None
+    if args.shard is not None:
+        shard_index, shard_count = parse_shard(args.shard)
+        durations_source = pathlib.Path(args.shard_durations).resolve() if args.shard_durations else None
+        durations = load_shard_durations(durations_source)
+        assignment, strategy = plan_shards(tasks, shard_count, durations)
+        shard_tasks = [task for task, shard in zip(tasks, assignment) if shard == shard_index]
+        shard_info = {
+            "index": shard_index,
+            "count": shard_count,
+            "strategy": strategy,
+            "plan_sha256": compute_shard_plan_signature(tasks, assignment),
+            "durations_sha256": compute_shard_durations_digest(durations),
+            "durations_source": str(durations_source) if durations_source else None,
+            "task_signature": task_signature,
+            "tasks": [str(task["name"]) for task in shard_tasks],
+        }
+        print(f"Shard {shard_index}/{shard_count} ({strategy}): {len(shard_tasks)} of {len(tasks)} tasks")
+        tasks = shard_tasks
+
     if args.skip_execute:
         print(f"Loaded {len(tasks)} tasks from {tasks_path}")
         print(f"Task signature: {task_signature}")
         return 0
 
+    if args.jobs < 1:
+        raise ValueError("--jobs must be >= 1")
+    if args.task_timeout_seconds < 0:
+        raise ValueError("--task-timeout-seconds must be >= 0")
+    if args.repeat < 1 or args.warmup < 0:
+        raise ValueError("--repeat must be >= 1 and --warmup must be >= 0")
+    if args.cache_max_entries < 0:
+        raise ValueError("--cache-max-entries must be >= 0")
+    isolated = args.jobs > 1
+
     run_dir = output_root / "runs" / args.run_id
     workspace_dir = run_dir / "workspace"
     artifacts_dir = run_dir / "artifacts"
     logs_dir = run_dir / "logs"
-    workspace_dir.mkdir(parents=True, exist_ok=True)
-    (workspace_dir / "existing-repo").mkdir(parents=True, exist_ok=True)
     artifacts_dir.mkdir(parents=True, exist_ok=True)
     logs_dir.mkdir(parents=True, exist_ok=True)
 
-    policy_path = workspace_dir / ".meta-agent-policy.json"
+    policy_path = prepare_workspace(workspace_dir)
     metrics_path = artifacts_dir / "metrics-scoreboard.json"
-    write_default_policy(policy_path)
-    ensure_templates_composed(repo_root)
+    template_compose = ensure_templates_composed(repo_root)
+    if template_compose["skipped"]:
+        print("Templates: composition skipped (compose manifests current)")
 
     cli_project = repo_root / "meta-agent" / "dotnet" / "MetaAgent.Cli"
     env = dict(os.environ)
     env["META_AGENT_NONINTERACTIVE"] = "1"
+    cli_build: dict[str, Any] = {"mode": "custom" if args.cli_command else args.cli_mode}
+    if args.cli_command:
+        cli_command, command_info = resolve_cli_command_template(args.cli_command, repo_root)
+        cli_build.update(command_info)
+    elif args.cli_mode == "prebuilt":
+        cli_command, build_info = ensure_cli_binary(
+            repo_root,
+            cli_project,
+            output_root / "cli-build",
+            env,
+            warm_probe=args.repeat > 1 or args.warmup > 0,
+        )
+        cli_build.update(build_info)
+    else:
+        cli_command = ["dotnet", "run", "--project", str(cli_project)]
+        if isolated:
+            build_cli_project(repo_root, cli_project)
+            cli_command.append("--no-build")
+        cli_command.append("--")
 
-    results: list[TaskResult] = []
-    for task in tasks:
-        ctx = {
-            "workspace_dir": str(workspace_dir),
-            "artifacts_dir": str(artifacts_dir),
-            "policy_path": str(policy_path),
-            "metrics_path": str(metrics_path),
-            "run_id": args.run_id,
-        }
-        raw_args = task.get("args", [])
-        if not isinstance(raw_args, list) or not raw_args:
-            raise ValueError(f"Task '{task.get('name', '<unknown>')}' must include a non-empty args list")
-        command_args = [str(arg).format(**ctx) for arg in raw_args]
+    if args.repeat > 1 or args.warmup > 0:
+        report = run_benchmark(
+            tasks,
+            repo_root,
+            run_dir,
+            args.run_id,
+            workspace_dir,
+            cli_command,
+            env,
+            args.repeat,
+            args.warmup,
+            args.task_timeout_seconds,
+        )
+        probe = cli_build.get("startup_probe")
+        if isinstance(probe, dict):
+            invocations = len(tasks) * (args.repeat + args.warmup)
+            cli_build["estimated_startup_savings_ms"] = probe["savings_per_invocation_ms"] * invocations
+        report["cli_build"] = cli_build
+        report["template_compose"] = template_compose
+        report_path = run_dir / "benchmark-report.json"
+        report_path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        (output_root / "latest-benchmark.json").write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Benchmark report: {report_path}")
+        return 0 if all(task["all_passed"] for task in report["tasks"]) else 1
+
+    dependencies = task_dependencies(tasks)
+    contexts: list[dict[str, str] | None] = [None] * len(tasks)
+
+    cache_root = output_root / "result-cache"
+    cache_enabled = not args.no_cache
+    cache_keys: list[str] = []
+    if cache_enabled:
+        cli_hash = str(cli_build.get("source_hash") or compute_cli_source_hash(cli_project.parent))
+        templates_hash = str(template_compose["templates_hash"])
+        policy_hash = hashlib.sha256(policy_path.read_bytes()).hexdigest()
+        cache_keys = compute_cache_keys(tasks, cli_hash, templates_hash, policy_hash, isolated)
+    # In shared mode a cache entry is only valid if every earlier task ran and
+    # passed, so storing stops at the first failed or skipped task.
+    shared_chain_intact = True
+
+    events = HarnessEventLog(run_dir / "events.jsonl")
+
+    def run_one(index: int) -> TaskResult:
+        nonlocal shared_chain_intact
+        events.emit("task_start", task=str(tasks[index]["name"]))
+        # Contexts are built when a task starts so isolated dependents copy
+        # their dependencies' finished workspaces.
+        ctx = build_task_context(
+            tasks[index],
+            run_dir,
+            args.run_id,
+            workspace_dir,
+            isolated,
+            dependency_workspace_dirs=[
+                pathlib.Path(contexts[dependency]["workspace_dir"]) for dependency in dependencies[index]
+            ],
+        )
+        contexts[index] = ctx
+        command_args = format_command_args(tasks[index], ctx)
+        if cache_enabled:
+            cached = restore_cached_result(
+                cache_root,
+                cache_keys[index],
+                tasks[index],
+                [*cli_command, *command_args],
+                ctx,
+                logs_dir,
+                run_dir,
+                args.log_tail_bytes,
+            )
+            if cached is not None:
+                return cached
+        result = execute_task(
+            tasks[index],
+            repo_root,
+            cli_command,
+            command_args,
+            env,
+            logs_dir,
+            timeout_seconds=resolve_task_timeout(tasks[index], args.task_timeout_seconds),
+            log_tail_bytes=args.log_tail_bytes,
+        )
+        if cache_enabled and result.passed and (isolated or shared_chain_intact):
+            store_cached_result(cache_root, cache_keys[index], result, ctx, run_dir)
+        if not result.passed:
+            shared_chain_intact = False
+        return result
+
+    def skip_one(index: int, blocked_by: str) -> TaskResult:
+        nonlocal shared_chain_intact
+        shared_chain_intact = False
+        task = tasks[index]
+        return TaskResult(
+            name=str(task["name"]),
+            description=str(task.get("description", "")),
+            command=[],
+            expected_exit_code=int(task["expected_exit_code"]),
+            exit_code=None,
+            passed=False,
+            duration_ms=0,
+            stdout_path="",
+            stderr_path="",
+            skipped=True,
+            blocked_by=blocked_by,
+        )
 
-        result = execute_task(task, repo_root, cli_project, command_args, env, logs_dir)
-        results.append(result)
+    def report(result: TaskResult) -> None:
+        events.emit("task_end", **task_end_event(result))
+        if result.skipped:
+            print(f"[SKIP] {result.name}: dependency '{result.blocked_by}' did not pass")
+            return
         marker = "PASS" if result.passed else "FAIL"
-        print(f"[{marker}] {result.name}: expected {result.expected_exit_code}, got {result.exit_code}")
+        suffix = " (cached)" if result.cached else ""
+        if result.timed_out:
+            suffix = f" (timed out after {result.timeout_seconds:g}s, killed)"
+        print(f"[{marker}] {result.name}: expected {result.expected_exit_code}, got {result.exit_code}{suffix}")
 
-    total = len(results)
-    passed = sum(1 for r in results if r.passed)
-    failed = total - passed
-    expected_failures = sum(1 for r in results if r.expected_exit_code != 0)
-    unexpected_failures = sum(1 for r in results if not r.passed)
-    pass_rate = (passed / total) if total else 0.0
+    events.emit(
+        "run_start",
+        run_id=args.run_id,
+        tasks=[str(task["name"]) for task in tasks],
+        jobs=args.jobs,
+        shard=shard_info,
+    )
+    execution_started = time.perf_counter()
+    try:
+        results = run_task_graph(tasks, args.jobs, run_one, skip_one, report)
+    except BaseException as exc:
+        events.emit("run_aborted", error=f"{type(exc).__name__}: {exc}")
+        events.close()
+        raise
+    execution_wall_ms = int((time.perf_counter() - execution_started) * 1000)
+    events.emit(
+        "run_end",
+        execution_wall_ms=execution_wall_ms,
+        tasks_passed=sum(1 for r in results if r.passed),
+        tasks_skipped=sum(1 for r in results if r.skipped),
+        tasks_total=len(results),
+    )
+    events.close()
+
+    cache_pruned = prune_result_cache(cache_root, args.cache_max_entries) if cache_enabled else 0
+
+    if isolated:
+        merged_metrics = merge_metrics(
+            [load_metrics(pathlib.Path(ctx["metrics_path"])) for ctx in contexts if ctx is not None]
+        )
+        if merged_metrics:
+            metrics_path.write_text(json.dumps(merged_metrics, indent=2) + "\n", encoding="utf-8")
+
+    probe = cli_build.get("startup_probe")
+    if isinstance(probe, dict):
+        cli_build["estimated_startup_savings_ms"] = probe["savings_per_invocation_ms"] * len(results)
 
-    metrics = load_metrics(metrics_path)
+    task_results = [
+        {
+            "name": r.name,
+            "description": r.description,
+            "expected_exit_code": r.expected_exit_code,
+            "exit_code": r.exit_code,
+            "passed": r.passed,
+            "cached": r.cached,
+            "timed_out": r.timed_out,
+            "timeout_seconds": r.timeout_seconds,
+            "duration_ms": r.duration_ms,
+            "command": r.command,
+            "stdout_path": r.stdout_path,
+            "stderr_path": r.stderr_path,
+            "stdout_tail": r.stdout_tail,
+            "stderr_tail": r.stderr_tail,
+            "skipped": r.skipped,
+            "blocked_by": r.blocked_by,
+            "depends_on": list(task.get("depends_on", [])),
+            "workspace_dir": ctx["workspace_dir"] if ctx else None,
+            "artifacts_dir": ctx["artifacts_dir"] if ctx else None,
+        }
+        for r, task, ctx in zip(results, tasks, contexts)
+    ]
     summary = {
         "run_id": args.run_id,
         "timestamp_utc": dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
-        "tasks_total": total,
-        "tasks_passed": passed,
-        "tasks_failed": failed,
-        "expected_failures": expected_failures,
-        "unexpected_failures": unexpected_failures,
-        "pass_rate": pass_rate,
-        "metrics": metrics,
-        "task_results": [
-            {
-                "name": r.name,
-                "description": r.description,
-                "expected_exit_code": r.expected_exit_code,
-                "exit_code": r.exit_code,
-                "passed": r.passed,
-                "duration_ms": r.duration_ms,
-                "command": r.command,
-                "stdout_path": r.stdout_path,
-                "stderr_path": r.stderr_path,
-            }
-            for r in results
-        ],
+        **summarize_task_results(task_results),
+        "jobs": args.jobs,
+        "isolation": "per_task" if isolated else "shared",
+        "cli_mode": cli_build["mode"],
+        "execution_wall_ms": execution_wall_ms,
+        "template_compose": template_compose,
+        "critical_path": compute_critical_path(tasks, task_results),
+        "cli_build": cli_build,
+        "result_cache": {
+            "enabled": cache_enabled,
+            "hits": sum(1 for r in results if r.cached),
+            "misses": sum(1 for r in results if not r.cached) if cache_enabled else 0,
+            "pruned": cache_pruned,
+            "cache_root": str(cache_root),
+        },
+        "metrics": load_metrics(metrics_path),
+        "task_results": task_results,
         "artifacts": {
             "run_dir": str(run_dir),
             "workspace_dir": str(workspace_dir),
             "artifacts_dir": str(artifacts_dir),
             "metrics_path": str(metrics_path),
+            "events_path": str(events.path),
             "tasks_manifest": str(tasks_path),
         },
     }
+    if shard_info is not None:
+        summary["shard"] = shard_info
 
-    history_csv = output_root / "history" / "harness-history.csv"
-    append_history(history_csv, summary, task_signature)
-    previous_row = load_previous_row(history_csv)
-    summary["drift"] = build_drift(summary, previous_row, task_signature)
-
-    summary_path = run_dir / "harness-summary.json"
-    summary_path.write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
-
-    latest_path = output_root / "latest-summary.json"
-    latest_path.write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
-
-    print(f"Harness summary: {summary_path}")
-    print(f"History CSV: {history_csv}")
-
-    return 0 if unexpected_failures == 0 else 1
+    if "estimated_startup_savings_ms" in cli_build:
+        print(
+            f"CLI startup: prebuilt binary saved ~{cli_build['estimated_startup_savings_ms']} ms "
+            f"across {len(results)} tasks versus dotnet run"
+        )
+    return finalize_run(summary, args, output_root, run_dir, task_signature, record=shard_info is None)
 
 
 if __name__ == "__main__":
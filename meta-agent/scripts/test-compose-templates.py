@@ -3,11 +3,31 @@
 
 from __future__ import annotations
 
+import contextlib
+import importlib.util
+import io
 import json
+import os
 import pathlib
+import shutil
 import subprocess
+import sys
+import tarfile
 import tempfile
 import unittest
+import zipfile
+from unittest import mock
+
+
+def load_module():
+    script = pathlib.Path(__file__).resolve().parent / "compose-templates.py"
+    spec = importlib.util.spec_from_file_location("compose_templates", script)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Unable to load module from {script}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
 
 
 class ComposeTemplatesTests(unittest.TestCase):
@@ -54,6 +74,8 @@ class ComposeTemplatesTests(unittest.TestCase):
                     str(output),
                     "--manifest",
                     str(manifest_path),
+                    "--digest-cache",
+                    str(root / "digest-cache.json"),
                 ],
                 check=False,
                 capture_output=True,
@@ -77,6 +99,8 @@ class ComposeTemplatesTests(unittest.TestCase):
                     str(output),
                     "--manifest",
                     str(manifest_path),
+                    "--digest-cache",
+                    str(root / "digest-cache.json"),
                     "--check",
                 ],
                 check=False,
@@ -86,6 +110,7 @@ class ComposeTemplatesTests(unittest.TestCase):
             self.assertEqual(0, check_result.returncode, check_result.stderr)
 
             (target / "common.txt").write_text("drift\n", encoding="utf-8")
+            cache_before = (root / "digest-cache.json").read_bytes()
             drift_result = subprocess.run(
                 [
                     "python3",
@@ -96,6 +121,8 @@ class ComposeTemplatesTests(unittest.TestCase):
                     str(output),
                     "--manifest",
                     str(manifest_path),
+                    "--digest-cache",
+                    str(root / "digest-cache.json"),
                     "--check",
                 ],
                 check=False,
@@ -104,6 +131,474 @@ class ComposeTemplatesTests(unittest.TestCase):
             )
             self.assertNotEqual(0, drift_result.returncode)
             self.assertIn("[DRIFT]", drift_result.stdout)
+            # --check never writes, not even the digest cache.
+            self.assertEqual(cache_before, (root / "digest-cache.json").read_bytes())
+
+    def test_rewrite_touches_only_changed_files(self) -> None:
+        script = pathlib.Path(__file__).resolve().parent / "compose-templates.py"
+        with tempfile.TemporaryDirectory(prefix="meta-agent-compose-test-", dir="/tmp") as tmp:
+            root = pathlib.Path(tmp)
+            source = root / "source"
+            output = root / "output"
+            (source / "base" / "docs").mkdir(parents=True, exist_ok=True)
+            (source / "base" / "keep.txt").write_text("keep\n", encoding="utf-8")
+            (source / "base" / "edit.txt").write_text("v1\n", encoding="utf-8")
+            (source / "base" / "docs" / "old.md").write_text("old\n", encoding="utf-8")
+            (source / "overlays" / "sample").mkdir(parents=True, exist_ok=True)
+
+            manifest = {
+                "version": 1,
+                "base": "base",
+                "overlayRoot": "overlays",
+                "templates": {"sample": {"overlays": ["sample"], "remove": [], "required": ["keep.txt"]}},
+            }
+            manifest_path = source / "manifest.json"
+            manifest_path.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+            command = [
+                "python3",
+                str(script),
+                "--source-root",
+                str(source),
+                "--output-root",
+                str(output),
+                "--manifest",
+                str(manifest_path),
+                "--digest-cache",
+                str(root / "digest-cache.json"),
+            ]
+
+            first = subprocess.run(command, check=False, capture_output=True, text=True)
+            self.assertEqual(0, first.returncode, first.stderr)
+            self.assertIn("(written 3, unchanged 0, removed 0)", first.stdout)
+
+            target = output / "sample"
+            keep_stat = (target / "keep.txt").stat()
+            (source / "base" / "edit.txt").write_text("v2\n", encoding="utf-8")
+            (source / "base" / "docs" / "old.md").unlink()
+            (source / "base" / "docs").rmdir()
+            (target / "stray.txt").write_text("stray\n", encoding="utf-8")
+
+            second = subprocess.run(command, check=False, capture_output=True, text=True)
+            self.assertEqual(0, second.returncode, second.stderr)
+            self.assertIn("(written 1, unchanged 1, removed 2)", second.stdout)
+            self.assertEqual("v2\n", (target / "edit.txt").read_text(encoding="utf-8"))
+            self.assertFalse((target / "docs").exists())
+            self.assertFalse((target / "stray.txt").exists())
+            self.assertEqual(keep_stat.st_ino, (target / "keep.txt").stat().st_ino)
+            self.assertEqual(keep_stat.st_mtime_ns, (target / "keep.txt").stat().st_mtime_ns)
+
+    def test_compose_manifest_short_circuits_check(self) -> None:
+        script = pathlib.Path(__file__).resolve().parent / "compose-templates.py"
+        with tempfile.TemporaryDirectory(prefix="meta-agent-compose-test-", dir="/tmp") as tmp:
+            root = pathlib.Path(tmp)
+            source = root / "source"
+            output = root / "output"
+            (source / "base").mkdir(parents=True, exist_ok=True)
+            (source / "base" / "common.txt").write_text("base\n", encoding="utf-8")
+            (source / "base" / "keep.txt").write_text("keep\n", encoding="utf-8")
+            (source / "overlays" / "sample").mkdir(parents=True, exist_ok=True)
+            (source / "overlays" / "sample" / "common.txt").write_text("overlay\n", encoding="utf-8")
+
+            manifest = {
+                "version": 1,
+                "base": "base",
+                "overlayRoot": "overlays",
+                "templates": {"sample": {"overlays": ["sample"], "remove": [], "required": ["common.txt"]}},
+            }
+            manifest_path = source / "manifest.json"
+            manifest_path.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+            command = [
+                "python3",
+                str(script),
+                "--source-root",
+                str(source),
+                "--output-root",
+                str(output),
+                "--manifest",
+                str(manifest_path),
+                "--digest-cache",
+                str(root / "digest-cache.json"),
+            ]
+
+            write_result = subprocess.run(command, check=False, capture_output=True, text=True)
+            self.assertEqual(0, write_result.returncode, write_result.stderr)
+            compose_manifest_path = output / "sample.compose-manifest.json"
+            compose_manifest = json.loads(compose_manifest_path.read_text(encoding="utf-8"))
+            self.assertEqual("overlays/sample/common.txt", compose_manifest["files"]["common.txt"]["source"])
+            self.assertEqual("base/keep.txt", compose_manifest["files"]["keep.txt"]["source"])
+            self.assertFalse((output / "sample" / "sample.compose-manifest.json").exists())
+
+            # Sources were just written and copies keep their mtime, as under --watch;
+            # output inside the racy window is re-hashed rather than disqualifying the manifest.
+            fresh_result = subprocess.run([*command, "--check"], check=False, capture_output=True, text=True)
+            self.assertEqual(0, fresh_result.returncode, fresh_result.stderr)
+            self.assertIn("compose manifest current", fresh_result.stdout)
+
+            # Age the manifest past the racy window.
+            compose_manifest["written_at_ns"] += 10_000_000_000
+            compose_manifest_path.write_text(json.dumps(compose_manifest), encoding="utf-8")
+            check_result = subprocess.run([*command, "--check"], check=False, capture_output=True, text=True)
+            self.assertEqual(0, check_result.returncode, check_result.stderr)
+            self.assertIn("compose manifest current", check_result.stdout)
+
+            # A current manifest settles composed output by stat alone: only sources are read.
+            mod = load_module()
+            hashed: list[pathlib.Path] = []
+            real_hash_file = mod.hash_file
+
+            def recording_hash_file(path: pathlib.Path) -> str:
+                hashed.append(path)
+                return real_hash_file(path)
+
+            with mock.patch.object(mod, "hash_file", recording_hash_file), mock.patch.object(
+                sys, "argv", ["compose-templates.py", *command[2:], "--check"]
+            ), contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(0, mod.main())
+            self.assertFalse([path for path in hashed if output in path.parents], hashed)
+
+            # A same-size edit with its mtime restored is still caught by ctime.
+            keep_output = output / "sample" / "keep.txt"
+            keep_stat = keep_output.stat()
+            keep_output.write_text("edit\n", encoding="utf-8")
+            os.utime(keep_output, ns=(keep_stat.st_atime_ns, keep_stat.st_mtime_ns))
+            drift_result = subprocess.run([*command, "--check"], check=False, capture_output=True, text=True)
+            self.assertNotEqual(0, drift_result.returncode)
+            self.assertIn("[DRIFT]", drift_result.stdout)
+
+            rewrite_result = subprocess.run(command, check=False, capture_output=True, text=True)
+            self.assertIn("(written 1, unchanged 1, removed 0)", rewrite_result.stdout)
+            (source / "base" / "keep.txt").write_text("changed\n", encoding="utf-8")
+            stale_result = subprocess.run([*command, "--check"], check=False, capture_output=True, text=True)
+            self.assertNotEqual(0, stale_result.returncode)
+            self.assertNotIn("compose manifest current", stale_result.stdout)
+
+    def test_watcher_recomposes_only_affected_templates(self) -> None:
+        mod = load_module()
+        with tempfile.TemporaryDirectory(prefix="meta-agent-compose-test-", dir="/tmp") as tmp:
+            root = pathlib.Path(tmp)
+            source = root / "source"
+            output = root / "output"
+            (source / "base").mkdir(parents=True, exist_ok=True)
+            (source / "base" / "common.txt").write_text("base\n", encoding="utf-8")
+            (source / "base" / "shared.txt").write_text("shared\n", encoding="utf-8")
+            for overlay in ("one", "two"):
+                (source / "overlays" / overlay).mkdir(parents=True, exist_ok=True)
+                (source / "overlays" / overlay / "common.txt").write_text(f"{overlay}\n", encoding="utf-8")
+            manifest_path = source / "manifest.json"
+            manifest_path.write_text(
+                json.dumps(
+                    {
+                        "version": 1,
+                        "base": "base",
+                        "overlayRoot": "overlays",
+                        "templates": {
+                            name: {"overlays": [name], "remove": [], "required": ["common.txt"]}
+                            for name in ("one", "two")
+                        },
+                    }
+                ),
+                encoding="utf-8",
+            )
+
+            _, _, templates = mod.load_manifest(manifest_path)
+            cache = mod.DigestCache(None)
+            file_maps = {}
+            for name in ("one", "two"):
+                file_maps[name] = mod.build_file_map(templates[name], source / "base", source / "overlays")
+                mod.sync_directories(file_maps[name], output / name, cache)
+            watcher = mod.TemplateWatcher(
+                manifest_path, source, output, ["one", "two"], file_maps, cache, mod.FileMaterializer("copy")
+            )
+            self.assertEqual([], watcher.poll())
+
+            two_stat = (output / "two" / "common.txt").stat()
+            (source / "overlays" / "one" / "common.txt").write_text("one edited\n", encoding="utf-8")
+            lines = watcher.poll()
+            self.assertEqual(1, len(lines))
+            self.assertIn("recomposed template 'one' (written 1, removed 0)", lines[0])
+            self.assertEqual("one edited\n", (output / "one" / "common.txt").read_text(encoding="utf-8"))
+            self.assertEqual(two_stat.st_mtime_ns, (output / "two" / "common.txt").stat().st_mtime_ns)
+
+            (source / "overlays" / "two" / "shared.txt").write_text("two shared\n", encoding="utf-8")
+            (source / "base" / "added.txt").write_text("added\n", encoding="utf-8")
+            lines = watcher.poll()
+            self.assertEqual(2, len(lines))
+            self.assertTrue((output / "one" / "added.txt").exists())
+            self.assertEqual("two shared\n", (output / "two" / "shared.txt").read_text(encoding="utf-8"))
+            self.assertEqual("shared\n", (output / "one" / "shared.txt").read_text(encoding="utf-8"))
+
+            (source / "overlays" / "two" / "shared.txt").unlink()
+            (source / "base" / "nested").mkdir()
+            (source / "base" / "nested" / "file.txt").write_text("nested\n", encoding="utf-8")
+            watcher.poll()
+            self.assertEqual("shared\n", (output / "two" / "shared.txt").read_text(encoding="utf-8"))
+            self.assertTrue((output / "two" / "nested" / "file.txt").exists())
+            for name in ("one", "two"):
+                expected = mod.build_file_map(templates[name], source / "base", source / "overlays")
+                self.assertEqual(mod.file_map_entries(expected), mod.collect_entries(output / name))
+
+            (source / "overlays" / "one" / "common.txt").unlink()
+            (source / "base" / "common.txt").unlink()
+            self.assertTrue(any(line.startswith("[ERROR]") for line in watcher.poll()))
+
+    def test_watcher_survives_source_removed_during_update(self) -> None:
+        mod = load_module()
+        with tempfile.TemporaryDirectory(prefix="meta-agent-compose-test-", dir="/tmp") as tmp:
+            root = pathlib.Path(tmp)
+            source = root / "source"
+            output = root / "output"
+            (source / "base").mkdir(parents=True, exist_ok=True)
+            (source / "base" / "common.txt").write_text("base\n", encoding="utf-8")
+            (source / "overlays" / "sample").mkdir(parents=True, exist_ok=True)
+            (source / "overlays" / "sample" / "common.txt").write_text("overlay\n", encoding="utf-8")
+            manifest_path = source / "manifest.json"
+            manifest_path.write_text(
+                json.dumps(
+                    {
+                        "version": 1,
+                        "base": "base",
+                        "overlayRoot": "overlays",
+                        "templates": {"sample": {"overlays": ["sample"], "remove": [], "required": ["common.txt"]}},
+                    }
+                ),
+                encoding="utf-8",
+            )
+            _, _, templates = mod.load_manifest(manifest_path)
+            cache = mod.DigestCache(None)
+            file_maps = {"sample": mod.build_file_map(templates["sample"], source / "base", source / "overlays")}
+            mod.sync_directories(file_maps["sample"], output / "sample", cache)
+            watcher = mod.TemplateWatcher(
+                manifest_path, source, output, ["sample"], file_maps, cache, mod.FileMaterializer("copy")
+            )
+
+            # The overlay is edited, then deleted after the scan but before its digest is read.
+            overlay = source / "overlays" / "sample" / "common.txt"
+            overlay.write_text("overlay edited\n", encoding="utf-8")
+            real_digest = cache.digest
+
+            def vanishing_digest(path: pathlib.Path) -> str:
+                if path == overlay and path.exists():
+                    path.unlink()
+                return real_digest(path)
+
+            with mock.patch.object(cache, "digest", vanishing_digest):
+                lines = watcher.poll()
+            self.assertEqual(1, len(lines))
+            self.assertTrue(lines[0].startswith("[ERROR] template 'sample'"), lines[0])
+            self.assertEqual({"sample"}, watcher.stale)
+
+            lines = watcher.poll()
+            self.assertEqual(1, len(lines))
+            self.assertIn("recomposed template 'sample'", lines[0])
+            self.assertEqual(set(), watcher.stale)
+            self.assertEqual("base\n", (output / "sample" / "common.txt").read_text(encoding="utf-8"))
+            self.assertEqual(
+                mod.file_map_entries(watcher.file_maps["sample"]), mod.collect_entries(output / "sample")
+            )
+
+    def test_archive_output_is_deterministic(self) -> None:
+        script = pathlib.Path(__file__).resolve().parent / "compose-templates.py"
+        with tempfile.TemporaryDirectory(prefix="meta-agent-compose-test-", dir="/tmp") as tmp:
+            root = pathlib.Path(tmp)
+            source = root / "source"
+            (source / "base" / "docs").mkdir(parents=True, exist_ok=True)
+            (source / "base" / "common.txt").write_text("base\n", encoding="utf-8")
+            (source / "base" / "docs" / "guide.md").write_text("guide\n", encoding="utf-8")
+            (source / "overlays" / "sample").mkdir(parents=True, exist_ok=True)
+            (source / "overlays" / "sample" / "run.sh").write_text("#!/bin/sh\n", encoding="utf-8")
+            (source / "overlays" / "sample" / "run.sh").chmod(0o755)
+            manifest = {
+                "version": 1,
+                "base": "base",
+                "overlayRoot": "overlays",
+                "templates": {"sample": {"overlays": ["sample"], "remove": [], "required": ["run.sh"]}},
+            }
+            manifest_path = source / "manifest.json"
+            manifest_path.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+
+            def compose_archive(name: str) -> pathlib.Path:
+                archive = root / name
+                result = subprocess.run(
+                    [
+                        "python3",
+                        str(script),
+                        "--source-root",
+                        str(source),
+                        "--manifest",
+                        str(manifest_path),
+                        "--output-root",
+                        str(root / "unused"),
+                        "--no-digest-cache",
+                        "--archive",
+                        str(archive),
+                        "--archive-prefix",
+                        "templates",
+                    ],
+                    check=False,
+                    capture_output=True,
+                    text=True,
+                )
+                self.assertEqual(0, result.returncode, result.stderr)
+                self.assertIn("[ARCHIVE] composed 1 template(s), 3 files", result.stdout)
+                return archive
+
+            first_zip = compose_archive("first.zip").read_bytes()
+            first_tgz = compose_archive("first.tar.gz").read_bytes()
+            for path in (source / "base").rglob("*"):
+                os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+            self.assertEqual(first_zip, compose_archive("second.zip").read_bytes())
+            self.assertEqual(first_tgz, compose_archive("second.tar.gz").read_bytes())
+            self.assertFalse((root / "unused").exists())
+
+            with zipfile.ZipFile(root / "first.zip") as archive:
+                self.assertEqual(
+                    [
+                        "templates/",
+                        "templates/sample/",
+                        "templates/sample/common.txt",
+                        "templates/sample/docs/",
+                        "templates/sample/docs/guide.md",
+                        "templates/sample/run.sh",
+                    ],
+                    archive.namelist(),
+                )
+                self.assertEqual(0o100755, archive.getinfo("templates/sample/run.sh").external_attr >> 16)
+                self.assertEqual((1980, 1, 1, 0, 0, 0), archive.getinfo("templates/sample/common.txt").date_time)
+            with tarfile.open(root / "first.tar.gz") as archive:
+                self.assertEqual(b"guide\n", archive.extractfile("templates/sample/docs/guide.md").read())
+
+    def test_virtual_file_map_matches_copied_layers(self) -> None:
+        mod = load_module()
+        with tempfile.TemporaryDirectory(prefix="meta-agent-compose-test-", dir="/tmp") as tmp:
+            root = pathlib.Path(tmp)
+            base = root / "base"
+            overlays = root / "overlays"
+            (base / "docs" / "drop").mkdir(parents=True, exist_ok=True)
+            (base / "empty").mkdir(parents=True, exist_ok=True)
+            (base / "common.txt").write_text("base\n", encoding="utf-8")
+            (base / "docs" / "guide.md").write_text("guide\n", encoding="utf-8")
+            (base / "docs" / "drop" / "gone.md").write_text("gone\n", encoding="utf-8")
+            (overlays / "one" / "docs").mkdir(parents=True, exist_ok=True)
+            (overlays / "one" / "common.txt").write_text("one\n", encoding="utf-8")
+            (overlays / "one" / "docs" / "extra.md").write_text("extra\n", encoding="utf-8")
+            (overlays / "two").mkdir(parents=True, exist_ok=True)
+            (overlays / "two" / "common.txt").write_text("two\n", encoding="utf-8")
+
+            template = mod.TemplateConfig(
+                name="sample",
+                overlays=["one", "two"],
+                remove=["docs/drop"],
+                required=["common.txt", "docs/extra.md"],
+            )
+            staged = root / "staged"
+            shutil.copytree(base, staged)
+            for overlay in template.overlays:
+                shutil.copytree(overlays / overlay, staged, dirs_exist_ok=True)
+            shutil.rmtree(staged / "docs" / "drop")
+            file_map = mod.build_file_map(template, base, overlays)
+
+            self.assertEqual(overlays / "two" / "common.txt", file_map["common.txt"])
+            self.assertIsNone(file_map["empty"])
+            self.assertNotIn("docs/drop/gone.md", file_map)
+            self.assertEqual(mod.collect_entries(staged), mod.file_map_entries(file_map))
+
+    def test_digest_cache_reuses_unchanged_file_digests(self) -> None:
+        mod = load_module()
+        with tempfile.TemporaryDirectory(prefix="meta-agent-compose-test-", dir="/tmp") as tmp:
+            root = pathlib.Path(tmp)
+            sample = root / "sample.txt"
+            sample.write_text("one\n", encoding="utf-8")
+            os.utime(sample, ns=(1_000_000_000, 1_000_000_000))
+            cache_path = root / "cache.json"
+
+            first = mod.DigestCache(cache_path)
+            digest = first.digest(sample)
+            first.save()
+            self.assertEqual((0, 1), (first.hits, first.misses))
+
+            second = mod.DigestCache(cache_path)
+            self.assertEqual(digest, second.digest(sample))
+            self.assertEqual((1, 0), (second.hits, second.misses))
+
+            sample.write_text("two\n", encoding="utf-8")
+            os.utime(sample, ns=(2_000_000_000, 2_000_000_000))
+            self.assertEqual(mod.hash_file(sample), second.digest(sample))
+            self.assertEqual((1, 1), (second.hits, second.misses))
+
+    def test_parallel_jobs_produce_identical_output(self) -> None:
+        script = pathlib.Path(__file__).resolve().parent / "compose-templates.py"
+        with tempfile.TemporaryDirectory(prefix="meta-agent-compose-test-", dir="/tmp") as tmp:
+            root = pathlib.Path(tmp)
+            source = root / "source"
+            (source / "base" / "nested").mkdir(parents=True, exist_ok=True)
+            for index in range(20):
+                (source / "base" / "nested" / f"file-{index}.txt").write_text(f"{index}\n", encoding="utf-8")
+            templates = {}
+            for name in ("alpha", "beta", "gamma", "delta"):
+                (source / "overlays" / name).mkdir(parents=True, exist_ok=True)
+                (source / "overlays" / name / "name.txt").write_text(f"{name}\n", encoding="utf-8")
+                templates[name] = {"overlays": [name], "remove": [], "required": ["name.txt"]}
+            manifest_path = source / "manifest.json"
+            manifest_path.write_text(
+                json.dumps({"version": 1, "base": "base", "overlayRoot": "overlays", "templates": templates}),
+                encoding="utf-8",
+            )
+
+            outputs = {}
+            for jobs in ("1", "4"):
+                output = root / f"output-{jobs}"
+                for extra in ([], ["--check"]):
+                    result = subprocess.run(
+                        [
+                            "python3",
+                            str(script),
+                            "--source-root",
+                            str(source),
+                            "--output-root",
+                            str(output),
+                            "--manifest",
+                            str(manifest_path),
+                            "--no-digest-cache",
+                            "--jobs",
+                            jobs,
+                            *extra,
+                        ],
+                        check=False,
+                        capture_output=True,
+                        text=True,
+                    )
+                    self.assertEqual(0, result.returncode, result.stderr)
+                    lines = [
+                        line.replace(str(output), "<output>")
+                        for line in result.stdout.splitlines()
+                        if not line.startswith("[CACHE]")
+                    ]
+                    outputs[(jobs, tuple(extra))] = lines
+
+            self.assertEqual(outputs[("1", ())], outputs[("4", ())])
+            self.assertEqual(outputs[("1", ("--check",))], outputs[("4", ("--check",))])
+            self.assertEqual(["alpha", "beta", "delta", "gamma"], [line.split("'")[1] for line in outputs[("4", ())]])
+
+    def test_link_modes_fall_back_to_copy(self) -> None:
+        mod = load_module()
+        with tempfile.TemporaryDirectory(prefix="meta-agent-compose-test-", dir="/tmp") as tmp:
+            root = pathlib.Path(tmp)
+            source = root / "source.txt"
+            source.write_text("payload\n", encoding="utf-8")
+
+            materializer = mod.FileMaterializer("hardlink")
+            self.assertEqual("hardlink", materializer.materialize(source, root / "linked.txt"))
+            self.assertEqual(source.stat().st_ino, (root / "linked.txt").stat().st_ino)
+
+            # Reflink support depends on the filesystem; either way the content must arrive.
+            materializer = mod.FileMaterializer("reflink")
+            self.assertIn(materializer.materialize(source, root / "cloned.txt"), {"reflink", "copy"})
+            self.assertEqual("payload\n", (root / "cloned.txt").read_text(encoding="utf-8"))
+            self.assertNotEqual(source.stat().st_ino, (root / "cloned.txt").stat().st_ino)
+
+            materializer = mod.FileMaterializer("copy")
+            self.assertEqual("copy", materializer.materialize(source, root / "copied.txt"))
+            self.assertEqual({"reflink": 0, "hardlink": 0, "copy": 1}, materializer.counts)
 
     def test_missing_required_path_fails(self) -> None:
         script = pathlib.Path(__file__).resolve().parent / "compose-templates.py"
@@ -143,6 +638,8 @@ class ComposeTemplatesTests(unittest.TestCase):
                     str(output),
                     "--manifest",
                     str(manifest_path),
+                    "--digest-cache",
+                    str(root / "digest-cache.json"),
                 ],
                 check=False,
                 capture_output=True,
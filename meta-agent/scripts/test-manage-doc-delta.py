@@ -4,6 +4,7 @@
 from __future__ import annotations
 
 import importlib.util
+import json
 import pathlib
 import subprocess
 import sys
@@ -75,6 +76,64 @@ class ManageDocDeltaTests(unittest.TestCase):
             self.assertEqual(1, result.returncode)
             self.assertIn("order check failed", result.stderr)
 
+    def test_check_all_reports_every_violation_as_json(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            doc_path = pathlib.Path(tmp) / "DOC_DELTA.md"
+            doc_path.write_text(
+                build_doc_delta(
+                    [
+                        "## 2026-02-14 20:40:00Z - First\n\n- A.",
+                        "## 2026-02-14 20:55:00Z - Late\n\n- L.",
+                        "## 2026-02-14 20:45:00Z - Second\n\n- B.",
+                        "## 2026-02-14 20:50:00Z - Third\n\n- C.",
+                        "## 2026-02-14 20:50:00Z - Third\n\n- C again.",
+                        "## 2026-02-14 20:10:00Z - Early\n\n- E.",
+                        "## Not a dated heading\n\n- X.",
+                        "## 2026-02-14 21:00:00Z - Last\n\n- Z.",
+                    ]
+                ),
+                encoding="utf-8",
+            )
+
+            result = run_script("--doc-delta", str(doc_path), "check", "--json")
+            self.assertEqual(1, result.returncode)
+            payload = json.loads(result.stdout)
+            self.assertFalse(payload["passed"])
+            self.assertEqual(7, payload["entries"])
+            self.assertEqual(["## Not a dated heading"], [item["text"] for item in payload["invalidHeaders"]])
+            self.assertEqual(
+                [("2026-02-14 20:50:00Z", "Third")],
+                [(item["timestamp"], item["title"]) for item in payload["duplicates"]],
+            )
+            self.assertEqual(["Late", "Early"], [item["title"] for item in payload["outOfOrder"]])
+            early = payload["outOfOrder"][1]
+            self.assertEqual(6, early["position"])
+            self.assertEqual(1, early["expectedPosition"])
+
+            text_result = run_script("--doc-delta", str(doc_path), "check", "--all")
+            self.assertEqual(1, text_result.returncode)
+            self.assertIn("invalid heading", text_result.stderr)
+            self.assertIn("duplicate entry", text_result.stderr)
+            self.assertIn("2 entries must move", text_result.stderr)
+
+    def test_check_all_passes_on_sorted_entries(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            doc_path = pathlib.Path(tmp) / "DOC_DELTA.md"
+            doc_path.write_text(
+                build_doc_delta(
+                    [
+                        "## 2026-02-14 20:40:00Z - First\n\n- A.",
+                        "## 2026-02-14 20:40:00Z - Same time\n\n- B.",
+                    ]
+                ),
+                encoding="utf-8",
+            )
+            result = run_script("--doc-delta", str(doc_path), "check", "--json")
+            self.assertEqual(0, result.returncode, msg=result.stdout)
+            payload = json.loads(result.stdout)
+            self.assertTrue(payload["passed"])
+            self.assertEqual([], payload["outOfOrder"])
+
     def test_fix_sorts_out_of_order_entries(self):
         with tempfile.TemporaryDirectory() as tmp:
             doc_path = pathlib.Path(tmp) / "DOC_DELTA.md"
@@ -156,6 +215,200 @@ class ManageDocDeltaTests(unittest.TestCase):
             self.assertIn("- line one", updated)
             self.assertIn("- line two", updated)
 
+    def test_query_filters_by_range_title_and_keyword(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            doc_path = pathlib.Path(tmp) / "DOC_DELTA.md"
+            doc_path.write_text(
+                build_doc_delta(
+                    [
+                        "## 2026-02-14 20:40:00Z - Release runbook\n\n- Added RUNBOOK_RELEASE.",
+                        "## 2026-02-15 09:00:00Z - Harness drift\n\n- Tracked pass rate.",
+                        "## 2026-02-16 12:00:00Z - Release packaging\n\n- Zipped runtimes.",
+                    ]
+                ),
+                encoding="utf-8",
+            )
+
+            result = run_script(
+                "--doc-delta",
+                str(doc_path),
+                "query",
+                "--since",
+                "2026-02-15 00:00:00Z",
+                "--title",
+                "release",
+            )
+            self.assertEqual(0, result.returncode, msg=result.stderr)
+            payload = json.loads(result.stdout)
+            self.assertEqual(3, payload["totalEntries"])
+            self.assertEqual(["Release packaging"], [entry["title"] for entry in payload["entries"]])
+            self.assertFalse(payload["indexCacheHit"])
+
+            result = run_script(
+                "--doc-delta",
+                str(doc_path),
+                "query",
+                "--title-regex",
+                "^(Release|Harness) ",
+                "--keyword",
+                "RUNBOOK",
+            )
+            self.assertEqual(0, result.returncode, msg=result.stderr)
+            payload = json.loads(result.stdout)
+            self.assertEqual(["Release runbook"], [entry["title"] for entry in payload["entries"]])
+            self.assertTrue(payload["indexCacheHit"])
+
+    def test_query_index_is_rebuilt_after_file_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            doc_path = pathlib.Path(tmp) / "DOC_DELTA.md"
+            doc_path.write_text(
+                build_doc_delta(["## 2026-02-14 20:40:00Z - First\n\n- A."]),
+                encoding="utf-8",
+            )
+            first = run_script("--doc-delta", str(doc_path), "query")
+            self.assertEqual(0, first.returncode, msg=first.stderr)
+            self.assertTrue((pathlib.Path(tmp) / "DOC_DELTA.md.index.json").exists())
+
+            add_result = run_script(
+                "--doc-delta",
+                str(doc_path),
+                "add",
+                "--title",
+                "Second",
+                "--timestamp",
+                "2026-02-14 20:50:00Z",
+                "--change",
+                "B.",
+            )
+            self.assertEqual(0, add_result.returncode, msg=add_result.stderr)
+
+            second = run_script("--doc-delta", str(doc_path), "query", "--keyword", "b.")
+            self.assertEqual(0, second.returncode, msg=second.stderr)
+            payload = json.loads(second.stdout)
+            self.assertFalse(payload["indexCacheHit"])
+            self.assertEqual(2, payload["totalEntries"])
+            self.assertEqual(["Second"], [entry["title"] for entry in payload["entries"]])
+
+    def test_query_does_not_wait_for_writer_lock(self):
+        mod = load_module()
+        with tempfile.TemporaryDirectory() as tmp:
+            doc_path = pathlib.Path(tmp) / "DOC_DELTA.md"
+            doc_path.write_text(
+                build_doc_delta(["## 2026-02-14 20:40:00Z - First\n\n- A."]),
+                encoding="utf-8",
+            )
+            with mod.acquire_doc_delta_lock(
+                doc_delta_path=doc_path,
+                timeout_seconds=5.0,
+                poll_interval_seconds=0.05,
+                operation="test-holder",
+            ):
+                result = run_script("--doc-delta", str(doc_path), "--lock-timeout-seconds", "0", "query")
+
+            self.assertEqual(0, result.returncode, msg=result.stderr)
+            self.assertEqual(1, json.loads(result.stdout)["totalEntries"])
+
+    def test_journal_add_skips_lock_and_compact_merges_in_order(self):
+        mod = load_module()
+        with tempfile.TemporaryDirectory() as tmp:
+            doc_path = pathlib.Path(tmp) / "DOC_DELTA.md"
+            doc_path.write_text(
+                build_doc_delta(
+                    [
+                        "## 2026-02-14 20:40:00Z - First\n\n- A.",
+                        "## 2026-02-14 20:50:00Z - Third\n\n- C.",
+                    ]
+                ),
+                encoding="utf-8",
+            )
+
+            journal_writes = [
+                ("Fourth", "2026-02-14 20:55:00Z"),
+                ("Second", "2026-02-14 20:45:00Z"),
+            ]
+            with mod.acquire_doc_delta_lock(
+                doc_delta_path=doc_path,
+                timeout_seconds=5.0,
+                poll_interval_seconds=0.05,
+                operation="test-holder",
+            ):
+                for title, timestamp in journal_writes:
+                    result = run_script(
+                        "--doc-delta",
+                        str(doc_path),
+                        "--lock-timeout-seconds",
+                        "0.10",
+                        "add",
+                        "--journal",
+                        "--title",
+                        title,
+                        "--timestamp",
+                        timestamp,
+                        "--change",
+                        f"{title} change.",
+                    )
+                    self.assertEqual(0, result.returncode, msg=result.stderr)
+
+            journal_dir = pathlib.Path(tmp) / "DOC_DELTA.md.journal"
+            self.assertEqual(2, len(list(journal_dir.glob("*.entry.md"))))
+            self.assertNotIn("Fourth", doc_path.read_text(encoding="utf-8"))
+
+            compact_result = run_script("--doc-delta", str(doc_path), "compact")
+            self.assertEqual(0, compact_result.returncode, msg=compact_result.stderr)
+            self.assertIn("Compacted 2 journal entries", compact_result.stdout)
+            self.assertEqual([], list(journal_dir.glob("*.entry.md")))
+
+            updated = doc_path.read_text(encoding="utf-8")
+            positions = [updated.index(f" - {title}\n") for title in ("First", "Second", "Third", "Fourth")]
+            self.assertEqual(sorted(positions), positions)
+
+            check_result = run_script("--doc-delta", str(doc_path), "check")
+            self.assertEqual(0, check_result.returncode, msg=check_result.stderr)
+
+    def test_compact_skips_entries_already_merged(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            doc_path = pathlib.Path(tmp) / "DOC_DELTA.md"
+            doc_path.write_text(
+                build_doc_delta(["## 2026-02-14 20:40:00Z - First\n\n- A."]),
+                encoding="utf-8",
+            )
+            journal_dir = pathlib.Path(tmp) / "DOC_DELTA.md.journal"
+            journal_dir.mkdir()
+            (journal_dir / "20260214T204000Z-1-1-a.entry.md").write_text(
+                "## 2026-02-14 20:40:00Z - First\n\n- A.\n",
+                encoding="utf-8",
+            )
+            # Ledger left by a compaction that rewrote DOC_DELTA but died before clearing the spool.
+            (journal_dir / ".compact-in-progress.json").write_text(
+                json.dumps({"docDeltaSha256Before": "0" * 64, "files": ["20260214T204000Z-1-1-a.entry.md"]}),
+                encoding="utf-8",
+            )
+            before = doc_path.read_text(encoding="utf-8")
+
+            result = run_script("--doc-delta", str(doc_path), "compact")
+            self.assertEqual(0, result.returncode, msg=result.stderr)
+            self.assertIn("1 already present", result.stdout)
+            self.assertEqual(before, doc_path.read_text(encoding="utf-8"))
+            self.assertEqual([], list(journal_dir.glob("*.entry.md")))
+            self.assertFalse((journal_dir / ".compact-in-progress.json").exists())
+
+    def test_compact_keeps_identical_entries_from_separate_spool_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            doc_path = pathlib.Path(tmp) / "DOC_DELTA.md"
+            doc_path.write_text(
+                build_doc_delta(["## 2026-02-14 20:40:00Z - Status\n\n- Green."]),
+                encoding="utf-8",
+            )
+            journal_dir = pathlib.Path(tmp) / "DOC_DELTA.md.journal"
+            journal_dir.mkdir()
+            for name in ("20260214T204000Z-1-1-a.entry.md", "20260214T204000Z-2-1-b.entry.md"):
+                (journal_dir / name).write_text("## 2026-02-14 20:40:00Z - Status\n\n- Green.\n", encoding="utf-8")
+
+            result = run_script("--doc-delta", str(doc_path), "compact")
+            self.assertEqual(0, result.returncode, msg=result.stderr)
+            self.assertIn("Compacted 2 journal entries", result.stdout)
+            self.assertEqual(3, doc_path.read_text(encoding="utf-8").count("## 2026-02-14 20:40:00Z - Status"))
+
     def test_lock_timeout_when_locked_by_another_agent(self):
         mod = load_module()
         with tempfile.TemporaryDirectory() as tmp:
@@ -1,12 +1,16 @@
 #!/usr/bin/env python3
-"""Basic coverage for package-release.py skip-publish mode."""
+"""Basic coverage for package-release.py skip-publish mode, linked assets and parallel publishing."""
 
 from __future__ import annotations
 
 import hashlib
+import importlib.util
+import json
+import os
 import pathlib
 import subprocess
 import sys
+import tarfile
 import tempfile
 import zipfile
 
@@ -19,6 +23,113 @@ def sha256_file(path: pathlib.Path) -> str:
     return digest.hexdigest()
 
 
+FAKE_DOTNET = """#!{python}
+import json, os, pathlib, sys
+args = sys.argv[1:]
+output = pathlib.Path(args[args.index("-o") + 1])
+runtime = args[args.index("-r") + 1]
+with open(os.environ["FAKE_DOTNET_LOG"], "a", encoding="utf-8") as log:
+    log.write(json.dumps(args) + "\\n")
+output.mkdir(parents=True, exist_ok=True)
+(output / ("MetaAgent.Cli.exe" if runtime.startswith("win") else "MetaAgent.Cli")).write_bytes(runtime.encode())
+"""
+
+
+def load_module(script: pathlib.Path):
+    spec = importlib.util.spec_from_file_location("package_release", script)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Unable to load module from {script}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def check_linked_assets(script: pathlib.Path) -> int:
+    """Symlinked asset files and directories are packaged as content; raw link members are rejected."""
+    module = load_module(script)
+    with tempfile.TemporaryDirectory(prefix="meta-agent-package-test-links-", dir="/tmp") as temp_raw:
+        temp = pathlib.Path(temp_raw)
+        shared = temp / "shared"
+        (shared / "nested").mkdir(parents=True)
+        (shared / "nested" / "sample.json").write_text("{}\n", encoding="utf-8")
+        assets = temp / "examples"
+        assets.mkdir()
+        (assets / "linked.json").symlink_to(shared / "nested" / "sample.json")
+        (assets / "linked-dir").symlink_to(shared / "nested", target_is_directory=True)
+
+        bundle_path = temp / "bundle.tar"
+        with tarfile.open(bundle_path, "w", dereference=True) as bundle:
+            module.add_tree_to_tar(bundle, assets, "examples")
+        zip_path = temp / "linked.zip"
+        with module.ReleaseZip(zip_path) as release:
+            release.add_tar(bundle_path, "pkg")
+        with zipfile.ZipFile(zip_path) as archive:
+            for name in ("pkg/examples/linked.json", "pkg/examples/linked-dir/sample.json"):
+                if name not in archive.namelist() or archive.read(name) != b"{}\n":
+                    print(f"symlinked asset not packaged as content: {name}", file=sys.stderr)
+                    return 1
+
+        raw_path = temp / "raw.tar"
+        with tarfile.open(raw_path, "w") as bundle:
+            bundle.add(assets / "linked.json", arcname="linked.json")
+        try:
+            with module.ReleaseZip(temp / "raw.zip") as release:
+                release.add_tar(raw_path, "pkg")
+        except ValueError:
+            return 0
+        print("symlink tar member was silently accepted", file=sys.stderr)
+        return 1
+
+
+def check_parallel_publish(repo_root: pathlib.Path, script: pathlib.Path) -> int:
+    """Publish two runtimes with --jobs 2 through a stand-in dotnet and check isolation and outputs."""
+    runtimes = ["win-x64", "linux-x64"]
+    with tempfile.TemporaryDirectory(prefix="meta-agent-package-test-jobs-", dir="/tmp") as temp_raw:
+        temp = pathlib.Path(temp_raw)
+        fake_bin = temp / "bin"
+        fake_bin.mkdir()
+        fake_dotnet = fake_bin / "dotnet"
+        fake_dotnet.write_text(FAKE_DOTNET.format(python=sys.executable), encoding="utf-8")
+        fake_dotnet.chmod(0o755)
+        log_path = temp / "dotnet.log"
+        output_dir = temp / "out"
+
+        command = ["python3", str(script), "--jobs", "2", "--output-dir", str(output_dir), "--version", "1.0.2-test"]
+        for runtime in runtimes:
+            command.extend(["--runtime", runtime])
+        result = subprocess.run(
+            command,
+            cwd=str(repo_root),
+            check=False,
+            env={**os.environ, "PATH": f"{fake_bin}{os.pathsep}{os.environ.get('PATH', '')}", "FAKE_DOTNET_LOG": str(log_path)},
+        )
+        if result.returncode != 0:
+            print("package-release.py failed with --jobs 2", file=sys.stderr)
+            return 1
+
+        invocations = [json.loads(line) for line in log_path.read_text(encoding="utf-8").splitlines()]
+        for flag in ("-o", "--artifacts-path"):
+            paths = {args[args.index(flag) + 1] for args in invocations if flag in args}
+            if len(paths) != len(runtimes):
+                print(f"expected a separate {flag} per runtime, got: {sorted(paths)}", file=sys.stderr)
+                return 1
+
+        sums = (output_dir / "SHA256SUMS.txt").read_text(encoding="utf-8").splitlines()
+        for runtime in runtimes:
+            zip_name = f"meta-agent-1.0.2-test-{runtime}.zip"
+            zip_path = output_dir / zip_name
+            if f"{sha256_file(zip_path)}  {zip_name}" not in sums:
+                print(f"checksums file missing or wrong for {zip_name}", file=sys.stderr)
+                return 1
+            packaged_name = "meta-agent.exe" if runtime.startswith("win") else "meta-agent"
+            with zipfile.ZipFile(zip_path) as archive:
+                if archive.read(f"meta-agent-1.0.2-test-{runtime}/{packaged_name}") != runtime.encode():
+                    print(f"{zip_name} packaged another runtime's executable", file=sys.stderr)
+                    return 1
+    return 0
+
+
 def main() -> int:
     repo_root = pathlib.Path(__file__).resolve().parents[2]
     script = repo_root / "meta-agent" / "scripts" / "package-release.py"
@@ -107,6 +218,12 @@ def main() -> int:
                         print(f"- {item}", file=sys.stderr)
                     return 1
 
+    if check_linked_assets(script) != 0:
+        return 1
+
+    if check_parallel_publish(repo_root, script) != 0:
+        return 1
+
     print("package-release.py test passed")
     return 0
 
@@ -95,6 +95,7 @@ class SemverTagTests(unittest.TestCase):
         self.assertIn(["python3", "meta-agent/scripts/compose-templates.py", "--check"], steps)
         self.assertIn(["python3", "meta-agent/scripts/test-manage-doc-delta.py"], steps)
         self.assertIn(["python3", "meta-agent/scripts/manage-doc-delta.py", "check"], steps)
+        self.assertIn(["python3", "meta-agent/scripts/test-run-regression-harness.py"], steps)
 
     def test_build_steps_includes_version_sync_tag_when_present(self):
         mod = load_module()
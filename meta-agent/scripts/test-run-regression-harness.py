@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""Tests for run-regression-harness.py using the fake CLI stand-in."""
+
+from __future__ import annotations
+
+import csv
+import importlib.util
+import json
+import os
+import pathlib
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+SCRIPTS_DIR = pathlib.Path(__file__).resolve().parent
+SCRIPT_PATH = SCRIPTS_DIR / "run-regression-harness.py"
+CANONICAL_TASKS = SCRIPTS_DIR / "canonical-regression-tasks.json"
+FAKE_CLI_COMMAND = "{python} {scripts_dir}/fake-meta-agent-cli.py"
+
+
+def load_module():
+    spec = importlib.util.spec_from_file_location("run_regression_harness", SCRIPT_PATH)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Unable to load module from {SCRIPT_PATH}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def create_fixture_repo(root: pathlib.Path) -> pathlib.Path:
+    """Minimal repo layout the harness needs: compose script, template sources and the fake CLI."""
+    repo = root / "repo"
+    scripts = repo / "meta-agent" / "scripts"
+    scripts.mkdir(parents=True, exist_ok=True)
+    shutil.copy2(SCRIPTS_DIR / "compose-templates.py", scripts / "compose-templates.py")
+    shutil.copy2(SCRIPTS_DIR / "fake-meta-agent-cli.py", scripts / "fake-meta-agent-cli.py")
+
+    source = repo / "meta-agent" / "template-src"
+    (source / "base").mkdir(parents=True, exist_ok=True)
+    (source / "base" / "README.md").write_text("# template\n", encoding="utf-8")
+    (source / "overlays").mkdir(parents=True, exist_ok=True)
+    manifest = {
+        "version": 1,
+        "base": "base",
+        "overlayRoot": "overlays",
+        "templates": {"generic": {"overlays": [], "remove": [], "required": ["README.md"]}},
+    }
+    (source / "manifest.json").write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    return repo
+
+
+def run_harness(
+    repo: pathlib.Path,
+    output_root: pathlib.Path,
+    *args: str,
+    tasks: pathlib.Path = CANONICAL_TASKS,
+    env: dict[str, str] | None = None,
+) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        [
+            "python3",
+            str(SCRIPT_PATH),
+            "--repo-root",
+            str(repo),
+            "--output-root",
+            str(output_root),
+            "--tasks",
+            str(tasks),
+            "--cli-command",
+            FAKE_CLI_COMMAND,
+            *args,
+        ],
+        check=False,
+        capture_output=True,
+        text=True,
+        env={**os.environ, **(env or {})},
+    )
+
+
+def load_summary(output_root: pathlib.Path, run_id: str) -> dict:
+    return json.loads((output_root / "runs" / run_id / "harness-summary.json").read_text(encoding="utf-8"))
+
+
+def write_tasks(path: pathlib.Path, tasks: list[dict]) -> pathlib.Path:
+    path.write_text(json.dumps({"tasks": tasks}, indent=2) + "\n", encoding="utf-8")
+    return path
+
+
+def version_task(name: str, **extra) -> dict:
+    return {
+        "name": name,
+        "expected_exit_code": 0,
+        "args": ["version", "--output", "{artifacts_dir}/" + name],
+        **extra,
+    }
+
+
+class RunRegressionHarnessTests(unittest.TestCase):
+    def test_canonical_tasks_pass_and_rerun_hits_cache(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="meta-agent-harness-test-", dir="/tmp") as tmp:
+            root = pathlib.Path(tmp)
+            repo = create_fixture_repo(root)
+            output_root = root / "output"
+
+            first = run_harness(repo, output_root, "--run-id", "first")
+            self.assertEqual(0, first.returncode, first.stdout + first.stderr)
+            summary = load_summary(output_root, "first")
+            self.assertEqual("custom", summary["cli_build"]["mode"])
+            self.assertEqual(5, summary["tasks_passed"])
+            self.assertEqual(0, summary["result_cache"]["hits"])
+            self.assertEqual(5, summary["metrics"]["totalRuns"])
+            self.assertEqual(2, summary["metrics"]["failedRuns"])
+
+            second = run_harness(repo, output_root, "--run-id", "second")
+            self.assertEqual(0, second.returncode, second.stdout + second.stderr)
+            self.assertEqual(5, load_summary(output_root, "second")["result_cache"]["hits"])
+
+    def test_restored_cache_entries_point_at_the_restoring_run(self) -> None:
+        module = load_module()
+        with tempfile.TemporaryDirectory(prefix="meta-agent-harness-test-", dir="/tmp") as tmp:
+            root = pathlib.Path(tmp)
+            cache_root = root / "result-cache"
+            task = version_task("version")
+
+            def run_context(run_id: str) -> tuple[pathlib.Path, dict[str, str]]:
+                run_dir = root / "runs" / run_id
+                (run_dir / "logs").mkdir(parents=True)
+                (run_dir / "workspace").mkdir()
+                (run_dir / "artifacts").mkdir()
+                ctx = {"workspace_dir": str(run_dir / "workspace"), "artifacts_dir": str(run_dir / "artifacts")}
+                return run_dir, ctx
+
+            first_dir, first_ctx = run_context("first")
+            (first_dir / "artifacts" / "report.json").write_text(json.dumps({"path": str(first_dir)}), encoding="utf-8")
+            (first_dir / "logs" / "version.stdout.log").write_text(f"wrote {first_dir}/artifacts\n", encoding="utf-8")
+            (first_dir / "logs" / "version.stderr.log").write_text("", encoding="utf-8")
+            result = module.TaskResult(
+                name="version",
+                description="",
+                command=[],
+                expected_exit_code=0,
+                exit_code=0,
+                passed=True,
+                duration_ms=1,
+                stdout_path=str(first_dir / "logs" / "version.stdout.log"),
+                stderr_path=str(first_dir / "logs" / "version.stderr.log"),
+            )
+            module.store_cached_result(cache_root, "ab" * 32, result, first_ctx, first_dir)
+
+            second_dir, second_ctx = run_context("second")
+            restored = module.restore_cached_result(
+                cache_root, "ab" * 32, task, [], second_ctx, second_dir / "logs", second_dir
+            )
+            self.assertIsNotNone(restored)
+            report = json.loads((second_dir / "artifacts" / "report.json").read_text(encoding="utf-8"))
+            self.assertEqual(str(second_dir), report["path"])
+            self.assertEqual(f"wrote {second_dir}/artifacts\n", restored.stdout_tail)
+
+            module.store_cached_result(cache_root, "cd" * 32, result, first_ctx, first_dir)
+            os.utime(cache_root / "cd" / ("cd" * 32) / "result.json", (0, 0))
+            self.assertEqual(1, module.prune_result_cache(cache_root, 1))
+            self.assertTrue((cache_root / "ab" / ("ab" * 32)).exists())
+            self.assertFalse((cache_root / "cd" / ("cd" * 32)).exists())
+
+    def test_drift_only_compares_runs_with_the_same_isolation(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="meta-agent-harness-test-", dir="/tmp") as tmp:
+            root = pathlib.Path(tmp)
+            repo = create_fixture_repo(root)
+            output_root = root / "output"
+
+            for run_id, jobs in (("shared", "1"), ("isolated", "2"), ("isolated-again", "2")):
+                result = run_harness(repo, output_root, "--run-id", run_id, "--jobs", jobs, "--no-cache")
+                self.assertEqual(0, result.returncode, result.stdout + result.stderr)
+
+            self.assertTrue(load_summary(output_root, "isolated")["drift"]["baseline"])
+            drift = load_summary(output_root, "isolated-again")["drift"]
+            self.assertEqual("per_task", drift["isolation"])
+            self.assertNotIn("baseline", drift)
+
+            conn = sqlite3.connect(str(output_root / "history" / "harness-history.sqlite3"))
+            try:
+                rows = conn.execute("SELECT run_id, jobs, isolation, cli_mode FROM runs ORDER BY seq").fetchall()
+            finally:
+                conn.close()
+            self.assertEqual(
+                [
+                    ("shared", 1, "shared", "custom"),
+                    ("isolated", 2, "per_task", "custom"),
+                    ("isolated-again", 2, "per_task", "custom"),
+                ],
+                rows,
+            )
+
+    def test_perf_baseline_only_uses_runs_with_the_same_cli_mode_and_jobs(self) -> None:
+        module = load_module()
+        with tempfile.TemporaryDirectory(prefix="meta-agent-harness-test-", dir="/tmp") as tmp:
+            conn = module.open_history_db(pathlib.Path(tmp) / "harness-history.sqlite3")
+            try:
+                for run_id, cli_mode, jobs, duration_ms in (
+                    ("prebuilt", "prebuilt", 1, 100),
+                    ("dotnet-run", "dotnet-run", 1, 900),
+                    ("parallel", "prebuilt", 4, 300),
+                    ("prebuilt-again", "prebuilt", 1, 110),
+                ):
+                    summary = {
+                        "run_id": run_id,
+                        "timestamp_utc": "2026-01-01T00:00:00Z",
+                        "tasks_total": 1,
+                        "tasks_passed": 1,
+                        "tasks_failed": 0,
+                        "expected_failures": 0,
+                        "unexpected_failures": 0,
+                        "pass_rate": 1.0,
+                        "metrics": {},
+                        "jobs": jobs,
+                        "isolation": "per_task" if jobs > 1 else "shared",
+                        "cli_mode": cli_mode,
+                        "task_results": [{"name": "version", "duration_ms": duration_ms, "passed": True}],
+                    }
+                    module.record_history(conn, summary, "sig")
+                self.assertEqual({"version": [100, 110]}, module.load_task_duration_history(conn, 20, "prebuilt", 1))
+                self.assertEqual({"version": [300]}, module.load_task_duration_history(conn, 20, "prebuilt", 4))
+                self.assertEqual({"version": [100, 900, 300, 110]}, module.load_task_duration_history(conn, 20))
+                trends = module.query_task_trends(conn, 20, "version")
+                self.assertEqual(
+                    [("dotnet-run", 1, 1), ("prebuilt", 1, 2), ("prebuilt", 4, 1)],
+                    [(entry["cli_mode"], entry["jobs"], entry["window_samples"]) for entry in trends],
+                )
+                self.assertEqual(105, trends[1]["median_ms"])
+            finally:
+                conn.close()
+
+    def test_history_subcommands_report_recorded_runs(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="meta-agent-harness-test-", dir="/tmp") as tmp:
+            root = pathlib.Path(tmp)
+            repo = create_fixture_repo(root)
+            output_root = root / "output"
+            tasks = write_tasks(root / "tasks.json", [version_task("version"), version_task("other")])
+
+            for run_id in ("first", "second"):
+                result = run_harness(repo, output_root, "--run-id", run_id, "--no-cache", tasks=tasks)
+                self.assertEqual(0, result.returncode, result.stdout + result.stderr)
+
+            pass_rate = run_harness(repo, output_root, "history", "pass-rate", "--limit", "1")
+            self.assertEqual(0, pass_rate.returncode, pass_rate.stderr)
+            rows = json.loads(pass_rate.stdout)
+            self.assertEqual(["second"], [row["run_id"] for row in rows])
+            self.assertEqual(1.0, rows[0]["pass_rate"])
+
+            for task_option in (["--task", "version"], ["--task=version"]):
+                trends = run_harness(repo, output_root, "history", "tasks", *task_option)
+                self.assertEqual(0, trends.returncode, trends.stderr)
+                entries = json.loads(trends.stdout)
+                self.assertEqual(
+                    [("version", "custom", 1)],
+                    [(entry["task_name"], entry["cli_mode"], entry["jobs"]) for entry in entries],
+                )
+                self.assertEqual((2, 2), (entries[0]["runs"], entries[0]["window_samples"]))
+
+            csv_path = root / "export" / "history.csv"
+            exported = run_harness(repo, output_root, "history", "export-csv", "--out", str(csv_path))
+            self.assertEqual(0, exported.returncode, exported.stderr)
+            self.assertIn("Exported 2 runs", exported.stdout)
+            with csv_path.open(newline="", encoding="utf-8") as handle:
+                records = list(csv.DictReader(handle))
+            self.assertEqual(["first", "second"], [record["run_id"] for record in records])
+            self.assertEqual("1.0000", records[0]["pass_rate"])
+
+    def test_compose_is_skipped_until_template_sources_change(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="meta-agent-harness-test-", dir="/tmp") as tmp:
+            root = pathlib.Path(tmp)
+            repo = create_fixture_repo(root)
+            output_root = root / "output"
+            tasks = write_tasks(root / "tasks.json", [version_task("version")])
+
+            for run_id, expect_skip in (("compose", False), ("reuse", True)):
+                result = run_harness(repo, output_root, "--run-id", run_id, tasks=tasks)
+                self.assertEqual(0, result.returncode, result.stdout + result.stderr)
+                self.assertEqual(expect_skip, load_summary(output_root, run_id)["template_compose"]["skipped"])
+
+            (repo / "meta-agent" / "template-src" / "base" / "README.md").write_text("# changed\n", encoding="utf-8")
+            result = run_harness(repo, output_root, "--run-id", "recompose", tasks=tasks)
+            self.assertEqual(0, result.returncode, result.stdout + result.stderr)
+            self.assertFalse(load_summary(output_root, "recompose")["template_compose"]["skipped"])
+            composed = repo / "meta-agent" / "templates" / "generic" / "README.md"
+            self.assertEqual("# changed\n", composed.read_text(encoding="utf-8"))
+
+    def test_dependents_of_failed_task_are_skipped(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="meta-agent-harness-test-", dir="/tmp") as tmp:
+            root = pathlib.Path(tmp)
+            repo = create_fixture_repo(root)
+            output_root = root / "output"
+            tasks = write_tasks(
+                root / "tasks.json",
+                [
+                    {
+                        "name": "triage_first",
+                        "expected_exit_code": 0,
+                        "args": ["triage", "--ticket", "too short", "--output", "{artifacts_dir}/triage.json"],
+                    },
+                    version_task("after_triage", depends_on=["triage_first"]),
+                    version_task("independent"),
+                ],
+            )
+
+            result = run_harness(repo, output_root, "--run-id", "dag", "--jobs", "2", "--no-cache", tasks=tasks)
+            self.assertEqual(1, result.returncode, result.stdout + result.stderr)
+            self.assertIn("[SKIP] after_triage", result.stdout)
+            summary = load_summary(output_root, "dag")
+            self.assertEqual(1, summary["tasks_skipped"])
+            self.assertEqual(1, summary["tasks_passed"])
+            results = {task["name"]: task for task in summary["task_results"]}
+            self.assertEqual("triage_first", results["after_triage"]["blocked_by"])
+
+            run_dir = output_root / "runs" / "dag"
+            events = [json.loads(line) for line in (run_dir / "events.jsonl").read_text(encoding="utf-8").splitlines()]
+            self.assertEqual("run_start", events[0]["event"])
+            self.assertEqual("run_end", events[-1]["event"])
+            ends = {event["task"]: event["status"] for event in events if event["event"] == "task_end"}
+            self.assertEqual({"triage_first": "failed", "after_triage": "skipped", "independent": "passed"}, ends)
+            self.assertEqual(2, sum(1 for event in events if event["event"] == "task_start"))
+
+            junit = ET.parse(run_dir / "junit.xml").getroot()
+            self.assertEqual(("3", "1", "1"), (junit.get("tests"), junit.get("failures"), junit.get("skipped")))
+            cases = {case.get("name"): case for case in junit.iter("testcase")}
+            self.assertIsNotNone(cases["triage_first"].find("failure"))
+            self.assertIsNotNone(cases["after_triage"].find("skipped"))
+
+    def test_critical_path_follows_the_longest_dependent_chain(self) -> None:
+        module = load_module()
+        tasks = [
+            version_task("setup"),
+            version_task("slow_check", depends_on=["setup"]),
+            version_task("fast_check", depends_on=["setup"]),
+            version_task("independent"),
+        ]
+        durations = {"setup": 100, "slow_check": 300, "fast_check": 50, "independent": 350}
+        results = [{"name": name, "duration_ms": duration} for name, duration in durations.items()]
+        self.assertEqual(
+            {"tasks": ["setup", "slow_check"], "duration_ms": 400},
+            module.compute_critical_path(tasks, results),
+        )
+
+        # A skipped dependent records zero duration, so its chain ties with the
+        # dependency alone and the earlier task ends the reported path.
+        results = [{"name": "setup", "duration_ms": 100}, {"name": "slow_check", "duration_ms": 0}]
+        self.assertEqual(
+            {"tasks": ["setup"], "duration_ms": 100},
+            module.compute_critical_path(tasks[:2], results),
+        )
+
+    def test_timed_out_task_is_killed(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="meta-agent-harness-test-", dir="/tmp") as tmp:
+            root = pathlib.Path(tmp)
+            repo = create_fixture_repo(root)
+            output_root = root / "output"
+            tasks = write_tasks(root / "tasks.json", [version_task("slow", timeout_seconds=0.5)])
+
+            result = run_harness(
+                repo,
+                output_root,
+                "--run-id",
+                "slow",
+                "--no-cache",
+                tasks=tasks,
+                env={"FAKE_META_AGENT_DELAY_MS": "5000"},
+            )
+            self.assertEqual(1, result.returncode, result.stdout + result.stderr)
+            task = load_summary(output_root, "slow")["task_results"][0]
+            self.assertTrue(task["timed_out"])
+            self.assertLess(task["duration_ms"], 5000)
+
+    def test_shard_summaries_merge_into_one_run(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="meta-agent-harness-test-", dir="/tmp") as tmp:
+            root = pathlib.Path(tmp)
+            repo = create_fixture_repo(root)
+            output_root = root / "output"
+
+            shard_summaries = []
+            for index in (1, 2):
+                run_id = f"shard-{index}"
+                result = run_harness(repo, output_root, "--run-id", run_id, "--shard", f"{index}/2")
+                self.assertEqual(0, result.returncode, result.stdout + result.stderr)
+                self.assertEqual("hash", load_summary(output_root, run_id)["shard"]["strategy"])
+                shard_summaries.append(str(output_root / "runs" / run_id / "harness-summary.json"))
+
+            merged = run_harness(repo, output_root, "--run-id", "merged", "merge", *shard_summaries)
+            self.assertEqual(0, merged.returncode, merged.stdout + merged.stderr)
+            summary = load_summary(output_root, "merged")
+            self.assertEqual(5, summary["tasks_total"])
+            names = [task["name"] for task in summary["task_results"]]
+            canonical = json.loads(CANONICAL_TASKS.read_text(encoding="utf-8"))["tasks"]
+            self.assertEqual([task["name"] for task in canonical], names)
+
+            incomplete = run_harness(repo, output_root, "--run-id", "partial", "merge", shard_summaries[0])
+            self.assertNotEqual(0, incomplete.returncode)
+            self.assertIn("expected one summary per shard", incomplete.stderr)
+
+            canonical_names = [task["name"] for task in canonical]
+            durations = root / "durations.json"
+            durations.write_text(
+                json.dumps(
+                    {
+                        "task_results": [
+                            {"name": name, "duration_ms": 1000 * (position + 1)}
+                            for position, name in enumerate(canonical_names)
+                        ]
+                    }
+                ),
+                encoding="utf-8",
+            )
+            balanced = run_harness(
+                repo, output_root, "--run-id", "balanced-1", "--shard", "1/2", "--shard-durations", str(durations)
+            )
+            self.assertEqual(0, balanced.returncode, balanced.stdout + balanced.stderr)
+            self.assertEqual("durations", load_summary(output_root, "balanced-1")["shard"]["strategy"])
+            mismatched = run_harness(
+                repo,
+                output_root,
+                "--run-id",
+                "mismatched",
+                "merge",
+                str(output_root / "runs" / "balanced-1" / "harness-summary.json"),
+                shard_summaries[1],
+            )
+            self.assertNotEqual(0, mismatched.returncode)
+            self.assertIn("--shard-durations", mismatched.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)